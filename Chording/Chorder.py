@@ -17,6 +17,7 @@ from pynput import keyboard
 from pynput.keyboard import Key
 import pyautogui
 
+from defaultProfiles import DEFAULT_PROFILES
 from platform_specific import TextInputFactory
 
 # Configure application-wide logging
@@ -80,41 +81,7 @@ class KeyboardController:
     """
     
     PROFILES_FILE = 'chord_expander_profiles.json'
-    DEFAULT_PROFILES = {
-        "Default": {
-            "btw": "by the way",
-            "idk": "I don't know",
-            "omw": "on my way"
-        },
-        "Developer": {
-            "cls": "class",
-            "fn": "function",
-            "ret": "return",
-            "imp": "import",
-            "pr": "print"
-        },
-        "Medical": {
-            "pt": "patient",
-            "rx": "prescription",
-            "dx": "diagnosis",
-            "tx": "treatment",
-            "hx": "history"
-        },
-        "Legal": {
-            "def": "defendant",
-            "plt": "plaintiff",
-            "jdg": "judgment",
-            "crt": "court",
-            "att": "attorney"
-        },
-        "Student": {
-            "asap": "as soon as possible",
-            "tba": "to be announced",
-            "tbd": "to be determined",
-            "eg": "for example",
-            "ie": "that is"
-        }
-    }
+    DEFAULT_PROFILES = DEFAULT_PROFILES
     
     def __init__(self):
         self.logger = self._setup_logger()
@@ -0,0 +1,392 @@
+"""
+End-to-end profile build, from a corpus text file to chord_expander_profiles.json.
+
+The pipeline runs the same steps as the standalone scripts (tokenization,
+frequency count, token filter, normalization stats, scoring, scored filter
+and chord assignment) as stages of a small dependency graph. Every stage is
+content addressed: its key hashes the stage name, its parameters, the source
+of the modules it runs and the contents of its inputs, and its outputs are
+kept under <cache>/<key>/. A stage whose key already has an entry holding all
+its outputs is skipped, and stages whose inputs are ready run side by side in
+a process pool.
+For a Python code corpus (--code), codeTokenization's keyword and
+identifier count takes the place of tokenization and frequency count.
+
+The chords end up as one profile of the profiles file, in the chord ->
+expansion form KeyboardController._load_profiles reads.
+"""
+import argparse
+import hashlib
+import json
+import logging
+import os
+import shutil
+from collections import namedtuple
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from itertools import islice
+from typing import Dict, List, Optional
+
+from defaultProfiles import DEFAULT_PROFILES
+
+logging.basicConfig(
+    level=logging.INFO,
+    format='%(asctime)s - %(levelname)s - %(message)s'
+)
+
+MODULE_DIR = os.path.dirname(os.path.abspath(__file__))
+DEFAULT_CACHE_DIR = '.profile_cache'
+DEFAULT_PROFILES_FILE = 'chord_expander_profiles.json'
+DEFAULT_PROFILE = 'Generated'
+MANIFEST = 'manifest.json'
+HASHES_FILE = 'hashes.json'
+CHUNK_SIZE = 1 << 20
+
+# inputs and outputs are artifact names, 'corpus' always comes from outside
+Stage = namedtuple('Stage', ['name', 'inputs', 'outputs', 'modules'])
+
+STAGES = (
+    Stage('tokenize', ('corpus',), ('tokens.txt',), ('tokenization.py',)),
+    Stage('frequencies', ('tokens.txt',), ('token_frequencies.json',), ('wordFrequency.py',)),
+    Stage('filter', ('token_frequencies.json',), ('filtered_token_frequencies.json',), ('englishTokenFilter.py',)),
+    Stage('normalization', ('filtered_token_frequencies.json',), ('normalization.json',),
+          ('dataStats.py', 'scoreWords.py', 'layoutMetrics.py', 'jsonStream.py')),
+    Stage('score', ('filtered_token_frequencies.json', 'normalization.json'), ('scored_tokens.json',),
+          ('scoreWords.py', 'scoreCache.py', 'layoutMetrics.py')),
+    Stage('scored_filter', ('scored_tokens.json',), ('filtered_scored_tokens.json',), ('englishScoredFilter.py',)),
+    # only runs when no prebuilt English word index is supplied, chord generation maps it
+    Stage('word_index', (), ('english_words.idx',), ('wordIndex.py',)),
+    Stage('chords', ('filtered_scored_tokens.json', 'english_words.idx'), ('chords.json',),
+          ('chordAssignment.py', 'generateChord.py', 'wordIndex.py')),
+    Stage('misfires', ('chords.json', 'token_frequencies.json'), ('misfires.json',), ('chordConflicts.py', 'jsonStream.py')),
+)
+
+# a Python code corpus is counted by keywords and identifier parts instead of prose tokens
+CODE_STAGES = (
+    Stage('code_frequencies', ('corpus',), ('token_frequencies.json',), ('codeTokenization.py',)),
+) + tuple(stage for stage in STAGES if stage.name not in ('tokenize', 'frequencies'))
+
+
+def file_digest(path: str) -> str:
+    """sha256 of a file's contents."""
+    digest = hashlib.sha256()
+    with open(path, 'rb') as file:
+        for chunk in iter(lambda: file.read(CHUNK_SIZE), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+class DigestMemo:
+    """
+    Remembers external input digests by path, size and modification time,
+    so an unchanged corpus is not read again just to find out it is unchanged.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        try:
+            with open(path, 'r', encoding='utf-8') as file:
+                self.entries = json.load(file)
+        except (FileNotFoundError, ValueError):
+            self.entries = {}
+
+    def digest(self, path: str) -> str:
+        path = os.path.abspath(path)
+        stat = os.stat(path)
+        entry = self.entries.get(path)
+        if entry and entry[0] == stat.st_size and entry[1] == stat.st_mtime_ns:
+            return entry[2]
+
+        digest = file_digest(path)
+        self.entries[path] = [stat.st_size, stat.st_mtime_ns, digest]
+        with open(self.path, 'w', encoding='utf-8') as file:
+            json.dump(self.entries, file, indent=2)
+        return digest
+
+
+def stage_key(stage: Stage, params: Dict, input_digests: Dict[str, str]) -> str:
+    """Content address of a stage run: what it runs, with what, on what."""
+    digest = hashlib.sha256()
+    digest.update(json.dumps([stage.name, params, input_digests], sort_keys=True).encode('utf-8'))
+    for module in stage.modules:
+        with open(os.path.join(MODULE_DIR, module), 'rb') as file:
+            digest.update(hashlib.sha256(file.read()).digest())
+    return digest.hexdigest()
+
+
+def _tokenize(inputs: Dict[str, str], outputs: Dict[str, str], params: Dict, cache_dir: str) -> None:
+    from tokenization import tokenize_text_in_chunks
+    tokenize_text_in_chunks(inputs['corpus'], outputs['tokens.txt'])
+
+
+def _frequencies(inputs: Dict[str, str], outputs: Dict[str, str], params: Dict, cache_dir: str) -> None:
+    from wordFrequency import compute_token_frequency_json
+    compute_token_frequency_json(inputs['tokens.txt'], outputs['token_frequencies.json'])
+
+
+def _code_frequencies(inputs: Dict[str, str], outputs: Dict[str, str], params: Dict, cache_dir: str) -> None:
+    from codeTokenization import compute_code_frequency_json
+    compute_code_frequency_json(inputs['corpus'], outputs['token_frequencies.json'])
+
+
+def _filter(inputs: Dict[str, str], outputs: Dict[str, str], params: Dict, cache_dir: str) -> None:
+    from englishTokenFilter import filter_token_file
+    filter_token_file(inputs['token_frequencies.json'], outputs['filtered_token_frequencies.json'])
+
+
+def _normalization(inputs: Dict[str, str], outputs: Dict[str, str], params: Dict, cache_dir: str) -> None:
+    from dataStats import compute_normalization
+    from layoutMetrics import PRESETS
+
+    normalization = compute_normalization(inputs['filtered_token_frequencies.json'], PRESETS[params['layout']])
+    with open(outputs['normalization.json'], 'w', encoding='utf-8') as file:
+        json.dump(normalization, file, indent=4)
+
+
+def _score(inputs: Dict[str, str], outputs: Dict[str, str], params: Dict, cache_dir: str) -> None:
+    from layoutMetrics import PRESETS
+    from scoreCache import ScoreCache
+    from scoreWords import load_normalization, score_words
+
+    with open(inputs['filtered_token_frequencies.json'], 'r', encoding='utf-8') as file:
+        tokens = json.load(file)
+
+    # the score cache outlives stage entries, so a changed corpus only scores its new tokens
+    with ScoreCache(os.path.join(cache_dir, 'scores.sqlite')) as cache:
+        scored_tokens = score_words(tokens, PRESETS[params['layout']], load_normalization(inputs['normalization.json']), cache=cache)
+        logging.info(f"Score cache: {cache.stats()}")
+
+    with open(outputs['scored_tokens.json'], 'w', encoding='utf-8') as file:
+        json.dump(scored_tokens, file, indent=2)
+
+
+def _scored_filter(inputs: Dict[str, str], outputs: Dict[str, str], params: Dict, cache_dir: str) -> None:
+    from englishScoredFilter import filter_scored_file
+    filter_scored_file(inputs['scored_tokens.json'], outputs['filtered_scored_tokens.json'])
+
+
+def _word_index(inputs: Dict[str, str], outputs: Dict[str, str], params: Dict, cache_dir: str) -> None:
+    from wordIndex import build_english_index
+
+    count = build_english_index(outputs['english_words.idx'])
+    logging.info(f"Built English word index with {count} words")
+
+
+def _chords(inputs: Dict[str, str], outputs: Dict[str, str], params: Dict, cache_dir: str) -> None:
+    import generateChord
+    from chordAssignment import assign_chords
+    from wordIndex import load_english_words
+
+    with open(inputs['filtered_scored_tokens.json'], 'r', encoding='utf-8') as file:
+        scored_tokens = json.load(file)
+
+    tokens = dict(islice(scored_tokens.items(), params['limit']))
+    frequencies = {word: data['frequency'] for word, data in tokens.items()}
+    with load_english_words(inputs['english_words.idx']) as english_words:
+        generateChord.english_words = english_words
+        try:
+            chords, report = assign_chords(frequencies, params['candidates'],
+                                           scores={word: data['score'] for word, data in tokens.items()})
+        finally:
+            generateChord.english_words = None
+    logging.info(f"Projected keystrokes saved: {report['keystrokes_saved']} of {report['keystrokes_without_chords']}")
+
+    with open(outputs['chords.json'], 'w', encoding='utf-8') as file:
+        json.dump(chords, file, ensure_ascii=False, indent=4)
+
+
+def _misfires(inputs: Dict[str, str], outputs: Dict[str, str], params: Dict, cache_dir: str) -> None:
+    from chordConflicts import analyze_conflicts, load_generated_chords
+
+    conflicts = analyze_conflicts(load_generated_chords(inputs['chords.json']), inputs['token_frequencies.json'])
+    with open(outputs['misfires.json'], 'w', encoding='utf-8') as file:
+        json.dump([conflict._asdict() for conflict in conflicts], file, ensure_ascii=False, indent=4)
+
+
+STAGE_FUNCTIONS = {
+    'tokenize': _tokenize,
+    'frequencies': _frequencies,
+    'code_frequencies': _code_frequencies,
+    'filter': _filter,
+    'normalization': _normalization,
+    'score': _score,
+    'scored_filter': _scored_filter,
+    'word_index': _word_index,
+    'chords': _chords,
+    'misfires': _misfires,
+}
+
+
+def _run_stage(stage: Stage, inputs: Dict[str, str], params: Dict, cache_dir: str, entry: str) -> Dict[str, str]:
+    """Runs one stage into a fresh cache entry and returns the digests of its outputs."""
+    temp_entry = f"{entry}.tmp-{os.getpid()}"
+    shutil.rmtree(temp_entry, ignore_errors=True)
+    os.makedirs(temp_entry)
+
+    outputs = {name: os.path.join(temp_entry, name) for name in stage.outputs}
+    STAGE_FUNCTIONS[stage.name](inputs, outputs, params, cache_dir)
+
+    # the original scripts report errors instead of raising, so check what they left behind
+    missing = [name for name, path in outputs.items() if not os.path.exists(path)]
+    if missing:
+        shutil.rmtree(temp_entry, ignore_errors=True)
+        raise RuntimeError(f"Stage '{stage.name}' did not produce {', '.join(missing)}")
+
+    digests = {name: file_digest(path) for name, path in outputs.items()}
+    with open(os.path.join(temp_entry, MANIFEST), 'w', encoding='utf-8') as file:
+        json.dump(digests, file, indent=2)
+
+    try:
+        os.replace(temp_entry, entry)
+    except OSError:
+        # another build finished the same entry first, its outputs are identical
+        shutil.rmtree(temp_entry, ignore_errors=True)
+    return digests
+
+
+def run_pipeline(external: Dict[str, str], params: Dict[str, Dict], cache_dir: str = DEFAULT_CACHE_DIR,
+                 jobs: Optional[int] = None, stages=STAGES) -> Dict[str, str]:
+    """
+    Builds every stage whose cache entry is missing or lost one of its outputs.
+
+    Args:
+        external: Artifact name -> path of files supplied from outside, at
+            least the corpus. Stages whose outputs are all supplied are skipped.
+        params: Stage name -> parameters, part of that stage's cache key
+        cache_dir: Directory holding the stage entries
+        jobs: Number of worker processes, defaults to the CPU count
+        stages: The stage graph to run
+
+    Returns:
+        Artifact name -> path of the built file
+    """
+    os.makedirs(cache_dir, exist_ok=True)
+    memo = DigestMemo(os.path.join(cache_dir, HASHES_FILE))
+
+    paths = {name: os.path.abspath(path) for name, path in external.items()}
+    digests = {name: memo.digest(path) for name, path in external.items()}
+    pending = [stage for stage in stages if not set(stage.outputs) <= set(external)]
+    running = {}
+
+    def finish(stage: Stage, entry: str, output_digests: Dict[str, str]) -> None:
+        for name in stage.outputs:
+            paths[name] = os.path.join(entry, name)
+            digests[name] = output_digests[name]
+
+    with ProcessPoolExecutor(max_workers=jobs) as pool:
+        while pending or running:
+            progressed = True
+            while progressed:
+                progressed = False
+                for stage in [stage for stage in pending if all(name in digests for name in stage.inputs)]:
+                    pending.remove(stage)
+                    stage_params = params.get(stage.name, {})
+                    key = stage_key(stage, stage_params, {name: digests[name] for name in stage.inputs})
+                    entry = os.path.abspath(os.path.join(cache_dir, key))
+
+                    manifest = os.path.join(entry, MANIFEST)
+                    if os.path.exists(manifest):
+                        if all(os.path.exists(os.path.join(entry, name)) for name in stage.outputs):
+                            with open(manifest, 'r', encoding='utf-8') as file:
+                                finish(stage, entry, json.load(file))
+                            logging.info(f"Stage '{stage.name}' is up to date")
+                            progressed = True
+                            continue
+                        # an output was deleted from the entry, build it again
+                        shutil.rmtree(entry, ignore_errors=True)
+
+                    logging.info(f"Running stage '{stage.name}'")
+                    inputs = {name: paths[name] for name in stage.inputs}
+                    future = pool.submit(_run_stage, stage, inputs, stage_params, os.path.abspath(cache_dir), entry)
+                    running[future] = (stage, entry)
+
+            if not running:
+                if pending:
+                    raise ValueError(f"Unsatisfiable stage inputs: {', '.join(stage.name for stage in pending)}")
+                break
+
+            done, _ = wait(running, return_when=FIRST_COMPLETED)
+            for future in done:
+                stage, entry = running.pop(future)
+                finish(stage, entry, future.result())
+                logging.info(f"Stage '{stage.name}' finished")
+
+    return paths
+
+
+def write_profile(chords_file: str, profiles_file: str = DEFAULT_PROFILES_FILE, profile: str = DEFAULT_PROFILE) -> int:
+    """
+    Stores the generated chords as one profile of the chord expander profiles file.
+
+    Other profiles in the file are kept as they are. A new file starts out
+    with KeyboardController's default profiles, as it would have had the
+    expander created it.
+
+    Args:
+        chords_file: word -> chord JSON file
+        profiles_file: Profiles file read by KeyboardController._load_profiles
+        profile: Name of the profile to create or replace
+
+    Returns:
+        Number of chords in the profile
+    """
+    with open(chords_file, 'r', encoding='utf-8') as file:
+        chords = json.load(file)
+
+    if os.path.exists(profiles_file):
+        with open(profiles_file, 'r', encoding='utf-8') as file:
+            profiles = json.load(file)
+    else:
+        profiles = {name: dict(shortcuts) for name, shortcuts in DEFAULT_PROFILES.items()}
+    profiles[profile] = {chord: word for word, chord in chords.items()}
+
+    temp_file = f"{profiles_file}.tmp"
+    with open(temp_file, 'w', encoding='utf-8') as file:
+        json.dump(profiles, file, indent=4)
+    os.replace(temp_file, profiles_file)
+
+    return len(profiles[profile])
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    from layoutMetrics import PRESETS
+    from wordIndex import DEFAULT_INDEX_FILE
+
+    parser = argparse.ArgumentParser(description="Builds a chord expander profile from a corpus, reusing cached stages.")
+    parser.add_argument('corpus', help="corpus text file")
+    parser.add_argument('--code', action='store_true', help="the corpus is Python code such as python_Data.txt, "
+                                                            "count keywords and identifier parts instead of words")
+    parser.add_argument('--profiles', default=DEFAULT_PROFILES_FILE, help="profiles file to write the profile into")
+    parser.add_argument('--profile', default=DEFAULT_PROFILE, help="name of the generated profile")
+    parser.add_argument('--cache-dir', default=DEFAULT_CACHE_DIR, help="directory of the stage cache")
+    parser.add_argument('--layout', default='QWERTZ', choices=sorted(PRESETS), help="preset layout to score with")
+    parser.add_argument('--stats-layout', default='Halmak', choices=sorted(PRESETS), help="preset layout of the normalization stats")
+    parser.add_argument('--normalization', help="fixed normalization table instead of one computed from the corpus, "
+                                                "keeps cached scores valid when the corpus changes")
+    parser.add_argument('--word-index', help="prebuilt English word index, see wordIndex.py; defaults to "
+                                              "english_words.idx next to this script if it exists, otherwise "
+                                              "the index is built from the NLTK word list")
+    parser.add_argument('--limit', type=int, default=1000, help="number of top scored words to assign chords to")
+    parser.add_argument('--candidates', type=int, default=10, help="chord candidates considered per word")
+    parser.add_argument('--jobs', type=int, default=None, help="number of worker processes")
+    args = parser.parse_args(argv)
+
+    params = {
+        'normalization': {'layout': args.stats_layout},
+        'score': {'layout': args.layout},
+        'chords': {'limit': args.limit, 'candidates': args.candidates},
+    }
+    external = {'corpus': args.corpus}
+    if args.normalization:
+        external['normalization.json'] = args.normalization
+    word_index = args.word_index or (DEFAULT_INDEX_FILE if os.path.exists(DEFAULT_INDEX_FILE) else None)
+    if word_index:
+        external['english_words.idx'] = word_index
+    paths = run_pipeline(external, params, args.cache_dir, args.jobs, CODE_STAGES if args.code else STAGES)
+
+    count = write_profile(paths['chords.json'], args.profiles, args.profile)
+    logging.info(f"Profile '{args.profile}' with {count} chords written to {args.profiles}")
+    logging.info(f"Misfire report: {paths['misfires.json']}")
+
+
+if __name__ == "__main__":
+    main()
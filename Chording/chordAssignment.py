@@ -0,0 +1,238 @@
+"""
+Frequency weighted chord assignment.
+
+create_chords hands out chords in input order, so a rare word early in the
+list can take the short chord a frequent word needed. This module treats the
+assignment as a weighted matching between words and their candidate chords:
+a word typed with chord c instead of in full saves weight * (len(word) - len(c)),
+and the solver maximizes the total saving.
+
+The weight of a word is what one of its keystrokes costs. Without scores
+that is its frequency, so the saving counts keystrokes. With the effort
+scores of scoreWords.py, the score (frequency times the strain of typing the
+word in full) is spread over the word's letters, so the solver saves the
+most typing effort and hard to type words win over easy ones of the same
+frequency.
+
+It runs a lazy priority-queue greedy over (word, candidate) pairs followed by
+local improvement passes that move a chord to a more frequent word whenever
+the current owner can switch to another free candidate at a smaller loss.
+"""
+import argparse
+import heapq
+import json
+import logging
+from itertools import count, islice
+from typing import Dict, Iterator, List, Optional, Tuple
+
+from generateChord import allocate_chords, chord_candidates
+
+logging.basicConfig(
+    level=logging.INFO,
+    format='%(asctime)s - %(levelname)s - %(message)s'
+)
+
+MAX_CANDIDATES = 10
+MAX_ROUNDS = 5
+
+
+def _saving(weight: float, word: str, chord: Optional[str]) -> float:
+    return 0 if chord is None else weight * (len(word) - len(chord))
+
+
+def total_saving(chords: Dict[str, str], weights: Dict[str, float]) -> float:
+    """Keystrokes saved by typing every word with its chord instead of in full, weighted per word."""
+    return sum(max(0, _saving(weights[word], word, chord)) for word, chord in chords.items())
+
+
+def effort_weights(scores: Dict[str, float]) -> Dict[str, float]:
+    """Effort of one keystroke of every word, its score spread over its letters."""
+    return {word: score / len(word) for word, score in scores.items()}
+
+
+class ChordAssignment:
+    """
+    Solver state: bounded candidate lists per word and the current owners.
+
+    Args:
+        weights: Word -> weight of one of its keystrokes, see the module docstring
+        max_candidates: Number of chord candidates considered per word
+    """
+
+    def __init__(self, weights: Dict[str, float], max_candidates: int = MAX_CANDIDATES):
+        self.weights = weights
+        # stable sort keeps the generateChord preference among equally long chords
+        self.candidates = {
+            word: sorted((chord for chord in islice(chord_candidates(word), max_candidates) if len(chord) < len(word)), key=len)
+            for word in weights
+        }
+        self.chords: Dict[str, str] = {}
+        self.owners: Dict[str, str] = {}
+
+    def _assign(self, word: str, chord: str) -> None:
+        previous = self.chords.get(word)
+        if previous is not None:
+            del self.owners[previous]
+        self.chords[word] = chord
+        self.owners[chord] = word
+
+    def greedy(self) -> None:
+        """Pops (word, candidate) pairs by saving and assigns every pair whose chord is free."""
+        heap: List[Tuple[float, int, str, str, Iterator[str]]] = []
+        order = count()
+
+        def push(word: str, pending: Iterator[str]) -> None:
+            for chord in pending:
+                if chord not in self.owners:
+                    heapq.heappush(heap, (-_saving(self.weights[word], word, chord), next(order), word, chord, pending))
+                    return
+
+        for word, candidates in self.candidates.items():
+            push(word, iter(candidates))
+
+        while heap:
+            _, _, word, chord, pending = heapq.heappop(heap)
+            if chord in self.owners:
+                push(word, pending)  # taken since it was queued, try the next candidate
+                continue
+            self._assign(word, chord)
+
+    def _best_free(self, word: str, exclude: str) -> Optional[str]:
+        for chord in self.candidates[word]:
+            if chord != exclude and chord not in self.owners:
+                return chord
+        return None
+
+    def improve(self, max_rounds: int = MAX_ROUNDS) -> int:
+        """
+        Runs local improvement passes over the words by descending weight.
+
+        For every candidate shorter than a word's current chord, the owner of
+        that candidate is moved to its best free alternative (or to the word's
+        current chord, a swap) if that raises the total saving.
+
+        Returns:
+            Number of moves made
+        """
+        order = sorted(self.candidates, key=lambda word: -self.weights[word])
+        moves = 0
+
+        for _ in range(max_rounds):
+            moved = False
+            for word in order:
+                current = self.chords.get(word)
+                current_saving = _saving(self.weights[word], word, current)
+
+                for chord in self.candidates[word]:
+                    if current is not None and len(chord) >= len(current):
+                        break
+                    owner = self.owners.get(chord)
+                    if owner is None:
+                        self._assign(word, chord)
+                        moves += 1
+                        moved = True
+                        break
+
+                    owner_saving = _saving(self.weights[owner], owner, chord)
+                    alternatives = [self._best_free(owner, chord)]
+                    if current is not None and current in self.candidates[owner]:
+                        alternatives.append(current)
+
+                    best = max(alternatives, key=lambda alt: _saving(self.weights[owner], owner, alt))
+                    gain = (_saving(self.weights[word], word, chord) - current_saving +
+                            _saving(self.weights[owner], owner, best) - owner_saving)
+                    if gain > 0:
+                        del self.owners[chord]
+                        del self.chords[owner]
+                        self._assign(word, chord)
+                        if best is not None:
+                            self._assign(owner, best)
+                        moves += 1
+                        moved = True
+                        break
+
+            if not moved:
+                break
+
+        return moves
+
+    def solve(self, max_rounds: int = MAX_ROUNDS) -> Dict[str, str]:
+        self.greedy()
+        moves = self.improve(max_rounds)
+        logging.info(f"Local improvement made {moves} moves")
+        return dict(self.chords)
+
+
+def assign_chords(frequencies: Dict[str, int], max_candidates: int = MAX_CANDIDATES,
+                  max_rounds: int = MAX_ROUNDS,
+                  scores: Optional[Dict[str, float]] = None) -> Tuple[Dict[str, str], Dict[str, float]]:
+    """
+    Assigns chords maximizing the frequency or effort weighted keystroke saving.
+
+    Args:
+        frequencies: Word -> frequency mapping, in the order create_chords would use
+        max_candidates: Number of chord candidates considered per word
+        max_rounds: Maximum number of local improvement passes
+        scores: Word -> effort score from scoreWords.py, to save effort rather than keystrokes
+
+    Returns:
+        Tuple of the word -> chord mapping and a report comparing it with the
+        input order greedy assignment of create_chords
+    """
+    weights = frequencies if scores is None else effort_weights(scores)
+    chords = ChordAssignment(weights, max_candidates).solve(max_rounds)
+    greedy_chords, _ = allocate_chords(frequencies)
+
+    typed = sum(frequency * len(word) for word, frequency in frequencies.items())
+    saved = total_saving(chords, frequencies)
+    greedy_saved = total_saving(greedy_chords, frequencies)
+
+    report = {
+        'keystrokes_without_chords': typed,
+        'keystrokes_saved': saved,
+        'greedy_keystrokes_saved': greedy_saved,
+        'saved_over_greedy': saved - greedy_saved
+    }
+    if scores is not None:
+        report.update({
+            'effort_without_chords': sum(scores.values()),
+            'effort_saved': total_saving(chords, weights),
+            'greedy_effort_saved': total_saving(greedy_chords, weights)
+        })
+    return chords, report
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    parser = argparse.ArgumentParser(description="Assigns chords by expected keystroke savings.")
+    parser.add_argument('--input', default='filtered_scored_tokens.json', help="scored tokens from englishScoredFilter.py")
+    parser.add_argument('--output', default='chords.json', help="where to write the word -> chord mapping")
+    parser.add_argument('--limit', type=int, default=None, help="only assign chords to the first N words")
+    parser.add_argument('--candidates', type=int, default=MAX_CANDIDATES, help="chord candidates considered per word")
+    parser.add_argument('--frequency-only', action='store_true', help="save keystrokes, ignoring the effort scores")
+    args = parser.parse_args(argv)
+
+    with open(args.input, 'r', encoding='utf-8') as file:
+        scored_tokens = json.load(file)
+
+    tokens = dict(islice(scored_tokens.items(), args.limit))
+    frequencies = {word: data['frequency'] for word, data in tokens.items()}
+    scores = None if args.frequency_only else {word: data['score'] for word, data in tokens.items()}
+    chords, report = assign_chords(frequencies, args.candidates, scores=scores)
+
+    with open(args.output, 'w', encoding='utf-8') as file:
+        json.dump(chords, file, ensure_ascii=False, indent=4)
+
+    logging.info(f"Assigned {len(chords)} chords, saved to {args.output}")
+    logging.info(
+        f"Projected keystrokes saved: {report['keystrokes_saved']} of {report['keystrokes_without_chords']} "
+        f"({report['saved_over_greedy']:+} compared with the greedy assignment)"
+    )
+    if scores is not None:
+        logging.info(
+            f"Projected effort saved: {report['effort_saved']:.1f} of {report['effort_without_chords']:.1f} "
+            f"({report['effort_saved'] - report['greedy_effort_saved']:+.1f} compared with the greedy assignment)"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,155 @@
+"""
+Bulk misfire analysis of chords against the token frequency table.
+
+KeyboardController.on_press collects the alphanumeric characters of the word
+being typed and expands it on space whenever its lower case form is a chord,
+so a chord such as `def` or `pt` also fires every time the real word is
+typed. This module estimates, for every chord, how many accidental
+expansions to expect per 10k typed words.
+
+The frequency table is streamed once, reduced to the short tokens that could
+collide with a chord at all, and joined against the chords with sorted
+NumPy arrays rather than scanning the table per chord.
+"""
+import argparse
+import json
+import logging
+import re
+from collections import namedtuple
+from typing import List, Optional, Tuple
+
+import numpy as np
+
+from jsonStream import iter_json_batches
+
+logging.basicConfig(
+    level=logging.INFO,
+    format='%(asctime)s - %(levelname)s - %(message)s'
+)
+
+BATCH_SIZE = 100000
+PER_WORDS = 10000
+
+Conflict = namedtuple('Conflict', ['chord', 'expansion', 'profile', 'occurrences', 'risk'])
+
+_NON_ALNUM = re.compile(r'[\W_]+')
+
+
+def typed_form(token: str) -> str:
+    """What on_press collects for a token: its alphanumeric characters, lower cased."""
+    return (token if token.isalnum() else _NON_ALNUM.sub('', token)).lower()
+
+
+def load_profile_chords(path: str, profile: Optional[str] = None) -> List[Tuple[str, str, str]]:
+    """
+    Reads the chords of chord_expander_profiles.json.
+
+    Args:
+        path: Path to the profiles file
+        profile: Only read this profile, all profiles if None
+
+    Returns:
+        List of (chord, expansion, profile name)
+    """
+    with open(path, 'r', encoding='utf-8') as file:
+        profiles = json.load(file)
+
+    names = [profile] if profile else list(profiles)
+    return [(chord, expansion, name) for name in names for chord, expansion in profiles[name].items()]
+
+
+def load_generated_chords(path: str) -> List[Tuple[str, str, str]]:
+    """Reads a word -> chord mapping as written by chordAssignment.py."""
+    with open(path, 'r', encoding='utf-8') as file:
+        chords = json.load(file)
+    return [(chord, word, path) for word, chord in chords.items()]
+
+
+def typed_frequencies(token_file: str, max_length: int, batch_size: int = BATCH_SIZE) -> Tuple[np.ndarray, np.ndarray, int]:
+    """
+    Streams the frequency table into aggregated counts of short typed forms.
+
+    Args:
+        token_file: token -> frequency JSON file
+        max_length: Longest typed form worth keeping (the longest chord)
+        batch_size: Number of tokens normalized at a time
+
+    Returns:
+        Tuple of sorted unique typed forms, their total frequencies and the
+        total number of typed words in the table
+    """
+    forms: List[np.ndarray] = []
+    counts: List[np.ndarray] = []
+    total_words = 0
+
+    for batch in iter_json_batches(token_file, batch_size):
+        typed = [typed_form(token) for token, _ in batch]
+        frequencies = np.fromiter((frequency for _, frequency in batch), dtype=np.int64, count=len(batch))
+        lengths = np.fromiter(map(len, typed), dtype=np.int64, count=len(typed))
+
+        # punctuation tokens are never typed as words
+        total_words += int(frequencies[lengths > 0].sum())
+        keep = np.flatnonzero((lengths > 0) & (lengths <= max_length))
+        forms.append(np.array([typed[i] for i in keep], dtype=f'<U{max_length}'))
+        counts.append(frequencies[keep])
+
+    unique, inverse = np.unique(np.concatenate(forms) if forms else np.empty(0, dtype=f'<U{max_length}'), return_inverse=True)
+    totals = np.bincount(inverse.ravel(), weights=np.concatenate(counts) if counts else None, minlength=len(unique))
+    return unique, totals.astype(np.int64), total_words
+
+
+def analyze_conflicts(chords: List[Tuple[str, str, str]], token_file: str) -> List[Conflict]:
+    """
+    Ranks chords by expected accidental expansions per 10k typed words.
+
+    Args:
+        chords: List of (chord, expansion, profile)
+        token_file: token -> frequency JSON file
+
+    Returns:
+        Conflicts sorted from the riskiest chord down
+    """
+    if not chords:
+        return []
+
+    max_length = max(len(chord) for chord, _, _ in chords)
+    unique, totals, total_words = typed_frequencies(token_file, max_length)
+
+    # on_press looks up the lower cased word, so chords with capitals never fire
+    keys = np.array([chord for chord, _, _ in chords], dtype=f'<U{max_length}')
+    positions = np.minimum(np.searchsorted(unique, keys), max(len(unique) - 1, 0))
+    found = (unique[positions] == keys) if len(unique) else np.zeros(len(keys), dtype=bool)
+    occurrences = np.where(found, totals[positions] if len(unique) else 0, 0)
+    risks = occurrences / max(total_words, 1) * PER_WORDS
+
+    order = np.lexsort((keys, -risks))
+    return [
+        Conflict(chords[i][0], chords[i][1], chords[i][2], int(occurrences[i]), float(risks[i]))
+        for i in order
+    ]
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    parser = argparse.ArgumentParser(description="Ranks chords by how often they would fire by accident.")
+    parser.add_argument('--frequencies', default='token_frequencies.json', help="token -> frequency JSON file")
+    parser.add_argument('--profiles', default='chord_expander_profiles.json', help="profiles file of the chord expander")
+    parser.add_argument('--profile', help="only analyze this profile")
+    parser.add_argument('--chords', help="word -> chord JSON file to analyze instead of the profiles")
+    parser.add_argument('--output', help="write the full ranking to this JSON file")
+    parser.add_argument('--top', type=int, default=20, help="number of chords to print")
+    args = parser.parse_args(argv)
+
+    chords = load_generated_chords(args.chords) if args.chords else load_profile_chords(args.profiles, args.profile)
+    conflicts = analyze_conflicts(chords, args.frequencies)
+
+    for conflict in conflicts[:args.top]:
+        print(f"{conflict.risk:10.3f} per 10k  {conflict.chord!r} -> {conflict.expansion!r} ({conflict.profile})")
+
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as file:
+            json.dump([conflict._asdict() for conflict in conflicts], file, ensure_ascii=False, indent=4)
+        logging.info(f"Conflict ranking written to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
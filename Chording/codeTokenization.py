@@ -0,0 +1,197 @@
+"""
+Keyword and identifier frequencies of a Python code corpus, for Developer profiles.
+
+tokenization.py's prose pattern cuts code apart at every symbol and counts
+the contents of strings and comments as words. This stage runs the code
+through Python's own tokenize module instead: keywords are counted as they
+are, and identifiers are split into their snake_case and camelCase parts,
+so parse_http_request and parseHTTPRequest both count "parse", "http" and
+"request". The corpus is streamed in batches of snippets that a process
+pool tokenizes. A snippet that does not tokenize (an unterminated string,
+inconsistent indentation, a fragment cut off mid statement) keeps the
+names read before the error and falls back to a plain identifier pattern
+for the rest of it.
+
+The output has the token_frequencies.json form of wordFrequency.py, so it
+feeds the rest of the profile pipeline unchanged.
+"""
+import io
+import json
+import keyword
+import os
+import re
+import tokenize
+from bisect import bisect_right
+from collections import Counter
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from typing import Iterator, List, Optional, Tuple
+
+BATCH_SIZE = 1 << 20
+KEYWORDS = frozenset(keyword.kwlist)
+IDENTIFIER = re.compile(r'[^\W\d]\w*')
+IDENTIFIER_PARTS = re.compile(r'[A-Z]+(?=[A-Z][a-z])|[A-Z]?[a-z]+|[A-Z]+|[^\W\d_]+')
+# python_Data.txt separates snippets by a blank line, and a snippet starts unindented
+SNIPPET_BOUNDARY = re.compile(r'\n\n(?=\S)')
+
+
+def split_identifier(name: str) -> List[str]:
+    """Lowercase snake_case and camelCase parts of an identifier, digits are dropped."""
+    return [part.lower() for part in IDENTIFIER_PARTS.findall(name)]
+
+
+def _count_name(name: str, counts: Counter) -> None:
+    if name in KEYWORDS:
+        counts[name] += 1
+    else:
+        counts.update(split_identifier(name))
+
+
+def _read_names(source: str,
+                spans: Optional[List[Tuple[int, int]]] = None) -> Tuple[List[Tuple[int, str]], Optional[int]]:
+    """
+    (line, name) of every name tokenize finds in source.
+
+    Args:
+        source: Python code
+        spans: If given, the first and last line of every token that runs
+            over several lines, such as a triple quoted string, are added to it
+
+    Returns:
+        The names, and None if the whole source tokenized, otherwise the last
+        line that did; the names up to there are returned
+    """
+    names = []
+    line = 0
+    try:
+        for token in tokenize.generate_tokens(io.StringIO(source).readline):
+            line = token.end[0]
+            if token.type == tokenize.NAME:
+                names.append((token.start[0], token.string))
+            elif spans is not None and token.start[0] != line:
+                spans.append((token.start[0], line))
+    except (tokenize.TokenError, SyntaxError, ValueError):
+        return names, line
+    return names, None
+
+
+def count_snippet(snippet: str, counts: Counter) -> None:
+    """Counts the keywords and identifier parts of one snippet, broken or not."""
+    names, line = _read_names(snippet)
+    for _, name in names:
+        _count_name(name, counts)
+    if line is not None:
+        rest = snippet.split('\n', line)[line] if snippet.count('\n') >= line else ''
+        for name in IDENTIFIER.findall(rest):
+            _count_name(name, counts)
+
+
+def count_batch(batch: str) -> Counter:
+    """
+    Counts a batch of snippets, in one go as far as it tokenizes.
+
+    A broken snippet throws off the tokenizer for everything after it, so
+    from the snippet where tokenizing stopped on, the batch is counted again
+    snippet by snippet. A string a broken snippet leaves open may also be
+    closed by a quote in a later snippet, and tokenizing only fails further
+    down, so a token that runs into another snippet marks the place to start
+    over too.
+    """
+    counts = Counter()
+    spans = []
+    names, failed_line = _read_names(batch, spans)
+    if failed_line is None:
+        for _, name in names:
+            _count_name(name, counts)
+        return counts
+
+    snippets = SNIPPET_BOUNDARY.split(batch)
+    starts = []
+    line = 1
+    for snippet in snippets:
+        starts.append(line)
+        # the boundary between two snippets is a blank line
+        line += snippet.count('\n') + 2
+
+    for start, end in spans:
+        following = bisect_right(starts, start)
+        if following < len(starts) and starts[following] <= end:
+            failed_line = min(failed_line, start)
+            break
+
+    first = max(bisect_right(starts, failed_line) - 1, 0)
+    first_line = starts[first]
+
+    for name_line, name in names:
+        if name_line >= first_line:
+            break
+        _count_name(name, counts)
+    for snippet in snippets[first:]:
+        count_snippet(snippet, counts)
+    return counts
+
+
+def read_batches(input_file: str, batch_size: int = BATCH_SIZE) -> Iterator[str]:
+    """Yields the corpus in pieces of about batch_size characters, cut between snippets."""
+    with open(input_file, 'r', encoding='utf-8', errors='replace') as file:
+        carry = ''
+        while True:
+            block = file.read(batch_size)
+            if not block:
+                if carry.strip():
+                    yield carry
+                return
+
+            text = carry + block
+            cut = -1
+            # the carry had no boundary, so only look where the new block could complete one
+            for match in SNIPPET_BOUNDARY.finditer(text, max(0, len(carry) - 2)):
+                cut = match.start()
+            if cut == -1:
+                carry = text
+                continue
+            yield text[:cut]
+            carry = text[cut + 2:]
+
+
+def compute_code_frequency_json(input_file: str, output_file: str, jobs: Optional[int] = None,
+                                batch_size: int = BATCH_SIZE) -> None:
+    """
+    Writes the keyword and identifier part frequencies of a code corpus, most frequent first.
+
+    Args:
+        input_file: Python code corpus such as python_Data.txt
+        output_file: token -> count JSON file
+        jobs: Number of worker processes, defaults to the CPU count
+        batch_size: Characters of code per work item
+    """
+    try:
+        jobs = jobs or os.cpu_count() or 1
+        token_counts = Counter()
+
+        with ProcessPoolExecutor(jobs) as pool:
+            running = set()
+            for batch in read_batches(input_file, batch_size):
+                # keep only a few batches in flight, so memory does not grow with the corpus
+                if len(running) >= 2 * jobs:
+                    done, running = wait(running, return_when=FIRST_COMPLETED)
+                    for future in done:
+                        token_counts.update(future.result())
+                running.add(pool.submit(count_batch, batch))
+
+            for future in running:
+                token_counts.update(future.result())
+
+        sorted_token_counts = dict(sorted(token_counts.items(), key=lambda item: item[1], reverse=True))
+
+        with open(output_file, 'w', encoding='utf-8') as file:
+            json.dump(sorted_token_counts, file, indent=2)
+
+        print(f"Code token frequencies have been written to {output_file}")
+    except FileNotFoundError:
+        print(f"Error: The file {input_file} was not found.")
+    except Exception as e:
+        print(f"An error occurred: {e}")
+
+
+if __name__ == "__main__":
+    compute_code_frequency_json('python_Data.txt', 'token_frequencies.json')
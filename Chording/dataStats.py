@@ -0,0 +1,177 @@
+"""
+Single pass normalization statistics, the Python counterpart of Fitness/getDataStats.js.
+
+Tokens are streamed from the frequency table in batches, every metric is
+folded into a running Welford mean/variance plus a KLL quantile sketch, and
+the resulting table is written straight to normalization.json for the
+scorer. Memory stays bounded by the batch size and the sketch size no
+matter how large the vocabulary is.
+"""
+import argparse
+import json
+import logging
+import math
+from typing import Dict, List, Optional, Sequence
+
+import numpy as np
+
+from jsonStream import iter_json_batches
+from layoutMetrics import PRESETS, Layout
+from scoreWords import BATCH_SIZE, DEFAULT_NORMALIZATION_FILE, LayoutTables, word_metrics
+
+logging.basicConfig(
+    level=logging.INFO,
+    format='%(asctime)s - %(levelname)s - %(message)s'
+)
+
+QUANTILES = (0.01, 0.05, 0.25, 0.5, 0.75, 0.95, 0.99)
+
+# normalization entry -> word_metrics key, as collected by getDataStats.js
+METRICS = {
+    'effort': 'effort',
+    'distance': 'distance',
+    'symmetry': 'symmetry',
+    'evenness': 'evenness',
+    'fingers': 'fingers_usage',
+    'hands': 'hands_usage',
+    'rows': 'rows_usage'
+}
+
+
+class KLLSketch:
+    """
+    KLL quantile sketch (Karnin, Lang, Liberty 2016).
+
+    Keeps a stack of compactors whose capacities shrink geometrically
+    towards the bottom, so the total size is O(k log(n / k)) while the
+    rank error stays around 1.65 / k.
+    """
+
+    def __init__(self, k: int = 200, seed: int = 0):
+        self.k = k
+        self.levels: List[np.ndarray] = [np.empty(0)]
+        self.rng = np.random.default_rng(seed)
+
+    def _capacity(self, level: int) -> int:
+        depth = len(self.levels) - level - 1
+        return max(2, int(math.ceil(self.k * (2 / 3) ** depth)))
+
+    def update(self, values: np.ndarray) -> None:
+        self.levels[0] = np.concatenate([self.levels[0], values])
+        self._compress()
+
+    def _compress(self) -> None:
+        level = 0
+        while level < len(self.levels):
+            items = self.levels[level]
+            if len(items) > self._capacity(level):
+                if level + 1 == len(self.levels):
+                    self.levels.append(np.empty(0))
+                items = np.sort(items)
+                even = len(items) - len(items) % 2
+                # every other item moves one level up with twice the weight
+                promoted = items[self.rng.integers(2):even:2]
+                self.levels[level] = items[even:]
+                self.levels[level + 1] = np.concatenate([self.levels[level + 1], promoted])
+                level = 0  # capacities change once the stack grows
+                continue
+            level += 1
+
+    def __len__(self) -> int:
+        return sum(len(items) for items in self.levels)
+
+    def quantiles(self, fractions: Sequence[float]) -> List[float]:
+        items = np.concatenate(self.levels)
+        if not len(items):
+            return [math.nan] * len(fractions)
+        weights = np.concatenate([np.full(len(level), 2 ** i, dtype=np.float64) for i, level in enumerate(self.levels)])
+        order = np.argsort(items, kind='stable')
+        cumulative = np.cumsum(weights[order])
+        ranks = np.searchsorted(cumulative, np.asarray(fractions) * cumulative[-1], side='left')
+        return items[order][np.minimum(ranks, len(items) - 1)].tolist()
+
+
+class RunningStats:
+    """Streaming min/max/mean/stdDev (Welford, merged per batch) plus quantiles."""
+
+    def __init__(self, k: int = 200):
+        self.count = 0
+        self.mean = 0.0
+        self.m2 = 0.0
+        self.min = math.inf
+        self.max = -math.inf
+        self.sketch = KLLSketch(k)
+
+    def update(self, values: np.ndarray) -> None:
+        values = np.asarray(values, dtype=np.float64).ravel()
+        values = values[np.isfinite(values)]
+        if not len(values):
+            return
+
+        batch_mean = values.mean()
+        batch_m2 = ((values - batch_mean) ** 2).sum()
+        total = self.count + len(values)
+        delta = batch_mean - self.mean
+
+        self.mean += delta * len(values) / total
+        self.m2 += batch_m2 + delta ** 2 * self.count * len(values) / total
+        self.count = total
+        self.min = min(self.min, values.min())
+        self.max = max(self.max, values.max())
+        self.sketch.update(values)
+
+    def to_dict(self, quantiles: Sequence[float] = QUANTILES) -> Dict:
+        if not self.count:
+            return {'min': None, 'max': None, 'mean': None, 'stdDev': None, 'quantiles': {}}
+        return {
+            'min': float(self.min),
+            'max': float(self.max),
+            'mean': self.mean,
+            'stdDev': math.sqrt(self.m2 / self.count),
+            'quantiles': {str(q): value for q, value in zip(quantiles, self.sketch.quantiles(quantiles))}
+        }
+
+
+def compute_normalization(token_file: str, layout: Layout, batch_size: int = BATCH_SIZE) -> Dict[str, Dict]:
+    """
+    Computes the normalization table over every token of a frequency file.
+
+    Args:
+        token_file: token -> frequency JSON file, read incrementally
+        layout: Layout the words are analyzed with
+        batch_size: Number of words analyzed per array batch
+
+    Returns:
+        Dict of metric name -> min, max, mean, stdDev and quantiles
+    """
+    tables = LayoutTables(layout)
+    stats = {name: RunningStats() for name in METRICS}
+    processed = 0
+
+    for batch in iter_json_batches(token_file, batch_size):
+        metrics = word_metrics([word for word, _ in batch], tables)
+        for name, key in METRICS.items():
+            stats[name].update(metrics[key])
+        processed += len(batch)
+        logging.info(f"Processed {processed} tokens")
+
+    return {name: running.to_dict() for name, running in stats.items()}
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    parser = argparse.ArgumentParser(description="Computes the scorer normalization table in one streaming pass.")
+    parser.add_argument('--input', default='filtered_token_frequencies.json', help="token -> frequency JSON file")
+    parser.add_argument('--output', default=DEFAULT_NORMALIZATION_FILE, help="where to write the normalization table")
+    parser.add_argument('--layout', default='Halmak', choices=sorted(PRESETS), help="preset layout to analyze with")
+    args = parser.parse_args(argv)
+
+    normalization = compute_normalization(args.input, PRESETS[args.layout])
+
+    with open(args.output, 'w', encoding='utf-8') as file:
+        json.dump(normalization, file, indent=4)
+
+    logging.info(f"Normalization table written to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
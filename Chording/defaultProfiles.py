@@ -0,0 +1,41 @@
+"""
+The profiles a new chord expander profiles file starts with.
+
+Kept apart from Chorder.py so that buildProfile.py can seed a profiles file
+without importing the GUI and keyboard hook dependencies.
+"""
+DEFAULT_PROFILES = {
+    "Default": {
+        "btw": "by the way",
+        "idk": "I don't know",
+        "omw": "on my way"
+    },
+    "Developer": {
+        "cls": "class",
+        "fn": "function",
+        "ret": "return",
+        "imp": "import",
+        "pr": "print"
+    },
+    "Medical": {
+        "pt": "patient",
+        "rx": "prescription",
+        "dx": "diagnosis",
+        "tx": "treatment",
+        "hx": "history"
+    },
+    "Legal": {
+        "def": "defendant",
+        "plt": "plaintiff",
+        "jdg": "judgment",
+        "crt": "court",
+        "att": "attorney"
+    },
+    "Student": {
+        "asap": "as soon as possible",
+        "tba": "to be announced",
+        "tbd": "to be determined",
+        "eg": "for example",
+        "ie": "that is"
+    }
+}
@@ -1,9 +1,5 @@
 import json
 
-# Load token_frequencies JSON from file
-with open('token_frequencies.json', 'r', encoding='utf-8') as file:
-    token_frequencies = json.load(file)
-
 # Function to filter tokens
 def filter_tokens(token_frequencies):
     filtered_tokens = {}
@@ -39,14 +35,22 @@ def filter_tokens(token_frequencies):
 
     return filtered_tokens
 
-# Apply the filter
-token_frequencies = filter_tokens(token_frequencies)
+def filter_token_file(input_file, output_file):
+    # Load token_frequencies JSON from file
+    with open(input_file, 'r', encoding='utf-8') as file:
+        token_frequencies = json.load(file)
+
+    # Apply the filter
+    token_frequencies = filter_tokens(token_frequencies)
+
+    # Sort tokens by frequency in descending order
+    token_frequencies = dict(sorted(token_frequencies.items(), key=lambda item: item[1], reverse=True))
 
-# Sort tokens by frequency in descending order
-token_frequencies = dict(sorted(token_frequencies.items(), key=lambda item: item[1], reverse=True))
+    # Save the filtered tokens to a new JSON file
+    with open(output_file, 'w', encoding='utf-8') as file:
+        json.dump(token_frequencies, file, ensure_ascii=False, indent=4)
 
-# Save the filtered tokens to a new JSON file
-with open('filtered_token_frequencies.json', 'w', encoding='utf-8') as file:
-    json.dump(token_frequencies, file, ensure_ascii=False, indent=4)
+    print(f"Filtered tokens saved to '{output_file}'")
 
-print("Filtered tokens saved to 'filtered_token_frequencies.json'")
\ No newline at end of file
+if __name__ == "__main__":
+    filter_token_file('token_frequencies.json', 'filtered_token_frequencies.json')
@@ -1,10 +1,17 @@
-import nltk
-from nltk.corpus import words
+import logging
+from collections import namedtuple
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
 
-nltk.download('words')
-english_words = set(words.words())
+from wordIndex import load_english_words
 
-def generate_chord(word, max_length):
+# mapped on first use, so importing the module needs no word index
+english_words = None
+
+# a word whose preferred chord was already taken; assigned is None when no free chord was left
+Collision = namedtuple('Collision', ['word', 'wanted', 'owner', 'assigned'])
+
+
+def _unique_letters(word):
     seen = set()
     shorthand = []
 
@@ -12,9 +19,19 @@ def generate_chord(word, max_length):
         if letter not in seen:
             shorthand.append(letter)
             seen.add(letter)
-        if len(shorthand) == max_length:
-            break
 
+    return shorthand
+
+
+def _english_words():
+    global english_words
+    if english_words is None:
+        english_words = load_english_words()
+    return english_words
+
+
+def _shorthand_to_chord(shorthand, word):
+    english_words = _english_words()
     result = ''.join(shorthand)
 
     if result in english_words:
@@ -22,36 +39,149 @@ def generate_chord(word, max_length):
             if letter not in shorthand:
                 result = result[:-1] + letter
                 break
-        
+
         if result in english_words:
             result = result[1:] + result[0]
 
     return result
 
-def create_chords(word_list):
+
+def generate_chord(word, max_length):
+    word = word.lower()
+    return _shorthand_to_chord(_unique_letters(word)[:max_length], word)
+
+
+def chord_candidates(word: str) -> Iterator[str]:
+    """
+    Lazily yields the chords a word may use, shortest and most preferred first.
+
+    These are generate_chord(word, n) for n = 2..len(word), followed by the
+    plain word prefixes create_chords used to fall back to. Each candidate
+    is yielded once and the unique letters are only collected once.
+    Chords are lower case, the case KeyboardController looks them up in,
+    so 'Definitely' and 'definitely' compete for the same chords.
+
+    Args:
+        word: The word to abbreviate
+
+    Yields:
+        Candidate chords in order of preference
+    """
+    word = word.lower()
+    letters = _unique_letters(word)
+    seen = set()
+
+    for max_length in range(2, len(word) + 1):
+        chord = _shorthand_to_chord(letters[:max_length], word)
+        if chord not in seen:
+            seen.add(chord)
+            yield chord
+        if max_length >= len(letters):
+            break  # longer lengths repeat the same shorthand
+
+    for length in range(max(1, min(2, len(word))), len(word) + 1):
+        chord = word[:length]
+        if chord not in seen:
+            seen.add(chord)
+            yield chord
+
+
+class ChordTrie:
+    """Prefix tree of the chords handed out so far, each ending in its owning word."""
+
+    _END = ''
+
+    def __init__(self):
+        self.root = {}
+        self.size = 0
+
+    def _node(self, chord: str) -> Optional[dict]:
+        node = self.root
+        for letter in chord:
+            node = node.get(letter)
+            if node is None:
+                return None
+        return node
+
+    def add(self, chord: str, word: str) -> bool:
+        """
+        Claims a chord for a word.
+
+        Returns:
+            False if the chord already belongs to another word
+        """
+        node = self.root
+        for letter in chord:
+            node = node.setdefault(letter, {})
+        if self._END in node:
+            return False
+        node[self._END] = word
+        self.size += 1
+        return True
+
+    def owner(self, chord: str) -> Optional[str]:
+        node = self._node(chord)
+        return None if node is None else node.get(self._END)
+
+    def __contains__(self, chord: str) -> bool:
+        return self.owner(chord) is not None
+
+    def __len__(self) -> int:
+        return self.size
+
+
+def allocate_chords(word_list: Iterable[str], used: Optional[ChordTrie] = None) -> Tuple[Dict[str, str], List[Collision]]:
+    """
+    Assigns every word the first of its candidate chords nobody owns yet.
+
+    No two words ever share a chord: a word whose candidates are all taken
+    stays unassigned and is reported instead. Words are handled in input
+    order, so the same input always yields the same chords and collisions.
+
+    Args:
+        word_list: Words to assign chords to, in order of priority
+        used: Chords that are already taken, updated in place
+
+    Returns:
+        Tuple of the word -> chord mapping and the collisions in input order
+    """
+    used = ChordTrie() if used is None else used
     chords = {}
-    used_chords = set()
+    collisions = []
+    handled = set()
 
     for word in word_list:
-        max_length = 2  # Start with 2-character shortcuts
-        while max_length <= len(word):
-            chord = generate_chord(word, max_length)
+        # repeats are skipped, also those of words that got no chord
+        if word in handled:
+            continue
+        handled.add(word)
 
-            if chord not in used_chords:
+        wanted = None
+        for chord in chord_candidates(word):
+            if wanted is None:
+                wanted = chord
+            if used.add(chord, word):
                 chords[word] = chord
-                used_chords.add(chord)
                 break
 
-            max_length += 1
+        if chords.get(word) != wanted:
+            collisions.append(Collision(word, wanted, used.owner(wanted), chords.get(word)))
 
-        # If no chord was assigned, assign a fallback chord
-        if word not in chords:
-            chords[word] = word[:max_length]
-            used_chords.add(word[:max_length])
+    return chords, collisions
+
+
+def create_chords(word_list):
+    chords, collisions = allocate_chords(word_list)
+
+    for collision in collisions:
+        if collision.assigned is None:
+            logging.warning(f"No free chord left for '{collision.word}', '{collision.wanted}' belongs to '{collision.owner}'")
 
     return chords
 
-# Example usage
-word_list = ["little", "thought", "apple", "banana", "orange"]
-result = create_chords(word_list)
-print(result)
+
+if __name__ == "__main__":
+    # Example usage
+    word_list = ["little", "thought", "apple", "banana", "orange"]
+    result = create_chords(word_list)
+    print(result)
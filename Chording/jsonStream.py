@@ -0,0 +1,90 @@
+"""
+Incremental reading of large flat JSON objects such as token_frequencies.json.
+"""
+import json
+from itertools import islice
+from typing import Any, Iterator, List, Tuple
+
+CHUNK_SIZE = 1 << 20
+
+_decoder = json.JSONDecoder()
+_WHITESPACE = ' \t\n\r'
+
+
+def iter_json_object(path: str, chunk_size: int = CHUNK_SIZE) -> Iterator[Tuple[str, Any]]:
+    """
+    Yields the (key, value) pairs of a top level JSON object one at a time,
+    without loading the whole document into memory.
+
+    Args:
+        path: Path to a JSON file holding a single object
+        chunk_size: Number of characters read per chunk
+
+    Yields:
+        Tuples of key and decoded value in file order
+    """
+    with open(path, 'r', encoding='utf-8') as file:
+        buffer = ""
+        position = 0
+        opened = False
+        exhausted = False
+
+        while True:
+            # drop consumed text and top up the buffer
+            if position > chunk_size:
+                buffer = buffer[position:]
+                position = 0
+            if not exhausted and len(buffer) - position < chunk_size:
+                chunk = file.read(chunk_size)
+                exhausted = not chunk
+                buffer += chunk
+
+            while position < len(buffer) and buffer[position] in _WHITESPACE + ',:':
+                position += 1
+            if position >= len(buffer):
+                if exhausted:
+                    raise ValueError(f"Unexpected end of JSON object in {path}")
+                continue
+
+            if not opened:
+                if buffer[position] != '{':
+                    raise ValueError(f"{path} does not hold a JSON object")
+                opened = True
+                position += 1
+                continue
+            if buffer[position] == '}':
+                return
+
+            try:
+                key, end = _decoder.raw_decode(buffer, position)
+                while end < len(buffer) and buffer[end] in _WHITESPACE + ':':
+                    end += 1
+                value, end = _decoder.raw_decode(buffer, end)
+            except json.JSONDecodeError:
+                if exhausted:
+                    raise
+                # the pair straddles the chunk boundary, read more and retry
+                chunk = file.read(chunk_size)
+                exhausted = not chunk
+                buffer += chunk
+                continue
+
+            if not exhausted and (end == len(buffer) or buffer[end] not in _WHITESPACE + ',}'):
+                # a number cut at the chunk boundary, e.g. 12 of 12.5, decodes on its own
+                chunk = file.read(chunk_size)
+                exhausted = not chunk
+                buffer += chunk
+                continue
+
+            position = end
+            yield key, value
+
+
+def iter_json_batches(path: str, batch_size: int) -> Iterator[List[Tuple[str, Any]]]:
+    """Groups iter_json_object pairs into lists of at most batch_size."""
+    pairs = iter_json_object(path)
+    while True:
+        batch = list(islice(pairs, batch_size))
+        if not batch:
+            return
+        yield batch
@@ -0,0 +1,228 @@
+"""
+Keyboard metrics tables and layout parsing, ported from Fitness/config.js,
+Fitness/layout.js and Fitness/presets.js.
+
+__NOTE__ all of the values are normalized by a 1/10th of a key size
+"""
+from collections import namedtuple
+from typing import Dict, List
+
+# a single physical key as seen by a layout symbol
+Key = namedtuple('Key', ['effort', 'distance', 'finger', 'hand', 'row', 'shift'])
+
+FINGER_NAMES = {
+    'a': 'l-pinky', 'b': 'l-ring', 'c': 'l-middle', 'd': 'l-point',
+    'h': 'r-pinky', 'g': 'r-ring', 'f': 'r-middle', 'e': 'r-point',
+    't': 'thumb'
+}
+
+# order used by Fitness/stats.js for all of the per-finger numbers
+FINGERS_ORDER = ['l-pinky', 'l-ring', 'l-middle', 'l-point', 'r-point', 'r-middle', 'r-ring', 'r-pinky']
+
+
+def _parse_grid(string: str) -> List[List[str]]:
+    """Parses a whitespace separated grid into a list of rows."""
+    return [line.split() for line in string.strip().split("\n")]
+
+
+def _build_grid(string: str) -> List[List]:
+    """Parses a grid and converts the numeric cells into ints."""
+    return [[int(value) if value.isdigit() else value for value in row] for row in _parse_grid(string)]
+
+
+# distances a finger must travel, those are measured from a standard keyboard
+DISTANCES = _build_grid("""
+  28 22 22 22 22 21 28 22 22 22 22 21 25
+     11 11 11 11 13 17 11 11 11 11 13 21 25
+     00 00 00 00 10 10 00 00 00 00 10 20
+       12 12 12 12 19 12 12 12 12 12
+  12               0               19
+""")
+
+# the hand movement efforts, based on real-life measurements, see MadRabbit/keyboard-analytics
+EFFORTS = _build_grid("""
+  17 14 08 08 13 16 23 19 09 08 07 15 17
+     06 02 01 06 11 14 09 01 01 07 09 13 18
+     01 00 00 00 07 07 00 00 00 01 05 11
+       07 08 10 06 10 04 02 05 05 03
+  05               00                 11
+""")
+
+# mapping of the row numbers, so we could count those too
+ROWS = _build_grid("""
+  4 4 4 4 4 4 4 4 4 4 4 4 4
+    3 3 3 3 3 3 3 3 3 3 3 3 3
+    2 2 2 2 2 2 2 2 2 2 2 2
+     1 1 1 1 1 1 1 1 1 1
+  0           0           0
+""")
+
+FINGERS = [[FINGER_NAMES[code] for code in row] for row in _parse_grid("""
+  a a b c d d e e f g g h h
+    a b c d d e e f g h h h h
+    a b c d d e e f g h h h
+     a b c d d e e f g h
+  a          t           h
+""")]
+
+THUMB_KEY = Key(effort=0, distance=0, finger='thumb', hand=None, row=0, shift=False)
+
+
+class Layout:
+    def __init__(self, name: str, config: str):
+        self.name = name
+        self.config = config
+
+    def __repr__(self) -> str:
+        return f"Layout({self.name!r})"
+
+    def to_metrics(self) -> Dict[str, Key]:
+        """
+        Creates the symbol -> key metrics mapping for the layout.
+
+        Unlike Fitness/layout.js the keys are matched by row and column rather
+        than by a running counter, so rows with fewer symbols than physical
+        keys (e.g. the QWERTZ top letter row) do not shift the following rows.
+
+        Returns:
+            Dict mapping every layout symbol to its Key
+        """
+        lines = [
+            ["\n" if symbol == "\\n" else symbol for symbol in line.split()]
+            for line in self.config.strip().split("\n")
+        ]
+        keys = {}
+
+        for row in range(len(lines) // 2):
+            normal_line = lines[row * 2]
+            shifted_line = lines[row * 2 + 1]
+
+            # symbols past the end of a physical row have no key to sit on
+            for column in range(min(len(normal_line), len(EFFORTS[row]))):
+                finger = FINGERS[row][column]
+                key = Key(
+                    effort=EFFORTS[row][column],
+                    distance=DISTANCES[row][column],
+                    finger=finger,
+                    hand=finger[0],
+                    row=ROWS[row][column],
+                    shift=False
+                )
+                keys[normal_line[column]] = key
+                if column < len(shifted_line):
+                    keys[shifted_line[column]] = key._replace(shift=True)
+
+        keys[' '] = THUMB_KEY
+        keys["\t"] = THUMB_KEY
+
+        for column, name in ((0, 'l-shift'), (2, 'r-shift')):
+            keys[name] = Key(
+                effort=EFFORTS[4][column],
+                distance=DISTANCES[4][column],
+                finger=FINGERS[4][column],
+                hand=name[0],
+                row=0,
+                shift=False
+            )
+
+        if "\n" in keys:
+            keys["\n"] = keys["\n"]._replace(shift=False)
+
+        return keys
+
+
+# Known preset layouts to measure against
+_PRESETS = {
+    'QWERTY': r"""
+  ` 1 2 3 4 5 6 7 8 9 0 - =
+   ~ ! @ # $ % ^ & * ( ) _ +
+     q w e r t y u i o p [ ] \
+     Q W E R T Y U I O P { } |
+     a s d f g h j k l ; ' \n
+     A S D F G H J K L : " \n
+      z x c v b n m , . /
+      Z X C V B N M < > ?
+  """,
+    'CorpalX': r"""
+  ` 1 2 3 4 5 6 7 8 9 0 - =
+   ~ ! @ # $ % ^ & * ( ) _ +
+     q g m l w y f u b ; [ ] \
+     Q G M L W Y F U B : { } |
+     d s t n r i a e o h ' \n
+     D S T N R I A E O H " \n
+      z x c v j k p , . /
+      Z X C V J K P < > ?
+  """,
+    'Workman': r"""
+  ` 1 2 3 4 5 6 7 8 9 0 - =
+   ~ ! @ # $ % ^ & * ( ) _ +
+     q d r w b j f u p ; [ ] \
+     Q D R W B J F U P : { } |
+     a s h t g y n e o i ' \n
+     A S H T G Y N E O I " \n
+      z x m c v k l , . /
+      Z X M C V K L < > ?
+  """,
+    'Workman-P': r"""
+  ` ! @ # $ % ^ & * ( ) - =
+   ~ 1 2 3 4 5 6 7 8 9 0 _ +
+     q d r w b j f u p ; { } \
+     Q D R W B J F U P : [ ] |
+     a s h t g y n e o i ' \n
+     A S H T G Y N E O I " \n
+      z x m c v k l , . /
+      Z X M C V K L < > ?
+  """,
+    'Colemak': r"""
+  ` 1 2 3 4 5 6 7 8 9 0 - =
+   ~ ! @ # $ % ^ & * ( ) _ +
+     q w f p g j l u y ; [ ] \
+     Q W F P G J L U Y : { } |
+     a r s t d h n e i o ' \n
+     A R S T D H N E I O " \n
+      z x c v b k m , . /
+      Z X C V B K M < > ?
+  """,
+    'Dvorak': r"""
+  ` 1 2 3 4 5 6 7 8 9 0 [ ]
+   ~ ! @ # $ % ^ & * ( ) { }
+     ' , . p y f g c r l / = \
+     " < > P Y F G C R L ? + |
+     a o e u i d h t n s - \n
+     A O E U I D H T N S _ \n
+      ; q j k x b m w v z
+      : Q J K X B M W V Z
+  """,
+    'Halmak': r"""
+  ` 1 2 3 4 5 6 7 8 9 0 - =
+   ~ ! @ # $ % ^ & * ( ) _ +
+     w l r b z ; q u d j [ ] \
+     W L R B Z : Q U D J { } |
+     s h n t , . a e o i ' \n
+     S H N T < > A E O I " \n
+      f m v c / g p x k y
+      F M V C ? G P X K Y
+  """,
+    'QWERTZ': r"""
+  ` 1 2 3 4 5 6 7 8 9 0 ß '
+   ~ ! " § $ % & / ( ) = ?
+     q w e r t z u i o p ü +
+     Q W E R T Z U I O P Ü *
+     a s d f g h j k l ö ä #
+     A S D F G H J K L Ö Ä '
+      y x c v b n m , . /
+      Y X C V B N M ; : _
+  """,
+    'CMOS': r"""
+  ` 1 2 3 4 5 6 7 8 9 0 ß ´
+   ~ ! " § $ % & / ( ) = ? `
+     j k u o ä p b l m ß x q w
+     J K U O Ä P B L M ß X Q W
+     h i e a d t n r s y . ü , \n
+     H I E A D T N R S Y : Ü ; \n
+      ö g c v z f ! ? " '
+      Ö G C V Z F : * @ #
+  """
+}
+
+PRESETS = {name: Layout(name, config) for name, config in _PRESETS.items()}
@@ -0,0 +1,149 @@
+"""
+Disk-backed cache of per word scores, keyed by layout and scoring config.
+
+Only the frequency independent part of the score is stored, so token counts
+can change freely while the cached strain values stay valid. Entries are
+namespaced by a hash of the parsed layout metrics and a hash of the
+normalization/weights, which means editing a layout or a weight simply
+starts a fresh namespace while the old one ages out through LRU eviction.
+"""
+import hashlib
+import json
+import logging
+import sqlite3
+from typing import Dict, Iterable, Optional
+
+from layoutMetrics import Layout
+
+DEFAULT_CACHE_FILE = 'score_cache.sqlite'
+DEFAULT_MAX_ENTRIES = 5000000
+
+
+def layout_hash(layout: Layout) -> str:
+    """Hashes the parsed layout metrics, so formatting-only edits keep their cache."""
+    metrics = sorted((symbol, list(key)) for symbol, key in layout.to_metrics().items())
+    return hashlib.sha256(json.dumps(metrics, ensure_ascii=False).encode('utf-8')).hexdigest()
+
+
+def config_hash(normalization: Dict, weights: Dict) -> str:
+    """Hashes the normalization bounds and scoring weights."""
+    payload = json.dumps({'normalization': normalization, 'weights': weights}, sort_keys=True)
+    return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+
+
+class ScoreCache:
+    """
+    SQLite store of (layout hash, config hash, token) -> weighted score with
+    least recently used eviction and hit/miss counters.
+    """
+
+    def __init__(self, path: str = DEFAULT_CACHE_FILE, max_entries: int = DEFAULT_MAX_ENTRIES):
+        self.path = path
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        self.logger = logging.getLogger('score_cache')
+
+        self.connection = sqlite3.connect(path)
+        self.connection.executescript("""
+            PRAGMA journal_mode = WAL;
+            PRAGMA synchronous = NORMAL;
+            CREATE TABLE IF NOT EXISTS scores (
+                namespace TEXT NOT NULL,
+                token     TEXT NOT NULL,
+                score     REAL,
+                last_used INTEGER NOT NULL,
+                PRIMARY KEY (namespace, token)
+            ) WITHOUT ROWID;
+            CREATE INDEX IF NOT EXISTS scores_last_used ON scores (last_used);
+            CREATE TABLE IF NOT EXISTS meta (
+                key   TEXT PRIMARY KEY,
+                value INTEGER NOT NULL
+            );
+            INSERT OR IGNORE INTO meta (key, value) VALUES ('clock', 0);
+        """)
+
+    @staticmethod
+    def namespace(layout: Layout, normalization: Dict, weights: Dict) -> str:
+        return f"{layout_hash(layout)}:{config_hash(normalization, weights)}"
+
+    def _tick(self) -> int:
+        """Advances and returns the logical clock used for LRU ordering."""
+        self.connection.execute("UPDATE meta SET value = value + 1 WHERE key = 'clock'")
+        return self.connection.execute("SELECT value FROM meta WHERE key = 'clock'").fetchone()[0]
+
+    def get_many(self, namespace: str, tokens: Iterable[str]) -> Dict[str, Optional[float]]:
+        """
+        Looks up cached scores for the given tokens.
+
+        Args:
+            namespace: Namespace from ScoreCache.namespace
+            tokens: Tokens to look up
+
+        Returns:
+            Dict of the cached tokens only; undefined scores are cached as None
+        """
+        tokens = list(tokens)
+        with self.connection:
+            clock = self._tick()
+            self.connection.execute("CREATE TEMP TABLE IF NOT EXISTS wanted (token TEXT PRIMARY KEY)")
+            self.connection.execute("DELETE FROM wanted")
+            self.connection.executemany("INSERT OR IGNORE INTO wanted (token) VALUES (?)", ((t,) for t in tokens))
+
+            found = dict(self.connection.execute("""
+                SELECT scores.token, scores.score FROM scores
+                JOIN wanted ON wanted.token = scores.token
+                WHERE scores.namespace = ?
+            """, (namespace,)))
+
+            self.connection.execute("""
+                UPDATE scores SET last_used = ?
+                WHERE namespace = ? AND token IN (SELECT token FROM wanted)
+            """, (clock, namespace))
+            self.connection.execute("DELETE FROM wanted")
+
+        self.hits += len(found)
+        self.misses += len(tokens) - len(found)
+        return found
+
+    def put_many(self, namespace: str, scores: Dict[str, Optional[float]]) -> None:
+        """
+        Stores scores and evicts the least recently used entries over the limit.
+
+        Args:
+            namespace: Namespace from ScoreCache.namespace
+            scores: Token -> weighted score, None for undefined scores
+        """
+        with self.connection:
+            clock = self._tick()
+            self.connection.executemany(
+                "INSERT OR REPLACE INTO scores (namespace, token, score, last_used) VALUES (?, ?, ?, ?)",
+                ((namespace, token, score, clock) for token, score in scores.items())
+            )
+            self._evict()
+
+    def _evict(self) -> None:
+        excess = len(self) - self.max_entries
+        if excess > 0:
+            self.connection.execute("""
+                DELETE FROM scores WHERE (namespace, token) IN (
+                    SELECT namespace, token FROM scores ORDER BY last_used LIMIT ?
+                )
+            """, (excess,))
+            self.logger.info(f"Evicted {excess} least recently used scores")
+
+    def __len__(self) -> int:
+        return self.connection.execute("SELECT COUNT(*) FROM scores").fetchone()[0]
+
+    def stats(self) -> Dict[str, int]:
+        """Returns the hit/miss counters of this session and the stored entry count."""
+        return {'hits': self.hits, 'misses': self.misses, 'entries': len(self)}
+
+    def close(self) -> None:
+        self.connection.close()
+
+    def __enter__(self) -> 'ScoreCache':
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
@@ -0,0 +1,301 @@
+"""
+Vectorized word effort scoring, the Python counterpart of Fitness/scoreWords.js.
+
+Words are encoded as padded matrices of unicode code points and every key
+metric is looked up from dense per-layout tables, so a whole batch of words
+is analyzed with a handful of NumPy operations instead of walking each word.
+"""
+import argparse
+import json
+import logging
+import os
+from typing import Dict, Iterable, List, Optional
+
+import numpy as np
+
+from layoutMetrics import FINGERS_ORDER, PRESETS, Layout
+from scoreCache import DEFAULT_CACHE_FILE, ScoreCache
+
+logging.basicConfig(
+    level=logging.INFO,
+    format='%(asctime)s - %(levelname)s - %(message)s'
+)
+
+# Scoring weights
+WEIGHTS = {
+    'effort': 0.3,
+    'distance': 0.3,
+    'fingers': 0.2,
+    'hands': 0.1,
+    'rows': 0.1
+}
+
+# Copy of Fitness/normalization.js
+NORMALIZATION = {
+    'effort': {'min': 0, 'max': 695, 'mean': 18.747022534312368, 'stdDev': 23.433131168398496},
+    'distance': {'min': 0, 'max': 1036, 'mean': 46.639459163444975, 'stdDev': 40.50654607090411},
+    'symmetry': {'min': 63, 'max': 100, 'mean': 98.37921074817574, 'stdDev': 2.5778009340344603},
+    'evenness': {'min': 44, 'max': 100, 'mean': 79.29150435775455, 'stdDev': 7.603102499753671},
+    'fingers': {'min': 0, 'max': 100},
+    'hands': {'min': 0, 'max': 100},
+    'rows': {'min': 0, 'max': 100}
+}
+
+MAX_CODEPOINT = 0x110000
+UNKNOWN = -1
+THUMB = len(FINGERS_ORDER)
+NUMBER_ROW = 4
+BATCH_SIZE = 100000
+DEFAULT_NORMALIZATION_FILE = 'normalization.json'
+STRENGTHS = np.array([0.75, 0.9, 1.0, 0.95, 0.95, 1.0, 0.9, 0.75])
+MIRRORED_FINGERS = [7, 6, 5, 4]
+
+
+class LayoutTables:
+    """Dense code point -> key metric lookup tables for a single layout."""
+
+    def __init__(self, layout: Layout):
+        self.layout = layout
+        self.effort = np.zeros(MAX_CODEPOINT, dtype=np.int32)
+        self.distance = np.zeros(MAX_CODEPOINT, dtype=np.int32)
+        self.finger = np.full(MAX_CODEPOINT, UNKNOWN, dtype=np.int8)
+        self.row = np.zeros(MAX_CODEPOINT, dtype=np.int8)
+
+        for symbol, key in layout.to_metrics().items():
+            if len(symbol) != 1:
+                continue  # l-shift / r-shift are never typed as part of a word
+            codepoint = ord(symbol)
+            self.effort[codepoint] = key.effort
+            self.distance[codepoint] = key.distance
+            self.finger[codepoint] = THUMB if key.finger == 'thumb' else FINGERS_ORDER.index(key.finger)
+            self.row[codepoint] = key.row
+
+
+def encode_words(words: List[str]) -> np.ndarray:
+    """
+    Encodes words as a zero padded matrix of unicode code points.
+
+    Args:
+        words: Words to encode
+
+    Returns:
+        uint32 array of shape (len(words), longest word)
+    """
+    lengths = np.fromiter(map(len, words), dtype=np.int64, count=len(words))
+    width = int(lengths.max()) if len(words) else 0
+    codepoints = np.frombuffer("".join(words).encode('utf-32-le'), dtype=np.uint32)
+
+    matrix = np.zeros((len(words), width), dtype=np.uint32)
+    matrix[np.arange(width) < lengths[:, None]] = codepoints
+    return matrix
+
+
+def _percentify(values: np.ndarray) -> np.ndarray:
+    """Math.round(value * 100) from Fitness/stats.js."""
+    return np.floor(values * 100 + 0.5)
+
+
+def _percentages(counts: np.ndarray) -> np.ndarray:
+    """Row-wise percentages of the totals from Fitness/stats.js."""
+    total = counts.sum(axis=1, keepdims=True)
+    return _percentify(counts / total)
+
+
+def _diff(one: np.ndarray, two) -> np.ndarray:
+    """Math.min(one, two) / Math.max(one, two) || 1 from Fitness/stats.js."""
+    smaller = np.minimum(one, two)
+    return np.where(smaller > 0, smaller / np.maximum(one, two), 1.0)
+
+
+def word_metrics(words: List[str], tables: LayoutTables) -> Dict[str, np.ndarray]:
+    """
+    Computes the Fitness/word-analysis.js stats for a batch of words.
+
+    Words typed with number row keys or without any finger keys get NaN
+    usage numbers, the same values the JavaScript stats end up with. The
+    symmetry of number row words only looks at the letter rows.
+
+    Args:
+        words: Words to analyze
+        tables: Lookup tables of the layout to type them with
+
+    Returns:
+        Dict with effort, distance, symmetry, evenness and the fingers/hands/rows
+        usage percentages
+    """
+    matrix = encode_words(words)
+    fingers = tables.finger[matrix]
+    rows = tables.row[matrix]
+    typed = (fingers != UNKNOWN) & (fingers != THUMB)
+
+    # one bincount over (word, finger, row) cells instead of a pass per cell
+    cells = len(FINGERS_ORDER) * (NUMBER_ROW + 1)
+    word_index = np.broadcast_to(np.arange(len(words))[:, None], matrix.shape)
+    flat = word_index[typed] * cells + fingers[typed].astype(np.int64) * (NUMBER_ROW + 1) + rows[typed]
+    counts = np.bincount(flat, minlength=len(words) * cells).reshape(len(words), len(FINGERS_ORDER), NUMBER_ROW + 1)
+
+    per_finger = counts.sum(axis=2)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        fingers_usage = _percentages(per_finger)
+        hands_usage = _percentages(np.stack([per_finger[:, :4].sum(axis=1), per_finger[:, 4:].sum(axis=1)], axis=1))
+        rows_usage = _percentages(counts[:, :, :NUMBER_ROW].sum(axis=1))
+
+        # row by row diffs between mirrored fingers, skipping the space bar row
+        symmetry = _percentify(_diff(counts[:, :4, 1:NUMBER_ROW], counts[:, MIRRORED_FINGERS, 1:NUMBER_ROW]).mean(axis=(1, 2)))
+
+    number_row = counts[:, :, NUMBER_ROW].sum(axis=1) > 0
+    for usage in (fingers_usage, hands_usage, rows_usage):
+        usage[number_row] = np.nan
+
+    with np.errstate(invalid='ignore'):
+        evenness = _percentify(_diff(fingers_usage / STRENGTHS, 12.5).mean(axis=1))
+
+    return {
+        'effort': tables.effort[matrix].sum(axis=1),
+        'distance': tables.distance[matrix].sum(axis=1),
+        'symmetry': symmetry,
+        'evenness': evenness,
+        'fingers_usage': fingers_usage,
+        'hands_usage': hands_usage,
+        'rows_usage': rows_usage
+    }
+
+
+def load_normalization(path: str = DEFAULT_NORMALIZATION_FILE) -> Dict:
+    """
+    Loads the normalization table written by dataStats.py.
+
+    Args:
+        path: Path to the normalization JSON file
+
+    Returns:
+        The stored table, or the Fitness/normalization.js constants if there is none yet
+    """
+    if not os.path.exists(path):
+        logging.warning(f"{path} not found, using the built-in normalization constants")
+        return NORMALIZATION
+    with open(path, 'r', encoding='utf-8') as file:
+        return json.load(file)
+
+
+def _normalize(values: np.ndarray, bounds: Dict[str, float]) -> np.ndarray:
+    return (values - bounds['min']) / (bounds['max'] - bounds['min'])
+
+
+def weighted_scores(metrics: Dict[str, np.ndarray], normalization: Dict = NORMALIZATION,
+                    weights: Dict[str, float] = WEIGHTS) -> np.ndarray:
+    """
+    Frequency independent part of calculateScore from Fitness/scoreWords.js.
+
+    Args:
+        metrics: Output of word_metrics
+        normalization: Normalization bounds per metric
+        weights: Scoring weights per metric
+
+    Returns:
+        Weighted strain score per word, NaN where the stats are undefined
+    """
+    effort = _normalize(metrics['effort'], normalization['effort'])
+    distance = _normalize(metrics['distance'], normalization['distance'])
+    fingers_imbalance = _normalize(metrics['fingers_usage'].var(axis=1), normalization['fingers'])
+    hands_imbalance = _normalize(np.abs(50 - metrics['hands_usage'][:, 0]), normalization['hands'])
+    rows_imbalance = _normalize(metrics['rows_usage'].var(axis=1), normalization['rows'])
+
+    return (
+        weights['effort'] * effort +
+        weights['distance'] * distance +
+        weights['fingers'] * fingers_imbalance +
+        weights['hands'] * hands_imbalance +
+        weights['rows'] * rows_imbalance
+    )
+
+
+def _length_sorted_batches(words: List[str], batch_size: int) -> Iterable[np.ndarray]:
+    """Yields index batches of similar word lengths to keep the padding small."""
+    lengths = np.fromiter(map(len, words), dtype=np.int64, count=len(words))
+    order = np.argsort(lengths, kind='stable')
+    for start in range(0, len(order), batch_size):
+        yield order[start:start + batch_size]
+
+
+def score_words(tokens: Dict[str, int], layout: Layout, normalization: Dict = NORMALIZATION,
+                weights: Dict[str, float] = WEIGHTS, batch_size: int = BATCH_SIZE,
+                cache: Optional[ScoreCache] = None) -> Dict[str, Dict]:
+    """
+    Scores every token by frequency times its weighted typing strain.
+
+    Args:
+        tokens: Token -> frequency mapping
+        layout: Layout to type the tokens with
+        normalization: Normalization bounds per metric
+        weights: Scoring weights per metric
+        batch_size: Number of words analyzed per array batch
+        cache: Optional score cache, only tokens missing from it are analyzed
+
+    Returns:
+        Dict mapping each token to its frequency and score (None if undefined)
+    """
+    words = list(tokens)
+    frequencies = np.fromiter(tokens.values(), dtype=np.float64, count=len(words))
+    scores = np.full(len(words), np.nan, dtype=np.float64)
+
+    pending = np.arange(len(words))
+    if cache is not None:
+        namespace = ScoreCache.namespace(layout, normalization, weights)
+        cached = cache.get_many(namespace, words)
+        hit = np.fromiter((word in cached for word in words), dtype=bool, count=len(words))
+        scores[hit] = [np.nan if cached[words[i]] is None else cached[words[i]] for i in np.flatnonzero(hit)]
+        pending = np.flatnonzero(~hit)
+
+    if len(pending):
+        tables = LayoutTables(layout)
+        pending_words = [words[i] for i in pending]
+        for batch in _length_sorted_batches(pending_words, batch_size):
+            batch_words = [pending_words[i] for i in batch]
+            scores[pending[batch]] = weighted_scores(word_metrics(batch_words, tables), normalization, weights)
+
+        if cache is not None:
+            cache.put_many(namespace, {
+                words[i]: float(scores[i]) if np.isfinite(scores[i]) else None for i in pending
+            })
+
+    scores *= frequencies
+    return {
+        word: {
+            'frequency': tokens[word],
+            'score': float(score) if np.isfinite(score) else None
+        }
+        for word, score in zip(words, scores.tolist())
+    }
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    parser = argparse.ArgumentParser(description="Scores tokens by the typing strain on a keyboard layout.")
+    parser.add_argument('--input', default='tokens.json', help="token -> frequency JSON file")
+    parser.add_argument('--output', default='scored_tokens.json', help="where to write the scored tokens")
+    parser.add_argument('--layout', default='QWERTZ', choices=sorted(PRESETS), help="preset layout to score with")
+    parser.add_argument('--normalization', default=DEFAULT_NORMALIZATION_FILE, help="normalization table from dataStats.py")
+    parser.add_argument('--cache', default=DEFAULT_CACHE_FILE, help="score cache database")
+    parser.add_argument('--no-cache', action='store_true', help="score every token from scratch")
+    args = parser.parse_args(argv)
+
+    with open(args.input, 'r', encoding='utf-8') as file:
+        tokens = json.load(file)
+
+    normalization = load_normalization(args.normalization)
+
+    if args.no_cache:
+        scored_tokens = score_words(tokens, PRESETS[args.layout], normalization)
+    else:
+        with ScoreCache(args.cache) as cache:
+            scored_tokens = score_words(tokens, PRESETS[args.layout], normalization, cache=cache)
+            logging.info(f"Score cache: {cache.stats()}")
+
+    with open(args.output, 'w', encoding='utf-8') as file:
+        json.dump(scored_tokens, file, indent=2)
+
+    logging.info(f"Scores calculated for {len(scored_tokens)} tokens and saved to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,85 @@
+import json
+import logging
+import os
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from buildProfile import STAGES, run_pipeline, write_profile  # noqa: E402
+from defaultProfiles import DEFAULT_PROFILES  # noqa: E402
+from wordIndex import build_index  # noqa: E402
+
+CORPUS = "The thought was that the little apple and the orange thought alike. " * 50
+
+
+def write_json(path, data):
+    with open(path, 'w', encoding='utf-8') as file:
+        json.dump(data, file)
+    return str(path)
+
+
+def read_json(path):
+    with open(path, 'r', encoding='utf-8') as file:
+        return json.load(file)
+
+
+def test_new_profiles_file_starts_with_the_default_profiles(tmp_path):
+    chords = write_json(tmp_path / "chords.json", {'definitely': 'de', 'because': 'bc'})
+    profiles_file = tmp_path / "profiles.json"
+
+    assert write_profile(chords, str(profiles_file), 'Generated') == 2
+
+    profiles = read_json(profiles_file)
+    assert profiles == dict(DEFAULT_PROFILES, Generated={'de': 'definitely', 'bc': 'because'})
+    assert 'Generated' not in DEFAULT_PROFILES
+
+
+def test_existing_profiles_are_kept(tmp_path):
+    chords = write_json(tmp_path / "chords.json", {'definitely': 'de'})
+    existing = {'Default': {'ty': 'thank you'}, 'Generated': {'old': 'chord'}}
+    profiles_file = write_json(tmp_path / "profiles.json", existing)
+
+    write_profile(chords, profiles_file, 'Generated')
+
+    assert read_json(profiles_file) == {'Default': {'ty': 'thank you'}, 'Generated': {'de': 'definitely'}}
+
+
+def test_stage_with_a_deleted_output_is_built_again(tmp_path, caplog):
+    caplog.set_level(logging.INFO)
+    corpus = tmp_path / "corpus.txt"
+    corpus.write_text(CORPUS, encoding='utf-8')
+    cache_dir = str(tmp_path / "cache")
+
+    tokens = run_pipeline({'corpus': str(corpus)}, {}, cache_dir, jobs=1, stages=STAGES[:1])['tokens.txt']
+    expected = open(tokens, encoding='utf-8').read()
+    os.remove(tokens)
+
+    caplog.clear()
+    assert run_pipeline({'corpus': str(corpus)}, {}, cache_dir, jobs=1, stages=STAGES[:1])['tokens.txt'] == tokens
+    assert open(tokens, encoding='utf-8').read() == expected
+    assert "Running stage 'tokenize'" in caplog.text
+
+
+def test_chords_are_built_with_the_supplied_word_index(tmp_path, caplog):
+    caplog.set_level(logging.INFO)
+    corpus = tmp_path / "corpus.txt"
+    corpus.write_text(CORPUS, encoding='utf-8')
+    index = str(tmp_path / "words.idx")
+    build_index(['th', 'ht'], index)
+    external = {'corpus': str(corpus), 'english_words.idx': index}
+    params = {'normalization': {'layout': 'QWERTY'}, 'score': {'layout': 'QWERTY'},
+              'chords': {'limit': 100, 'candidates': 10}}
+    cache_dir = str(tmp_path / "cache")
+
+    chords = read_json(run_pipeline(external, params, cache_dir, jobs=2)['chords.json'])
+    assert chords and 'thought' in chords
+    assert chords['thought'] not in ('th', 'ht')
+    assert "Running stage 'word_index'" not in caplog.text
+
+    # another word list is another input of the chords stage
+    build_index(['to'], index)
+    caplog.clear()
+    run_pipeline(external, params, cache_dir, jobs=2)
+    assert "Running stage 'chords'" in caplog.text
+    assert "Stage 'score' is up to date" in caplog.text
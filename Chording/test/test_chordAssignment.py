@@ -0,0 +1,66 @@
+import os
+import random
+import sys
+
+import pytest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+import generateChord  # noqa: E402
+from chordAssignment import assign_chords, effort_weights, total_saving  # noqa: E402
+from generateChord import allocate_chords  # noqa: E402
+
+
+@pytest.fixture(autouse=True)
+def english_words(monkeypatch):
+    # a small fixed word list instead of the English word index
+    monkeypatch.setattr(generateChord, 'english_words', {'at', 'as', 'in', 'is', 'it', 'no', 'on', 'so', 'to'})
+
+
+def adversarial_frequencies(count=2000, seed=30):
+    """Words over a few letters, the rarest first, so input order hands the short chords to rare words."""
+    rng = random.Random(seed)
+    frequencies = {}
+    while len(frequencies) < count:
+        word = "".join(rng.choice("aeinorst") for _ in range(rng.randint(3, 8)))
+        frequencies[word] = int(rng.paretovariate(1.2) * 10)
+    return dict(sorted(frequencies.items(), key=lambda item: item[1]))
+
+
+def test_solver_beats_input_order_greedy():
+    frequencies = adversarial_frequencies()
+    chords, report = assign_chords(frequencies)
+    greedy_chords, _ = allocate_chords(frequencies)
+
+    assert len(set(chords.values())) == len(chords)
+    assert report['keystrokes_saved'] == total_saving(chords, frequencies)
+    assert report['greedy_keystrokes_saved'] == total_saving(greedy_chords, frequencies)
+    assert report['saved_over_greedy'] > 0
+
+
+def test_frequent_word_gets_the_chord_a_rare_word_wants_first():
+    chords, report = assign_chords({'abcde': 1, 'abxyz': 1000})
+
+    assert chords == {'abxyz': 'ab', 'abcde': 'abc'}
+    # input order gives 'ab' to the rare word and 'abx' to the frequent one
+    assert report['greedy_keystrokes_saved'] == 1 * 3 + 1000 * 2
+    assert report['keystrokes_saved'] == 1 * 2 + 1000 * 3
+
+
+def test_effort_scores_decide_between_equally_frequent_words():
+    frequencies = {'abcd': 10, 'abce': 10}
+    scores = {'abcd': 5.0, 'abce': 50.0}
+    chords, report = assign_chords(frequencies, scores=scores)
+
+    assert chords['abce'] == 'ab'
+    assert report['effort_saved'] == total_saving(chords, effort_weights(scores))
+    assert report['effort_saved'] >= report['greedy_effort_saved']
+    assert assign_chords(frequencies)[0]['abcd'] == 'ab'
+
+
+def test_case_variants_get_different_lower_case_chords():
+    chords, _ = assign_chords({'Definitely': 5, 'definitely': 50})
+
+    assert chords['definitely'] == 'de'
+    assert chords['Definitely'] == chords['Definitely'].lower() != 'de'
@@ -0,0 +1,85 @@
+import json
+import os
+import sys
+
+import pytest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from chordConflicts import (PER_WORDS, analyze_conflicts, load_generated_chords, load_profile_chords,  # noqa: E402
+                            main, typed_frequencies)
+
+FREQUENCIES = {
+    "the": 600, "def": 30, "Def.": 10, "de-f": 5, ",": 1000, "pt": 20, "PT": 5,
+    "patient": 40, "definitely": 300, "don't": 8, "...": 50,
+}
+# every token with a letter or digit is a typed word, the punctuation is not
+TOTAL_WORDS = 600 + 30 + 10 + 5 + 20 + 5 + 40 + 300 + 8
+
+PROFILES = {
+    "Default": {"btw": "by the way"},
+    "Legal": {"def": "defendant"},
+    "Medical": {"pt": "patient", "rx": "prescription"},
+    "Generated": {"dont": "don't", "De": "Definitely"},
+}
+
+
+def write_json(path, data):
+    with open(path, 'w', encoding='utf-8') as file:
+        json.dump(data, file)
+    return str(path)
+
+
+def risk(occurrences):
+    return occurrences / TOTAL_WORDS * PER_WORDS
+
+
+def test_conflicts_are_ranked_by_accidental_expansions(tmp_path):
+    frequencies = write_json(tmp_path / "token_frequencies.json", FREQUENCIES)
+    profiles = write_json(tmp_path / "profiles.json", PROFILES)
+
+    conflicts = analyze_conflicts(load_profile_chords(profiles), frequencies)
+
+    assert [(c.chord, c.expansion, c.profile, c.occurrences) for c in conflicts] == [
+        ("def", "defendant", "Legal", 45),
+        ("pt", "patient", "Medical", 25),
+        ("dont", "don't", "Generated", 8),
+        # a chord with a capital letter never fires, on_press looks up the lower case word
+        ("De", "Definitely", "Generated", 0),
+        ("btw", "by the way", "Default", 0),
+        ("rx", "prescription", "Medical", 0),
+    ]
+    for conflict in conflicts:
+        assert conflict.risk == pytest.approx(risk(conflict.occurrences))
+
+
+def test_typed_forms_do_not_depend_on_the_batch_size(tmp_path):
+    frequencies = write_json(tmp_path / "token_frequencies.json", FREQUENCIES)
+
+    forms, totals, total_words = typed_frequencies(frequencies, 4)
+
+    assert dict(zip(forms.tolist(), totals.tolist())) == {"the": 600, "def": 45, "pt": 25, "dont": 8}
+    assert total_words == TOTAL_WORDS
+    for batch_size in (1, 2, 3):
+        smaller = typed_frequencies(frequencies, 4, batch_size)
+        assert smaller[0].tolist() == forms.tolist()
+        assert smaller[1].tolist() == totals.tolist()
+        assert smaller[2] == total_words
+
+
+def test_report_of_generated_chords(tmp_path, capsys):
+    frequencies = write_json(tmp_path / "token_frequencies.json", FREQUENCIES)
+    chords = write_json(tmp_path / "chords.json", {"the": "th", "patient": "pt", "definitely": "def"})
+    output = tmp_path / "misfires.json"
+
+    main(['--frequencies', frequencies, '--chords', chords, '--output', str(output), '--top', '1'])
+
+    with open(output, 'r', encoding='utf-8') as file:
+        report = json.load(file)
+    assert [(entry['chord'], entry['expansion'], entry['occurrences']) for entry in report] == [
+        ("def", "definitely", 45), ("pt", "patient", 25), ("th", "the", 0)]
+    assert all(entry['profile'] == chords for entry in report)
+    printed = capsys.readouterr().out.splitlines()
+    assert len(printed) == 1 and "'def' -> 'definitely'" in printed[0]
+    assert load_generated_chords(chords)[0] == ("th", "the", chords)
@@ -0,0 +1,86 @@
+import json
+import os
+import sys
+from collections import Counter
+
+import pytest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from codeTokenization import compute_code_frequency_json, count_batch, count_snippet, split_identifier  # noqa: E402
+
+SNIPPET = '''def parse_http_request(rawRequest, maxSize=1024):
+    """Parses the request line of a raw HTTP request."""
+    # the header words are not identifiers
+    if rawRequest is None or len(rawRequest) > maxSize:
+        return None
+    return HTTPServer.parseHTTPRequest(rawRequest, 'utf-8 text')
+'''
+
+BROKEN = '''class Broken:
+    def method(self):
+        text = """an unterminated docstring
+        never_counted = 1
+'''
+
+INDENTED = '''if ready:
+        first_value = 1
+    second_value = 2
+'''
+
+
+def counted(snippet):
+    counts = Counter()
+    count_snippet(snippet, counts)
+    return counts
+
+
+@pytest.mark.parametrize('name, parts', [
+    ('parse_http_request', ['parse', 'http', 'request']),
+    ('parseHTTPRequest', ['parse', 'http', 'request']),
+    ('HTTPServer', ['http', 'server']),
+    ('__init__', ['init']),
+    ('utf8_decode2', ['utf', 'decode']),
+    ('x', ['x']),
+])
+def test_identifiers_are_split_into_lower_case_parts(name, parts):
+    assert split_identifier(name) == parts
+
+
+def test_keywords_and_identifier_parts_without_strings_and_comments():
+    assert counted(SNIPPET) == Counter({
+        'def': 1, 'if': 1, 'is': 1, 'or': 1, 'None': 2, 'return': 2,
+        'parse': 2, 'http': 3, 'request': 6, 'raw': 4, 'max': 2, 'size': 2, 'len': 1, 'server': 1,
+    })
+
+
+def test_snippets_that_do_not_tokenize_keep_their_names():
+    # the names before the unterminated string count, the lines after it are read by the identifier pattern
+    assert counted(BROKEN) == Counter({'class': 1, 'broken': 1, 'def': 1, 'method': 1, 'self': 1, 'text': 1,
+                                       'never': 1, 'counted': 1})
+    # inconsistent indentation: the rest of the snippet is read by the identifier pattern
+    assert counted(INDENTED) == Counter({'if': 1, 'ready': 1, 'first': 1, 'second': 1, 'value': 2})
+
+
+def test_a_broken_snippet_does_not_throw_off_the_rest_of_the_batch():
+    # the string BROKEN leaves open is closed by the docstring quotes of the last SNIPPET
+    snippets = [SNIPPET, BROKEN.rstrip('\n'), INDENTED, SNIPPET]
+    expected = sum((counted(snippet) for snippet in snippets), Counter())
+
+    assert count_batch("\n\n".join(snippets)) == expected
+    assert count_batch("\n\n".join([SNIPPET, SNIPPET])) == counted(SNIPPET) + counted(SNIPPET)
+
+
+def test_frequency_file_of_a_corpus(tmp_path):
+    snippets = [SNIPPET, BROKEN.rstrip('\n'), INDENTED] * 20
+    corpus = tmp_path / "python_Data.txt"
+    corpus.write_text("\n\n".join(snippets), encoding='utf-8')
+    output = tmp_path / "token_frequencies.json"
+
+    compute_code_frequency_json(str(corpus), str(output), jobs=2, batch_size=300)
+
+    with open(output, 'r', encoding='utf-8') as file:
+        frequencies = json.load(file)
+    assert frequencies == dict(sum((counted(snippet) for snippet in snippets), Counter()))
+    assert list(frequencies.values()) == sorted(frequencies.values(), reverse=True)
@@ -0,0 +1,76 @@
+import os
+import random
+import sys
+
+import pytest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+import generateChord  # noqa: E402
+from generateChord import ChordTrie, allocate_chords, chord_candidates  # noqa: E402
+
+ENGLISH_WORDS = {'at', 'an', 'as', 'be', 'he', 'in', 'is', 'it', 'no', 'on', 'so', 'to', 'the', 'ten', 'tea', 'eat'}
+
+
+@pytest.fixture(autouse=True)
+def english_words(monkeypatch):
+    # a small fixed word list instead of the English word index
+    monkeypatch.setattr(generateChord, 'english_words', ENGLISH_WORDS)
+
+
+def vocabulary(count=3000, seed=29):
+    """Words over a few letters, so that most preferred chords are wanted by several words."""
+    rng = random.Random(seed)
+    return ["".join(rng.choice("aeinost") for _ in range(rng.randint(2, 7))) for _ in range(count)]
+
+
+def test_no_two_words_share_a_chord():
+    words = vocabulary()
+    chords, collisions = allocate_chords(words)
+
+    assert len(set(chords.values())) == len(chords)
+    unassigned = {collision.word for collision in collisions if collision.assigned is None}
+    assert set(chords) | unassigned == set(words)
+    assert not set(chords) & unassigned
+    for word, chord in chords.items():
+        assert chord in chord_candidates(word)
+
+
+def test_collisions_list_every_displaced_word():
+    words = vocabulary()
+    chords, collisions = allocate_chords(words)
+
+    displaced = [word for word in dict.fromkeys(words) if chords.get(word) != next(chord_candidates(word))]
+    assert displaced
+    assert [collision.word for collision in collisions] == displaced
+
+    owners = {chord: word for word, chord in chords.items()}
+    for collision in collisions:
+        assert collision.wanted == next(chord_candidates(collision.word))
+        assert collision.owner == owners[collision.wanted] != collision.word
+        assert collision.assigned == chords.get(collision.word)
+
+
+def test_taken_chords_are_never_handed_out_again():
+    used = ChordTrie()
+    used.add('ab', 'existing')
+    chords, collisions = allocate_chords(['ab', 'abc', 'ab'], used)
+
+    assert chords == {'abc': 'abc'}
+    assert collisions == [generateChord.Collision('ab', 'ab', 'existing', None),
+                          generateChord.Collision('abc', 'ab', 'existing', 'abc')]
+    assert used.owner('ab') == 'existing'
+    assert used.owner('abc') == 'abc'
+    assert len(used) == 2
+
+
+def test_chords_are_lower_case_and_case_variants_do_not_share_them():
+    # KeyboardController looks chords up in lower case, a chord with a capital could never fire
+    chords, collisions = allocate_chords(['Definitely', 'definitely', 'DEFINE'])
+
+    assert all(chord == chord.lower() for chord in chords.values())
+    assert len(set(chords.values())) == len(chords) == 3
+    assert chords['Definitely'] == 'de'
+    assert [collision.word for collision in collisions] == ['definitely', 'DEFINE']
+    assert list(chord_candidates('Definitely')) == list(chord_candidates('definitely'))
@@ -0,0 +1,55 @@
+import json
+import os
+import random
+import sys
+
+import pytest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from jsonStream import iter_json_batches, iter_json_object  # noqa: E402
+
+
+def sample_object(count=200, seed=28):
+    """Keys with escapes and non ASCII letters, values of every JSON type with numbers of every shape."""
+    rng = random.Random(seed)
+    values = [lambda: rng.randint(-10 ** 6, 10 ** 6), lambda: rng.uniform(-1e3, 1e3), lambda: rng.random() * 1e-9,
+              lambda: 1.5e300, lambda: True, lambda: False, lambda: None, lambda: 'a "quoted" ünïcode\nline',
+              lambda: [1, 2.25, {'x': 'y'}], lambda: {'frequency': rng.randint(1, 99), 'score': rng.random()}]
+    return {f"key {i} \\ \"ß\"": rng.choice(values)() for i in range(count)}
+
+
+def write(path, text):
+    with open(path, 'w', encoding='utf-8') as file:
+        file.write(text)
+    return str(path)
+
+
+@pytest.mark.parametrize('chunk_size', [1, 2, 3, 5, 7, 16, 64, 1 << 20])
+@pytest.mark.parametrize('indent', [None, 4])
+def test_every_chunk_size_decodes_the_same_pairs(tmp_path, chunk_size, indent):
+    data = sample_object()
+    path = write(tmp_path / "data.json", json.dumps(data, ensure_ascii=False, indent=indent))
+
+    assert list(iter_json_object(path, chunk_size)) == list(data.items())
+
+
+@pytest.mark.parametrize('chunk_size', range(1, 24))
+def test_numbers_split_at_the_chunk_boundary(tmp_path, chunk_size):
+    path = write(tmp_path / "data.json", '{"a": 12.5, "b": 1, "c": -3e-2,"d":7}')
+
+    assert list(iter_json_object(path, chunk_size)) == [('a', 12.5), ('b', 1), ('c', -0.03), ('d', 7)]
+
+
+def test_batches(tmp_path):
+    data = {str(i): i for i in range(10)}
+    path = write(tmp_path / "data.json", json.dumps(data))
+
+    assert [len(batch) for batch in iter_json_batches(path, 4)] == [4, 4, 2]
+
+
+@pytest.mark.parametrize('text', ['[1, 2]', '{"a": 1', '{"a": 12.}'])
+def test_malformed_documents_raise(tmp_path, text):
+    with pytest.raises(ValueError):
+        list(iter_json_object(write(tmp_path / "data.json", text), 3))
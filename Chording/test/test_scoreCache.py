@@ -0,0 +1,77 @@
+import os
+import sys
+
+import pytest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from layoutMetrics import PRESETS, Layout  # noqa: E402
+from scoreCache import ScoreCache  # noqa: E402
+from scoreWords import NORMALIZATION, WEIGHTS, score_words  # noqa: E402
+
+TOKENS = {'the': 500, 'definitely': 12, 'keyboard': 7, 'é☃': 3}
+
+
+@pytest.fixture
+def cache(tmp_path):
+    with ScoreCache(str(tmp_path / "scores.sqlite")) as cache:
+        yield cache
+
+
+def test_second_run_is_served_from_the_cache(cache):
+    expected = score_words(TOKENS, PRESETS['QWERTY'])
+    assert score_words(TOKENS, PRESETS['QWERTY'], cache=cache) == expected
+    assert cache.stats() == {'hits': 0, 'misses': 4, 'entries': 4}
+
+    # only the strain is cached, the frequencies may change
+    doubled = {word: 2 * frequency for word, frequency in TOKENS.items()}
+    scored = score_words(doubled, PRESETS['QWERTY'], cache=cache)
+    assert cache.stats() == {'hits': 4, 'misses': 4, 'entries': 4}
+    for word, data in expected.items():
+        assert scored[word]['frequency'] == 2 * data['frequency']
+        if data['score'] is None:
+            assert scored[word]['score'] is None
+        else:
+            assert scored[word]['score'] == pytest.approx(2 * data['score'])
+
+
+def test_cache_is_kept_on_disk(tmp_path):
+    path = str(tmp_path / "scores.sqlite")
+    with ScoreCache(path) as cache:
+        score_words(TOKENS, PRESETS['QWERTY'], cache=cache)
+    with ScoreCache(path) as cache:
+        score_words(TOKENS, PRESETS['QWERTY'], cache=cache)
+        assert cache.stats() == {'hits': 4, 'misses': 0, 'entries': 4}
+
+
+def test_least_recently_used_entries_are_evicted(tmp_path):
+    with ScoreCache(str(tmp_path / "scores.sqlite"), max_entries=3) as cache:
+        cache.put_many('ns', {'a': 1.0, 'b': None})
+        cache.put_many('ns', {'c': 3.0})
+        assert cache.get_many('ns', ['a']) == {'a': 1.0}
+
+        cache.put_many('ns', {'d': 4.0})
+
+        assert len(cache) == 3
+        assert cache.get_many('ns', ['a', 'b', 'c', 'd']) == {'a': 1.0, 'c': 3.0, 'd': 4.0}
+
+
+def test_changed_layout_or_weights_miss_the_cache(cache):
+    qwerty = PRESETS['QWERTY']
+    score_words(TOKENS, qwerty, cache=cache)
+
+    reformatted = Layout('Reformatted', "\n".join(" ".join(line.split()) for line in qwerty.config.split("\n")))
+    score_words(TOKENS, reformatted, cache=cache)
+    assert (cache.hits, cache.misses) == (4, 4)
+
+    dvorak = score_words(TOKENS, PRESETS['Dvorak'], cache=cache)
+    assert (cache.hits, cache.misses) == (4, 8)
+    assert dvorak == score_words(TOKENS, PRESETS['Dvorak'])
+
+    weights = dict(WEIGHTS, effort=WEIGHTS['effort'] * 2)
+    score_words(TOKENS, qwerty, NORMALIZATION, weights, cache=cache)
+    normalization = dict(NORMALIZATION, effort=dict(NORMALIZATION['effort'], max=NORMALIZATION['effort']['max'] + 1))
+    score_words(TOKENS, qwerty, normalization, cache=cache)
+    assert (cache.hits, cache.misses) == (4, 16)
+    assert len(cache) == 16
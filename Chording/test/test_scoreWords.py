@@ -0,0 +1,110 @@
+import json
+import os
+import random
+import shutil
+import subprocess
+import sys
+
+import pytest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from layoutMetrics import PRESETS  # noqa: E402
+from scoreWords import NORMALIZATION, score_words  # noqa: E402
+
+# presets Fitness/layout.js maps to the same keys as layoutMetrics.py
+MATCHING_PRESETS = ['QWERTY', 'CorpalX', 'Workman', 'Workman-P', 'Colemak', 'Dvorak', 'Halmak']
+
+# calculateScore of Fitness/scoreWords.js, cut out of the script that reads tokens.json around it
+RUN_CALCULATE_SCORE = """
+const fs = require('fs');
+const Layout = require('./Fitness/layout');
+const { analyzeWord } = require('./Fitness/word-analysis');
+const [configs, tokens] = JSON.parse(fs.readFileSync(0, 'utf8'));
+const source = fs.readFileSync('./Fitness/scoreWords.js', 'utf8');
+const definitions = source.slice(source.indexOf('// Normalize a metric'), source.indexOf('// Add scores to the tokens'));
+const calculateScore = new Function('normalization', definitions + 'return calculateScore;')(
+    require('./Fitness/normalization'));
+const results = {};
+for (const name in configs) {
+    const layout = new Layout(name, configs[name]);
+    results[name] = {};
+    for (const word in tokens) results[name][word] = calculateScore(analyzeWord(layout, word), tokens[word]);
+}
+console.log(JSON.stringify(results));
+"""
+
+RUN_TO_METRICS = """
+const Layout = require('./Fitness/layout');
+const config = JSON.parse(require('fs').readFileSync(0, 'utf8'));
+console.log(JSON.stringify(new Layout('test', config).toMetrics()));
+"""
+
+needs_node = pytest.mark.skipif(shutil.which('node') is None, reason="needs node to run Fitness/*.js")
+
+
+def run_node(script, payload):
+    output = subprocess.run(['node', '-e', script], input=json.dumps(payload), cwd=ROOT,
+                            capture_output=True, text=True, check=True).stdout
+    return json.loads(output)
+
+
+def sample_tokens(count=400, seed=26):
+    """Words of letters, with some punctuation, capitals, digits, spaces and unmapped characters."""
+    rng = random.Random(seed)
+    letters = "abcdefghijklmnopqrstuvwxyz"
+    extras = "ABCDEFGHXYZ.,;'-/[]1 é\t"
+    tokens = {}
+    while len(tokens) < count:
+        word = "".join(rng.choice(letters if rng.random() < 0.85 else extras) for _ in range(rng.randint(1, 12)))
+        tokens[word] = rng.randint(1, 5000)
+    return tokens
+
+
+@needs_node
+def test_scores_match_calculate_score_js():
+    tokens = sample_tokens()
+    expected = run_node(RUN_CALCULATE_SCORE, [{name: PRESETS[name].config for name in MATCHING_PRESETS}, tokens])
+
+    for name in MATCHING_PRESETS:
+        scored = score_words(tokens, PRESETS[name], NORMALIZATION)
+        for word, frequency in tokens.items():
+            assert scored[word]['frequency'] == frequency
+            if expected[name][word] is None:
+                assert scored[word]['score'] is None, (name, word)
+            else:
+                assert scored[word]['score'] == pytest.approx(expected[name][word], rel=1e-12), (name, word)
+
+
+@needs_node
+def test_long_rows_shift_the_following_rows_only_in_js():
+    # CMOS has 14 symbols on the 12 key home row: layout.js moves every later symbol two keys along,
+    # layoutMetrics.py drops the extra symbols and keeps the bottom row on the bottom row keys
+    layout = PRESETS['CMOS']
+    metrics = layout.to_metrics()
+    js_metrics = run_node(RUN_TO_METRICS, layout.config)
+    lines = layout.config.strip().split("\n")
+
+    def same(symbol):
+        key, js_key = metrics[symbol], js_metrics[symbol]
+        return (key.effort, key.distance, key.finger, key.row) == (
+            js_key['effort'], js_key['distance'], js_key['finger'], js_key['row'])
+
+    bottom_row = set(lines[6].split() + lines[7].split())
+    assert {symbol for symbol in metrics if len(symbol) == 1 and not same(symbol)} == bottom_row
+    assert ',' not in metrics and '\n' not in metrics
+
+    qwerty = PRESETS['QWERTY'].to_metrics()
+    for symbol, qwerty_symbol in zip(lines[6].split(), PRESETS['QWERTY'].config.strip().split("\n")[6].split()):
+        assert metrics[symbol] == qwerty[qwerty_symbol]
+
+
+def test_short_rows_do_not_shift_the_following_rows():
+    # the QWERTZ letter row has a key less than the physical row, which layout.js cannot parse at all
+    qwertz = PRESETS['QWERTZ'].to_metrics()
+    qwerty = PRESETS['QWERTY'].to_metrics()
+    for symbol in "asdfghjklxcvbnm":
+        assert qwertz[symbol] == qwerty[symbol]
+    assert qwertz['y'] == qwerty['z']
+    assert qwertz['z'] == qwerty['y']
@@ -35,7 +35,8 @@ def tokenize_text_in_chunks(input_file, output_file, chunk_size=1000):
     except Exception as e:
         print(f"An error occurred: {e}")
 
-# Usage
-input_file = 'D:\\Coding Projects\\ChordScribe\\Dataset\\englishDataset.txt'
-output_file = 'tokens.txt'
-tokenize_text_in_chunks(input_file, output_file)
+if __name__ == "__main__":
+    # Usage
+    input_file = 'D:\\Coding Projects\\ChordScribe\\Dataset\\englishDataset.txt'
+    output_file = 'tokens.txt'
+    tokenize_text_in_chunks(input_file, output_file)
@@ -25,6 +25,7 @@ def compute_token_frequency_json(input_file, output_file, chunk_size=100000):
     except Exception as e:
         print(f"An error occurred: {e}")
 
-input_file = 'tokens.txt'
-output_file = 'token_frequencies.json'
-compute_token_frequency_json(input_file, output_file)
+if __name__ == "__main__":
+    input_file = 'tokens.txt'
+    output_file = 'token_frequencies.json'
+    compute_token_frequency_json(input_file, output_file)
@@ -0,0 +1,199 @@
+"""
+Compact, memory-mapped word membership index.
+
+The words are stored once as a sorted packed array: a small header, a
+bucket table by the first two bytes, the byte offsets of every word and
+the concatenated UTF-8 bytes. Loading only maps the file, so startup costs
+the same for ten or ten million words, and membership checks are a short
+binary search inside one bucket of the mapped bytes.
+"""
+import argparse
+import array
+import logging
+import mmap
+import os
+import struct
+from functools import lru_cache
+from typing import Iterable, Optional
+
+logging.basicConfig(
+    level=logging.INFO,
+    format='%(asctime)s - %(levelname)s - %(message)s'
+)
+
+MAGIC = b'CHWIDX02'
+HEADER = struct.Struct('<8sQ')
+BUCKETS = 1 << 16
+CACHE_SIZE = 1 << 16
+DEFAULT_INDEX_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'english_words.idx')
+
+
+def _bucket(word: bytes) -> int:
+    """First two bytes as a number, non-decreasing over sorted words."""
+    return (word[0] << 8 | (word[1] if len(word) > 1 else 0)) if word else 0
+
+
+def build_index(words: Iterable[str], path: str) -> int:
+    """
+    Writes a sorted packed word index.
+
+    Args:
+        words: Any iterable of words, duplicates are dropped
+        path: Where to write the index
+
+    Returns:
+        Number of distinct words stored
+    """
+    encoded = sorted({word.encode('utf-8') for word in words})
+    offsets = [0]
+    for word in encoded:
+        offsets.append(offsets[-1] + len(word))
+
+    # buckets[b] is the index of the first word whose bucket is >= b
+    buckets = array.array('Q', [0] * (BUCKETS + 1))
+    current = 0
+    for i, word in enumerate(encoded):
+        bucket = _bucket(word)
+        while current <= bucket:
+            buckets[current] = i
+            current += 1
+    while current <= BUCKETS:
+        buckets[current] = len(encoded)
+        current += 1
+
+    temp_path = f"{path}.tmp"
+    with open(temp_path, 'wb') as file:
+        file.write(HEADER.pack(MAGIC, len(encoded)))
+        file.write(buckets.tobytes())
+        file.write(array.array('Q', offsets).tobytes())
+        file.write(b''.join(encoded))
+    os.replace(temp_path, path)
+
+    return len(encoded)
+
+
+class WordIndex:
+    """Read-only view of an index written by build_index, usable like a set for `in` checks."""
+
+    def __init__(self, path: str):
+        self.path = path
+        with open(path, 'rb') as file:
+            self._map = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+
+        magic, self._count = HEADER.unpack_from(self._map, 0)
+        if magic != MAGIC:
+            self._map.close()
+            raise ValueError(f"{path} is not a word index")
+
+        buckets_end = HEADER.size + (BUCKETS + 1) * 8
+        offsets_end = buckets_end + (self._count + 1) * 8
+        self._view = memoryview(self._map)
+        self._buckets = self._view[HEADER.size:buckets_end].cast('Q')
+        self._offsets = self._view[buckets_end:offsets_end].cast('Q')
+        self._data_start = offsets_end
+
+        # chord generation asks about the same short strings over and over
+        self._search = lru_cache(maxsize=CACHE_SIZE)(self._search)
+
+    def _word(self, i: int) -> bytes:
+        start = self._data_start
+        return self._map[start + self._offsets[i]:start + self._offsets[i + 1]]
+
+    def __contains__(self, word: object) -> bool:
+        return isinstance(word, str) and self._search(word)
+
+    def _search(self, word: str) -> bool:
+        target = word.encode('utf-8')
+        bucket = _bucket(target)
+        low, high = self._buckets[bucket], self._buckets[bucket + 1]
+        while low < high:
+            middle = (low + high) // 2
+            candidate = self._word(middle)
+            if candidate < target:
+                low = middle + 1
+            elif candidate > target:
+                high = middle
+            else:
+                return True
+        return False
+
+    def __len__(self) -> int:
+        return self._count
+
+    def __iter__(self):
+        for i in range(self._count):
+            yield self._word(i).decode('utf-8')
+
+    def close(self) -> None:
+        self._search.cache_clear()
+        self._buckets.release()
+        self._offsets.release()
+        self._view.release()
+        self._map.close()
+
+    def __enter__(self) -> 'WordIndex':
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+
+def _nltk_words() -> Iterable[str]:
+    import nltk
+    from nltk.corpus import words
+
+    nltk.download('words', quiet=True)
+    return words.words()
+
+
+def build_english_index(path: str = DEFAULT_INDEX_FILE, source: Optional[str] = None) -> int:
+    """
+    Builds the English word index, the one step that may need the network.
+
+    Args:
+        path: Where to write the index
+        source: Text file with one word per line, defaults to the NLTK word list
+
+    Returns:
+        Number of distinct words stored
+    """
+    if source:
+        with open(source, 'r', encoding='utf-8') as file:
+            return build_index((line.strip() for line in file if line.strip()), path)
+    return build_index(_nltk_words(), path)
+
+
+def load_english_words(path: str = DEFAULT_INDEX_FILE) -> WordIndex:
+    """
+    Maps the English word index built by build_english_index.
+
+    Args:
+        path: Location of the index file
+
+    Returns:
+        WordIndex over the English words
+
+    Raises:
+        FileNotFoundError: If the index has not been built yet
+    """
+    if not os.path.exists(path):
+        raise FileNotFoundError(
+            f"English word index {path} not found, build it once with "
+            f"`python wordIndex.py --source words.txt` or from the NLTK word list with `python wordIndex.py`"
+        )
+    return WordIndex(path)
+
+
+def main(argv: Optional[list] = None) -> None:
+    parser = argparse.ArgumentParser(description="Builds the word membership index used by generateChord.py.")
+    parser.add_argument('--source', help="text file with one word per line, defaults to the NLTK word list")
+    parser.add_argument('--output', default=DEFAULT_INDEX_FILE, help="where to write the index")
+    args = parser.parse_args(argv)
+
+    count = build_english_index(args.output, args.source)
+
+    logging.info(f"Indexed {count} words into {args.output}")
+
+
+if __name__ == "__main__":
+    main()
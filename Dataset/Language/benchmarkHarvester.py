@@ -0,0 +1,120 @@
+"""
+Throughput benchmark of GutenbergHarvester against the local stand-in server.
+
+The stand-in runs in its own process, so the harvester's timings and peak
+memory are not mixed up with the cost of generating archives. The harvest
+runs in a scratch directory and reports books/sec, bytes/sec and the peak
+resident memory of the harvester and its worker processes.
+"""
+import argparse
+import asyncio
+import json
+import logging
+import multiprocessing
+import os
+import shutil
+import tempfile
+import time
+from typing import Dict, List, Optional
+
+from downloadGutenberg import GutenbergHarvester
+from gutenbergStandIn import add_arguments, configure_harvester, stand_in_from_args
+
+try:
+    import resource
+except ImportError:  # not available on Windows
+    resource = None
+
+
+def _serve(args: argparse.Namespace, addresses: multiprocessing.Queue) -> None:
+    async def run() -> None:
+        stand_in = stand_in_from_args(args)
+        addresses.put(await stand_in.start())
+        await asyncio.Event().wait()
+
+    logging.getLogger().setLevel(logging.WARNING)
+    asyncio.run(run())
+
+
+def _peak_memory_mb() -> Dict[str, Optional[float]]:
+    if resource is None:
+        return {'harvester': None, 'workers': None}
+    # ru_maxrss is in kilobytes on Linux
+    return {
+        'harvester': resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024,
+        'workers': resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss / 1024
+    }
+
+
+async def run_harvest(base_url: str, concurrency: int, process_workers: int, hedge_requests: bool) -> Dict:
+    async with GutenbergHarvester("books", concurrency=concurrency, process_workers=process_workers,
+                                  hedge_requests=hedge_requests, page_delay=0) as harvester:
+        configure_harvester(harvester, base_url)
+
+        started = time.perf_counter()
+        await harvester.harvest_books()
+        elapsed = time.perf_counter() - started
+
+        async with harvester.session.get(f"{base_url}/stats") as response:
+            server_stats = await response.json()
+
+    return {
+        'seconds': elapsed,
+        'books_processed': len(harvester.processed_ids),
+        'books_failed': len(harvester.failed_downloads),
+        'server': server_stats
+    }
+
+
+def benchmark(args: argparse.Namespace) -> Dict:
+    """Runs one harvest against a fresh stand-in and returns the measurements."""
+    addresses: multiprocessing.Queue = multiprocessing.Queue()
+    server = multiprocessing.Process(target=_serve, args=(args, addresses), daemon=True)
+    server.start()
+
+    workdir = tempfile.mkdtemp(prefix='harvest_benchmark_')
+    cwd = os.getcwd()
+    try:
+        base_url = addresses.get(timeout=600)
+        os.chdir(workdir)
+        result = asyncio.run(run_harvest(base_url, args.concurrency, args.process_workers, not args.no_hedge))
+        # read before the server process is reaped, so it does not count as a worker
+        result['peak_memory_mb'] = _peak_memory_mb()
+    finally:
+        os.chdir(cwd)
+        shutil.rmtree(workdir, ignore_errors=True)
+        server.terminate()
+        server.join()
+
+    seconds = result['seconds']
+    result['books_per_second'] = result['books_processed'] / seconds
+    result['bytes_per_second'] = result['server']['bytes_served'] / seconds
+    return result
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    parser = argparse.ArgumentParser(description="Measures harvester throughput against the local Gutenberg stand-in.")
+    add_arguments(parser)
+    parser.add_argument('--concurrency', type=int, default=10, help="books downloaded at the same time")
+    parser.add_argument('--process-workers', type=int, default=2, help="archives processed at the same time")
+    parser.add_argument('--no-hedge', action='store_true', help="disable hedged mirror requests")
+    parser.add_argument('--json', action='store_true', help="print the raw measurements as JSON")
+    args = parser.parse_args(argv)
+
+    logging.getLogger().setLevel(logging.WARNING)
+    result = benchmark(args)
+
+    if args.json:
+        print(json.dumps(result, indent=2))
+        return
+
+    memory = result['peak_memory_mb']
+    print(f"Books processed:  {result['books_processed']} ({result['books_failed']} failed) in {result['seconds']:.2f}s")
+    print(f"Throughput:       {result['books_per_second']:.1f} books/s, {result['bytes_per_second'] / 1e6:.2f} MB/s")
+    print(f"Server:           {result['server']['requests']} requests, {result['server']['errors']} errors")
+    if memory['harvester'] is not None:
+        print(f"Peak memory:      {memory['harvester']:.1f} MB harvester, {memory['workers']:.1f} MB largest worker")
+
+
+if __name__ == "__main__":
+    main()
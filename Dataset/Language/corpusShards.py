@@ -0,0 +1,198 @@
+"""
+Sharded corpus files with a byte-offset index, for random and parallel access to books.
+
+Books are appended to shard files of a bounded size, never split across two
+shards, in the same "--- Start of ... ---" / "--- End of ... ---" layout as
+the single combined file, so the shards joined with a newline read like
+that file. A sidecar index.json maps each book id to its shard and the byte
+range of its text. Readers mmap the shards, fetch single books by id and
+split the corpus into contiguous parts at book boundaries for worker
+processes.
+"""
+import json
+import mmap
+import os
+from concurrent.futures import ProcessPoolExecutor
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple
+
+SHARD_SIZE = 256 * 1024 * 1024
+INDEX_FILE = 'index.json'
+SHARD_PREFIX = 'shard_'
+
+
+def shard_name(number: int) -> str:
+    return f"{SHARD_PREFIX}{number:05d}.txt"
+
+
+class ShardWriter:
+    """
+    Appends books to shards in output_dir and writes the index on close.
+
+    Args:
+        output_dir: Directory of the shards and index, created if missing
+        shard_size: Bytes after which the next book starts a new shard
+    """
+
+    def __init__(self, output_dir: str, shard_size: int = SHARD_SIZE):
+        self.output_dir = output_dir
+        self.shard_size = shard_size
+        self.shards: List[str] = []
+        self.books: Dict[str, Tuple[int, int, int]] = {}
+        self.file = None
+        self.position = 0
+        os.makedirs(output_dir, exist_ok=True)
+
+    def _next_shard(self) -> None:
+        if self.file is not None:
+            self.file.close()
+        self.shards.append(shard_name(len(self.shards)))
+        self.file = open(os.path.join(self.output_dir, self.shards[-1]), 'wb')
+        self.position = 0
+
+    def add(self, name: str, text: bytes) -> None:
+        """
+        Appends a book.
+
+        Args:
+            name: File name of the book, its id is the name without extension
+            text: UTF-8 text of the book
+        """
+        book_id = os.path.splitext(name)[0]
+        if book_id in self.books:
+            raise ValueError(f"Book {book_id} is already in the corpus")
+
+        if self.file is None or self.position >= self.shard_size:
+            self._next_shard()
+        elif self.position:
+            self.file.write(b"\n")
+            self.position += 1
+
+        header = f"--- Start of {name} ---\n".encode('utf-8')
+        footer = f"\n--- End of {name} ---\n\n".encode('utf-8')
+        start = self.position + len(header)
+        self.file.write(header)
+        self.file.write(text)
+        self.file.write(footer)
+        self.position = start + len(text) + len(footer)
+        self.books[book_id] = (len(self.shards) - 1, start, start + len(text))
+
+    def close(self) -> None:
+        """Writes the index and removes shards left over from an earlier, larger corpus."""
+        if self.file is not None:
+            self.file.close()
+            self.file = None
+
+        index_path = os.path.join(self.output_dir, INDEX_FILE)
+        temp_path = f"{index_path}.tmp"
+        with open(temp_path, 'w', encoding='utf-8') as f:
+            json.dump({'shards': self.shards, 'books': self.books}, f)
+        os.replace(temp_path, index_path)
+
+        for name in os.listdir(self.output_dir):
+            if name.startswith(SHARD_PREFIX) and name not in self.shards:
+                os.remove(os.path.join(self.output_dir, name))
+
+    def __enter__(self) -> 'ShardWriter':
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+
+class ShardedCorpus:
+    """
+    Read access to a sharded corpus, shards are mapped into memory on first use.
+
+    Args:
+        directory: Directory written by ShardWriter
+    """
+
+    def __init__(self, directory: str):
+        self.directory = directory
+        with open(os.path.join(directory, INDEX_FILE), 'r', encoding='utf-8') as f:
+            index = json.load(f)
+        self.shards: List[str] = index['shards']
+        self.books: Dict[str, List[int]] = index['books']
+        self.maps: Dict[int, mmap.mmap] = {}
+
+    def _map(self, shard: int) -> mmap.mmap:
+        if shard not in self.maps:
+            with open(os.path.join(self.directory, self.shards[shard]), 'rb') as f:
+                self.maps[shard] = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        return self.maps[shard]
+
+    def ids(self) -> List[str]:
+        """Book ids in corpus order."""
+        return list(self.books)
+
+    def __len__(self) -> int:
+        return len(self.books)
+
+    def __contains__(self, book_id: str) -> bool:
+        return book_id in self.books
+
+    def get_bytes(self, book_id: str) -> bytes:
+        shard, start, end = self.books[book_id]
+        return self._map(shard)[start:end]
+
+    def get(self, book_id: str) -> str:
+        """Text of a book, KeyError for unknown ids."""
+        return self.get_bytes(book_id).decode('utf-8')
+
+    def iter_books(self, book_ids: Optional[List[str]] = None) -> Iterator[Tuple[str, str]]:
+        """(book_id, text) for the given ids, or the whole corpus in order."""
+        for book_id in self.books if book_ids is None else book_ids:
+            yield book_id, self.get(book_id)
+
+    def partition(self, parts: int) -> List[List[str]]:
+        """
+        Splits the corpus into at most `parts` runs of consecutive books of about equal size.
+
+        Consecutive books mostly share a shard, so each worker touches few shards.
+        """
+        sizes = [(book_id, end - start) for book_id, (_, start, end) in self.books.items()]
+        total = sum(size for _, size in sizes)
+        target = total / max(parts, 1)
+
+        partitions: List[List[str]] = [[]]
+        filled = 0
+        for book_id, size in sizes:
+            if partitions[-1] and filled >= target * len(partitions) and len(partitions) < parts:
+                partitions.append([])
+            partitions[-1].append(book_id)
+            filled += size
+        return [part for part in partitions if part]
+
+    def close(self) -> None:
+        for mapped in self.maps.values():
+            mapped.close()
+        self.maps = {}
+
+    def __enter__(self) -> 'ShardedCorpus':
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+
+def _map_partition(directory: str, book_ids: List[str], function: Callable[[str, str], Any]) -> List[Any]:
+    with ShardedCorpus(directory) as corpus:
+        return [function(book_id, text) for book_id, text in corpus.iter_books(book_ids)]
+
+
+def map_books(directory: str, function: Callable[[str, str], Any], processes: Optional[int] = None) -> Iterator[Any]:
+    """
+    Applies function(book_id, text) to every book in worker processes.
+
+    Each worker maps the shards itself and gets one contiguous partition, so
+    only book ids cross process boundaries on the way in. Results come back
+    in corpus order; function has to be picklable, i.e. defined at module level.
+    """
+    processes = processes or os.cpu_count() or 1
+    with ShardedCorpus(directory) as corpus:
+        partitions = corpus.partition(processes)
+
+    with ProcessPoolExecutor(processes) as executor:
+        futures = [executor.submit(_map_partition, directory, part, function) for part in partitions]
+        for future in futures:
+            yield from future.result()
@@ -0,0 +1,182 @@
+"""
+Near-duplicate detection for the downloaded Gutenberg books, run before processGutenberg combines them.
+
+Gutenberg keeps several editions and re-uploads of many works, which
+inflate the token counts of every later stage. Each book gets a one
+permutation MinHash signature over its word 5-gram shingles, computed in a
+process pool; an LSH index over bands of the signatures turns up candidate
+pairs, which are kept if their signatures agree on at least `threshold` of
+the positions, the MinHash estimate of their Jaccard similarity. Books are
+then visited largest first: a book nobody dropped is kept and drops the
+books it is similar to, so a book is only ever dropped in favour of a kept
+book it is itself similar to, never through a chain of similar books.
+"""
+import argparse
+import json
+import os
+import time
+import zlib
+from collections import defaultdict
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+
+SIGNATURE_SIZE = 128
+BIN_BITS = 7  # log2(SIGNATURE_SIZE)
+BANDS = 16
+SHINGLE_SIZE = 5
+THRESHOLD = 0.8
+SEED = 1
+DUPLICATES_FILE = 'duplicates.json'
+
+_random = np.random.default_rng(SEED)
+SHINGLE_WEIGHTS = _random.integers(1, 2 ** 64, SHINGLE_SIZE, dtype=np.uint64) | np.uint64(1)
+MIX_A = _random.integers(1, 2 ** 64, dtype=np.uint64) | np.uint64(1)
+MIX_B = _random.integers(0, 2 ** 64, dtype=np.uint64)
+VALUE_MASK = np.uint64((1 << (64 - BIN_BITS)) - 1)
+EMPTY = np.iinfo(np.uint64).max
+# lowercases ASCII letters and blanks out ASCII punctuation, other bytes belong to words
+LOWER_WORDS = bytes(b if chr(b).isalnum() or b >= 0x80 else 0x20 for b in range(256)).lower()
+
+
+def shingle_hashes(data: bytes) -> np.ndarray:
+    """Sorted distinct 64 bit hashes of the lowercase word 5-grams of a UTF-8 text."""
+    words = data.translate(LOWER_WORDS).split()
+    if not words:
+        return np.empty(0, dtype=np.uint64)
+
+    # every distinct word is hashed once; crc32 is stable across processes, unlike hash()
+    vocabulary = {word: zlib.crc32(word) for word in set(words)}
+    word_hashes = np.fromiter(map(vocabulary.__getitem__, words), dtype=np.uint64, count=len(words))
+
+    size = min(SHINGLE_SIZE, len(words))
+    count = len(words) - size + 1
+    hashes = np.zeros(count, dtype=np.uint64)
+    for offset in range(size):
+        hashes += word_hashes[offset:offset + count] * SHINGLE_WEIGHTS[offset]
+    return np.unique(hashes * MIX_A + MIX_B)
+
+
+def minhash_signature(data: bytes) -> np.ndarray:
+    """
+    One permutation MinHash signature of a UTF-8 text, all EMPTY for a text without words.
+
+    The top BIN_BITS bits of a shingle's hash pick one of SIGNATURE_SIZE bins
+    and each bin keeps its smallest remaining bits, which costs one hash per
+    shingle instead of one per shingle and signature row. Empty bins borrow
+    from the next filled bin, shifted by the distance, so short books still
+    compare like long ones.
+    """
+    signature = np.full(SIGNATURE_SIZE, EMPTY, dtype=np.uint64)
+    shingles = shingle_hashes(data)
+    if not len(shingles):
+        return signature
+
+    # the hashes are sorted, so every bin is a run and its first hash its minimum
+    bins = shingles >> np.uint64(64 - BIN_BITS)
+    numbers = np.arange(SIGNATURE_SIZE, dtype=np.uint64)
+    first = np.searchsorted(bins, numbers)
+    filled = first < len(shingles)
+    filled[filled] = bins[first[filled]] == numbers[filled]
+    signature[filled] = shingles[first[filled]] & VALUE_MASK
+
+    if not filled.all():
+        positions = np.flatnonzero(filled)
+        following = np.searchsorted(positions, np.arange(SIGNATURE_SIZE)) % len(positions)
+        distance = (positions[following] - np.arange(SIGNATURE_SIZE)) % SIGNATURE_SIZE
+        borrowed = signature[positions[following]] + distance.astype(np.uint64) * (VALUE_MASK + np.uint64(1))
+        signature[~filled] = borrowed[~filled]
+    return signature
+
+
+def book_signature(file_path: str) -> np.ndarray:
+    with open(file_path, 'rb') as f:
+        return minhash_signature(f.read())
+
+
+def similarity(first: np.ndarray, second: np.ndarray) -> float:
+    """Estimated Jaccard similarity of two books' shingle sets."""
+    return float(np.mean(first == second))
+
+
+def candidate_pairs(signatures: np.ndarray, bands: int = BANDS) -> set:
+    """Index pairs of books that share all rows of at least one band, books without words have none."""
+    rows = signatures.shape[1] // bands
+    books = np.flatnonzero(~(signatures == EMPTY).all(axis=1))
+    pairs = set()
+    for band in range(bands):
+        buckets = defaultdict(list)
+        for index, key in zip(books.tolist(), signatures[books, band * rows:(band + 1) * rows]):
+            buckets[key.tobytes()].append(index)
+        for members in buckets.values():
+            for i, first in enumerate(members):
+                for second in members[i + 1:]:
+                    pairs.add((first, second))
+    return pairs
+
+
+def find_duplicates(files: List[str], threshold: float = THRESHOLD, bands: int = BANDS,
+                    jobs: Optional[int] = None) -> Dict[str, Tuple[str, float]]:
+    """
+    Finds the books that are near-duplicates of another book.
+
+    Args:
+        files: Book text files
+        threshold: Estimated Jaccard similarity from which two books are duplicates
+        bands: LSH bands the signature is cut into; more bands find less similar candidates
+        jobs: Number of worker processes, defaults to the CPU count
+
+    Returns:
+        Path of every redundant book -> (path of the book kept instead, similarity)
+    """
+    with ProcessPoolExecutor(jobs) as executor:
+        signatures = np.array(list(executor.map(book_signature, files, chunksize=16)), dtype=np.uint64)
+    if not len(files):
+        return {}
+
+    similar = defaultdict(list)
+    for first, second in candidate_pairs(signatures, bands):
+        score = similarity(signatures[first], signatures[second])
+        if score >= threshold:
+            similar[first].append((second, score))
+            similar[second].append((first, score))
+
+    # keep the most complete edition, the smallest name between equals
+    order = sorted(similar, key=lambda index: (-os.path.getsize(files[index]), files[index]))
+    kept = set()
+    duplicates = {}
+    for index in order:
+        if files[index] in duplicates:
+            continue
+        kept.add(index)
+        for other, score in sorted(similar[index]):
+            if other not in kept and files[other] not in duplicates:
+                duplicates[files[other]] = (files[index], score)
+    return duplicates
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    parser = argparse.ArgumentParser(description="Finds near-duplicate books before they are combined.")
+    parser.add_argument('source', nargs='?', default='gutenberg_books', help="directory of the book .txt files")
+    parser.add_argument('--threshold', type=float, default=THRESHOLD, help="estimated Jaccard similarity of duplicates")
+    parser.add_argument('--bands', type=int, default=BANDS, help=f"LSH bands of the {SIGNATURE_SIZE} signature rows")
+    parser.add_argument('--jobs', type=int, default=None, help="number of worker processes")
+    parser.add_argument('--report', default=DUPLICATES_FILE, help="JSON file of duplicate -> kept book")
+    args = parser.parse_args(argv)
+
+    files = sorted(os.path.join(args.source, f) for f in os.listdir(args.source) if f.endswith('.txt'))
+
+    started = time.perf_counter()
+    duplicates = find_duplicates(files, args.threshold, args.bands, args.jobs)
+    elapsed = time.perf_counter() - started
+
+    with open(args.report, 'w', encoding='utf-8') as f:
+        json.dump({path: {'kept': kept, 'similarity': score} for path, (kept, score) in duplicates.items()}, f, indent=2)
+
+    print(f"{len(duplicates)} of {len(files)} books are near-duplicates, listed in {args.report}")
+    print(f"Checked {len(files) / elapsed:.1f} books/s ({elapsed:.2f}s)")
+
+
+if __name__ == "__main__":
+    main()
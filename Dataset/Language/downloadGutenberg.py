@@ -1,23 +1,176 @@
-import requests
 from bs4 import BeautifulSoup
 import asyncio
 import aiohttp
 import aiofiles
 import zipfile
+import hashlib
+import io
 import os
-import re
 from pathlib import Path
+from concurrent.futures import ProcessPoolExecutor
 import logging
-from typing import List, Set, Tuple, Optional
+from typing import Dict, List, Set, Tuple, Optional
 from urllib.parse import urljoin, parse_qs, urlparse
 
+from gutenbergBoilerplate import strip_boilerplate, strip_boilerplate_text
+from harvestManifest import DEFAULT_MANIFEST_FILE, DOWNLOADED, FAILED, LISTED, PROCESSED, HarvestManifest
+from mirrorStats import MirrorStats
+
 logging.basicConfig(
     level=logging.INFO,
     format='%(asctime)s - %(levelname)s - %(message)s'
 )
 
+DOWNLOAD_CHUNK_SIZE = 1 << 16
+MAX_DOWNLOAD_SIZE = 64 * 1024 * 1024
+# answers a download can go on from, 416 restarts a partial file that does not fit
+USABLE_STATUSES = (200, 206, 416)
+
+def clean_book_text(text: str) -> str:
+    """Strips the Project Gutenberg header, footer and license from a book."""
+    try:
+        return strip_boilerplate_text(text)
+    except Exception as e:
+        logging.error(f"Error processing text content: {e}")
+        return text
+
+def _zip_contents_error(zf: zipfile.ZipFile, zip_path: str) -> Optional[str]:
+    txt_files = [f for f in zf.namelist() if f.endswith('.txt')]
+    if not txt_files:
+        return f"No text files found in {zip_path}"
+    
+    for txt_file in txt_files:
+        if zf.getinfo(txt_file).file_size == 0:
+            return f"Empty text file found in {zip_path}: {txt_file}"
+    
+    return None
+
+def _validate_zip(zip_path: str) -> Optional[str]:
+    """CRC and content check of a downloaded archive, run in a worker process."""
+    try:
+        with zipfile.ZipFile(zip_path) as zf:
+            test_result = zf.testzip()
+            if test_result is not None:
+                return f"Corrupt ZIP file {zip_path}: First bad file is {test_result}"
+            return _zip_contents_error(zf, zip_path)
+    except zipfile.BadZipFile:
+        return f"Invalid ZIP file: {zip_path}"
+    except Exception as e:
+        return f"Error validating ZIP file {zip_path}: {e}"
+
+def _strip_member(name: str, member: zipfile.ZipExtFile, output_path: str, messages: List[Tuple[int, str]]) -> bool:
+    """
+    Streams one text member through the boilerplate stripper into output_path.
+
+    The text goes to a temporary file first, so output_path is only replaced
+    when something is left of the book.
+    """
+    temp_path = f"{output_path}.tmp"
+    text = io.TextIOWrapper(member, encoding='utf-8', errors='ignore')
+    try:
+        with open(temp_path, 'wb') as out:
+            written = strip_boilerplate(text, out)
+        if not written:
+            messages.append((logging.WARNING, f"Empty processed content for {name}"))
+            return False
+        os.replace(temp_path, output_path)
+        return True
+    except zipfile.BadZipFile:
+        raise
+    except Exception as e:
+        messages.append((logging.ERROR, f"Error processing text file {name}: {e}"))
+        return False
+    finally:
+        # leave the member open for the caller
+        text.detach()
+        if os.path.exists(temp_path):
+            os.remove(temp_path)
+
+def _extract_book(zip_path: str, output_path: str) -> Tuple[Optional[str], List[Tuple[int, str]], bool]:
+    """
+    Decodes and cleans the text files of an archive straight from the zip stream, in a worker process.
+
+    Books are stripped block by block into the output file and never held in
+    memory as a whole.
+
+    Every member is read to its end, which checks its CRC, so the archive is
+    validated in the same pass instead of a separate testzip().
+
+    Returns:
+        Error message if the archive is unusable, log messages as (level, message)
+        and whether a cleaned text was written to output_path
+    """
+    messages = []
+    processed_any = False
+    
+    try:
+        with zipfile.ZipFile(zip_path) as zf:
+            error_msg = _zip_contents_error(zf, zip_path)
+            if error_msg:
+                return error_msg, messages, False
+            
+            for name in zf.namelist():
+                try:
+                    with zf.open(name) as member:
+                        if name.endswith('.txt'):
+                            processed_any = _strip_member(name, member, output_path, messages) or processed_any
+                        # read to the end so the CRC is checked even where stripping stopped early
+                        while member.read(DOWNLOAD_CHUNK_SIZE):
+                            pass
+                except zipfile.BadZipFile:
+                    # the CRC may only fail after the text was written, keep nothing of a corrupt archive
+                    if processed_any and os.path.exists(output_path):
+                        os.remove(output_path)
+                    return f"Corrupt ZIP file {zip_path}: First bad file is {name}", messages, False
+        
+        return None, messages, processed_any
+    
+    except zipfile.BadZipFile:
+        return f"Invalid ZIP file: {zip_path}", messages, False
+    except Exception as e:
+        return f"Error validating ZIP file {zip_path}: {e}", messages, False
+
 class GutenbergHarvester:
-    def __init__(self, output_dir: str = "gutenberg_books"):
+    """
+    Crawls the Gutenberg robot harvest listing and keeps the cleaned up text of every English book.
+
+    All requests go through one aiohttp session owned by the harvester, so
+    connections are pooled and kept alive across listing pages, books and
+    mirrors. Use the harvester as an async context manager, or call close()
+    when done, to release the pooled connections.
+
+    Archives are streamed to disk in fixed size chunks and hashed on the way,
+    so memory use does not depend on archive size. An interrupted download
+    leaves a .part file that the next attempt resumes with a Range request.
+
+    Download attempts go to the mirror with the lowest expected answer time
+    first. When it has not answered within a latency percentile of recent
+    answers, the next best mirror is asked as well and the faster one wins.
+
+    Book states and the listing position are kept in a SQLite manifest, so a
+    restarted harvest skips every book it already has and continues from the
+    last listing page instead of crawling from the start. Books that failed
+    in an earlier run are tried again, since most failures are transient.
+
+    Args:
+        output_dir: Directory the processed books are written to
+        concurrency: Number of books downloaded at the same time
+        connections_per_host: Pooled connections kept open to each host
+        request_timeout: Seconds to wait for a connection or the next chunk of a response
+        max_download_size: Archives larger than this many bytes are abandoned
+        process_workers: Number of archives processed at the same time, each in its own worker process
+        manifest_path: SQLite manifest of the harvest, None to keep no record between runs
+        hedge_requests: Whether to race a second mirror against one that is slow to answer
+        hedge_percentile: Answer time percentile after which the second mirror is asked
+        page_delay: Seconds to wait between listing pages
+        retry_failed: Whether books the manifest records as failed are downloaded again
+    """
+
+    def __init__(self, output_dir: str = "gutenberg_books", concurrency: int = 10,
+                 connections_per_host: int = 8, request_timeout: float = 30,
+                 max_download_size: int = MAX_DOWNLOAD_SIZE, process_workers: int = 2,
+                 manifest_path: Optional[str] = DEFAULT_MANIFEST_FILE, hedge_requests: bool = True,
+                 hedge_percentile: float = 0.95, page_delay: float = 1.0, retry_failed: bool = True):
         self.base_url = "https://www.gutenberg.org/robot/harvest"
         self.mirror_urls = [
             "https://www.gutenberg.org/files",
@@ -25,16 +178,77 @@ class GutenbergHarvester:
             "http://www.gutenberg.org/cache/epub"
         ]
         self.download_dir = Path("downloads")
-        self.extracted_dir = Path("extracted")
         self.processed_dir = Path(output_dir)
         self.processed_ids: Set[str] = set()
         self.failed_downloads: Set[str] = set()
         self.corrupt_files: Set[str] = set()
-        self.semaphore = asyncio.Semaphore(10)
+        self.download_hashes: Dict[str, str] = {}
+        self.concurrency = concurrency
+        self.connections_per_host = connections_per_host
+        self.request_timeout = request_timeout
+        self.max_download_size = max_download_size
+        self.process_workers = process_workers
+        self.semaphore = asyncio.Semaphore(concurrency)
+        self.session: Optional[aiohttp.ClientSession] = None
+        self.executor: Optional[ProcessPoolExecutor] = None
+        self.manifest = HarvestManifest(manifest_path) if manifest_path else None
+        self.mirror_stats = MirrorStats()
+        self.hedge_requests = hedge_requests
+        self.hedge_percentile = hedge_percentile
+        self.page_delay = page_delay
+        self.retry_failed = retry_failed
         
-        for directory in [self.download_dir, self.extracted_dir, self.processed_dir]:
+        for directory in [self.download_dir, self.processed_dir]:
             directory.mkdir(exist_ok=True)
 
+    async def open(self) -> aiohttp.ClientSession:
+        """Creates the shared session on first use."""
+        if self.session is None or self.session.closed:
+            connector = aiohttp.TCPConnector(
+                limit=self.concurrency * 2,
+                limit_per_host=self.connections_per_host,
+                ttl_dns_cache=300,
+                keepalive_timeout=60
+            )
+            self.session = aiohttp.ClientSession(
+                connector=connector,
+                # no total limit, large archives may stream for a while as long as data keeps coming
+                timeout=aiohttp.ClientTimeout(
+                    total=None,
+                    sock_connect=self.request_timeout,
+                    sock_read=self.request_timeout
+                )
+            )
+        return self.session
+
+    async def close(self) -> None:
+        if self.session is not None and not self.session.closed:
+            await self.session.close()
+        self.session = None
+        if self.executor is not None:
+            self.executor.shutdown()
+            self.executor = None
+        if self.manifest is not None:
+            self.manifest.close()
+            self.manifest = None
+
+    def _get_executor(self) -> ProcessPoolExecutor:
+        """Worker processes for zip validation, decoding and text cleanup, off the event loop."""
+        if self.executor is None:
+            self.executor = ProcessPoolExecutor(max_workers=self.process_workers)
+        return self.executor
+
+    def _record(self, book_id: str, state: str, **details) -> None:
+        if self.manifest is not None:
+            self.manifest.mark(book_id, state, **details)
+
+    async def __aenter__(self) -> 'GutenbergHarvester':
+        await self.open()
+        return self
+
+    async def __aexit__(self, *exc) -> None:
+        await self.close()
+
     def generate_mirror_urls(self, book_id: str) -> List[str]:
         urls = []
         id_parts = "/".join(book_id[i:i+1] for i in range(0, len(book_id)-1))
@@ -46,78 +260,176 @@ class GutenbergHarvester:
         return urls
 
     async def validate_zip_file(self, zip_path: Path, delete_if_invalid: bool = True) -> Tuple[bool, Optional[str]]:
+        loop = asyncio.get_running_loop()
+        error_msg = await loop.run_in_executor(self._get_executor(), _validate_zip, str(zip_path))
+        if error_msg is None:
+            return True, None
+        
+        if delete_if_invalid and zip_path.exists():
+            zip_path.unlink()
+        return False, error_msg
+
+    async def _timed_get(self, url: str, headers: Optional[dict]) -> aiohttp.ClientResponse:
+        """
+        Starts a request and records the mirror's answer time.
+
+        Only an answer the book can be downloaded from counts as a success. A
+        request cancelled because a hedged one won counts as a failure, so a
+        mirror that hangs sinks in the ranking instead of keeping its prior.
+        """
+        session = await self.open()
+        loop = asyncio.get_running_loop()
+        started = loop.time()
         try:
-            with zipfile.ZipFile(zip_path) as zf:
-                test_result = zf.testzip()
-                if test_result is not None:
-                    error_msg = f"Corrupt ZIP file {zip_path}: First bad file is {test_result}"
-                    if delete_if_invalid and zip_path.exists():
-                        zip_path.unlink()
-                    return False, error_msg
-                
-                txt_files = [f for f in zf.namelist() if f.endswith('.txt')]
-                if not txt_files:
-                    error_msg = f"No text files found in {zip_path}"
-                    if delete_if_invalid and zip_path.exists():
-                        zip_path.unlink()
-                    return False, error_msg
+            response = await session.get(url, headers=headers)
+        except (asyncio.TimeoutError, aiohttp.ClientError, asyncio.CancelledError):
+            self.mirror_stats.record(url, loop.time() - started, False)
+            raise
+        self.mirror_stats.record(url, loop.time() - started, response.status in USABLE_STATUSES)
+        return response
+
+    async def _hedged_get(self, candidates: List[str],
+                          headers: Optional[dict]) -> Tuple[Optional[str], Optional[aiohttp.ClientResponse]]:
+        """
+        Requests the first candidate and, when it has not answered within the hedging delay, the next one too.
+
+        The first response that can be downloaded from wins and the request
+        still in flight is cancelled. Candidates are taken from the front of
+        the list; a cancelled one is put back so a later attempt can use it.
+
+        Returns:
+            The winning URL and its open response, or (None, None) once every candidate failed
+        """
+        limit = 2 if self.hedge_requests else 1
+        in_flight: Dict[asyncio.Future, str] = {}
+        
+        try:
+            while candidates or in_flight:
+                if candidates and len(in_flight) < limit:
+                    attempt_url = candidates.pop(0)
+                    in_flight[asyncio.ensure_future(self._timed_get(attempt_url, headers))] = attempt_url
                 
-                for txt_file in txt_files:
-                    if zf.getinfo(txt_file).file_size == 0:
-                        error_msg = f"Empty text file found in {zip_path}: {txt_file}"
-                        if delete_if_invalid and zip_path.exists():
-                            zip_path.unlink()
-                        return False, error_msg
+                timeout = None
+                if candidates and len(in_flight) < limit:
+                    timeout = self.mirror_stats.hedge_delay(self.hedge_percentile, self.request_timeout)
+                done, _ = await asyncio.wait(in_flight, timeout=timeout, return_when=asyncio.FIRST_COMPLETED)
                 
-                return True, None
+                winner = None
+                for task in done:
+                    attempt_url = in_flight.pop(task)
+                    try:
+                        response = task.result()
+                    except Exception:
+                        continue
+                    if winner is None and response.status in USABLE_STATUSES:
+                        winner = (attempt_url, response)
+                    else:
+                        response.release()
                 
-        except zipfile.BadZipFile:
-            error_msg = f"Invalid ZIP file: {zip_path}"
-            if delete_if_invalid and zip_path.exists():
-                zip_path.unlink()
-            return False, error_msg
-        except Exception as e:
-            error_msg = f"Error validating ZIP file {zip_path}: {e}"
-            if delete_if_invalid and zip_path.exists():
-                zip_path.unlink()
-            return False, error_msg
+                if winner is not None:
+                    return winner
+            
+            return None, None
+        finally:
+            for task, attempt_url in in_flight.items():
+                if not task.done():
+                    task.cancel()
+                elif not task.cancelled() and task.exception() is None:
+                    # answered after the winner, hand its connection back to the pool
+                    task.result().release()
+                candidates.insert(0, attempt_url)
 
     async def download_with_mirrors(self, url: str, zip_path: Path) -> Tuple[bool, Optional[str]]:
         book_id = url.split('/')[-2]
-        urls_to_try = [url] + self.generate_mirror_urls(book_id)
+        candidates = self.mirror_stats.rank(list(dict.fromkeys([url] + self.generate_mirror_urls(book_id))))
+        part_path = zip_path.with_name(f"{zip_path.name}.part")
+        loop = asyncio.get_running_loop()
         
-        for attempt_url in urls_to_try:
+        while candidates:
+            offset = part_path.stat().st_size if part_path.exists() else 0
+            headers = {'Range': f"bytes={offset}-"} if offset else None
+            
+            attempt_url, response = await self._hedged_get(candidates, headers)
+            if response is None:
+                break
+            
+            started = loop.time()
             try:
-                async with aiohttp.ClientSession() as session:
-                    async with session.get(attempt_url, timeout=30) as response:
-                        if response.status == 404:
-                            continue
-                        
-                        if response.status != 200:
-                            continue
-                        
-                        content = await response.read()
-                        if len(content) < 100:
-                            continue
-                            
-                        async with aiofiles.open(zip_path, 'wb') as f:
-                            await f.write(content)
-                        
-                        is_valid, error_msg = await self.validate_zip_file(zip_path)
-                        if is_valid:
-                            return True, None
-                        else:
-                            if zip_path.exists():
-                                zip_path.unlink()
+                async with response:
+                    if response.status == 416:
+                        # the partial file does not match this copy, start over
+                        part_path.unlink()
+                        continue
+                    
+                    if response.status == 206:
+                        if not response.headers.get('Content-Range', '').startswith(f"bytes {offset}-"):
+                            part_path.unlink()
                             continue
-                            
-            except asyncio.TimeoutError:
+                    else:
+                        offset = 0  # range not honoured, the full body follows
+                    
+                    length = response.content_length
+                    if length is not None and offset + length > self.max_download_size:
+                        logging.warning(f"Skipping {attempt_url}: {offset + length} bytes exceeds the size limit")
+                        if part_path.exists():
+                            part_path.unlink()
+                        continue
+                    
+                    result = await self._stream_to_file(response, part_path, offset)
+                    if result is None:
+                        logging.warning(f"Skipping {attempt_url}: download exceeded the size limit")
+                        part_path.unlink()
+                        continue
+                    
+                    digest, size = result
+                    if size < 100:
+                        part_path.unlink()
+                        continue
+                    
+                    # the CRCs are checked while process_book extracts the archive, not here
+                    os.replace(part_path, zip_path)
+                    self.download_hashes[book_id] = digest
+                    return True, None
+
+            except (asyncio.TimeoutError, aiohttp.ClientError):
+                # the mirror stalled mid-transfer; keep the partial file, the next attempt resumes from it
+                self.mirror_stats.record(attempt_url, loop.time() - started, False)
                 continue
-            except Exception as e:
+            except OSError as e:
+                # writing, moving or removing the part file failed, another copy may still work
+                logging.warning(f"Skipping {attempt_url}: {e}")
                 continue
         
         return False, f"All download attempts failed for book {book_id}"
 
+    async def _stream_to_file(self, response: aiohttp.ClientResponse, part_path: Path,
+                              offset: int) -> Optional[Tuple[str, int]]:
+        """
+        Writes a response body to part_path in fixed size chunks, appending after offset bytes.
+
+        Returns:
+            SHA-256 and size of the whole file, or None if it grew past max_download_size
+        """
+        digest = hashlib.sha256()
+        if offset:
+            async with aiofiles.open(part_path, 'rb') as f:
+                while True:
+                    chunk = await f.read(DOWNLOAD_CHUNK_SIZE)
+                    if not chunk:
+                        break
+                    digest.update(chunk)
+        
+        size = offset
+        async with aiofiles.open(part_path, 'ab' if offset else 'wb') as f:
+            async for chunk in response.content.iter_chunked(DOWNLOAD_CHUNK_SIZE):
+                size += len(chunk)
+                if size > self.max_download_size:
+                    return None
+                digest.update(chunk)
+                await f.write(chunk)
+        
+        return digest.hexdigest(), size
+
     async def download_book(self, url: str) -> bool:
         book_id = url.split('/')[-2]
         if book_id in self.processed_ids or book_id in self.failed_downloads:
@@ -132,6 +444,7 @@ class GutenbergHarvester:
                 success, error_msg = await self.download_with_mirrors(url, zip_path)
                 
                 if success:
+                    self._record(book_id, DOWNLOADED, url=url, sha256=self.download_hashes.get(book_id))
                     return True
                 
                 retry_count += 1
@@ -141,182 +454,192 @@ class GutenbergHarvester:
             if error_msg:
                 logging.error(error_msg)
             self.failed_downloads.add(book_id)
+            self._record(book_id, FAILED, url=url, reason=error_msg)
             return False
 
     async def process_book(self, zip_path: Path) -> None:
         book_id = zip_path.stem
+        output_path = self.processed_dir / f"{book_id}.txt"
         
         try:
-            is_valid, error_msg = await self.validate_zip_file(zip_path)
-            if not is_valid:
-                if error_msg:
-                    logging.error(error_msg)
-                self.failed_downloads.add(book_id)
-                return
-
-            with zipfile.ZipFile(zip_path) as zf:
-                txt_files = [f for f in zf.namelist() if f.endswith('.txt')]
-                zf.extractall(self.extracted_dir)
+            loop = asyncio.get_running_loop()
+            error_msg, messages, processed_any = await loop.run_in_executor(
+                self._get_executor(), _extract_book, str(zip_path), str(output_path)
+            )
             
-            processed_any = False
-            for txt_file in txt_files:
-                extracted_path = self.extracted_dir / txt_file
-                try:
-                    async with aiofiles.open(extracted_path, 'r', encoding='utf-8', errors='ignore') as f:
-                        content = await f.read()
-                    
-                    if not content.strip():
-                        logging.warning(f"Empty content in {txt_file}")
-                        continue
-                    
-                    processed_content = self.process_text(content)
-                    if not processed_content.strip():
-                        logging.warning(f"Empty processed content for {txt_file}")
-                        continue
-                    
-                    output_path = self.processed_dir / f"{book_id}.txt"
-                    async with aiofiles.open(output_path, 'w', encoding='utf-8') as f:
-                        await f.write(processed_content)
-                    
-                    processed_any = True
-                    
-                except Exception as e:
-                    logging.error(f"Error processing text file {txt_file}: {e}")
-                finally:
-                    if extracted_path.exists():
-                        extracted_path.unlink()
+            if error_msg:
+                logging.error(error_msg)
+            for level, message in messages:
+                logging.log(level, message)
             
             if processed_any:
                 self.processed_ids.add(book_id)
+                self._record(book_id, PROCESSED)
             else:
                 self.failed_downloads.add(book_id)
-            
-            if zip_path.exists():
-                zip_path.unlink()
+                self._record(book_id, FAILED, reason=error_msg or "No usable text in archive")
             
         except Exception as e:
             logging.error(f"Error processing {zip_path}: {e}")
             self.failed_downloads.add(book_id)
+            self._record(book_id, FAILED, reason=str(e))
+        finally:
             if zip_path.exists():
                 zip_path.unlink()
 
     def process_text(self, text: str) -> str:
+        return clean_book_text(text)
+
+    async def get_page_content(self, url: str, params: dict = None) -> Tuple[List[str], Optional[str]]:
+        session = await self.open()
         try:
-            start_markers = [
-                "*** START OF THIS PROJECT GUTENBERG",
-                "*** START OF THE PROJECT GUTENBERG",
-            ]
-            end_markers = [
-                "*** END OF THIS PROJECT GUTENBERG",
-                "*** END OF THE PROJECT GUTENBERG",
-            ]
-            
-            header_end = -1
-            for marker in start_markers:
-                pos = text.find(marker)
-                if pos != -1:
-                    header_end = text.find('\n', pos) + 1
-                    break
+            async with session.get(url, params=params) as response:
+                if response.status != 200:
+                    logging.error(f"Failed to fetch page: {url} (Status: {response.status})")
+                    return [], None
+                
+                content = await response.text()
+                soup = BeautifulSoup(content, 'html.parser')
+                
+                links = [a['href'] for a in soup.find_all('a', href=True) 
+                        if a['href'].endswith('.zip')]
+                
+                next_link = soup.find('a', string='Next Page')
+                next_url = None
+                if next_link and 'href' in next_link.attrs:
+                    next_url = urljoin(self.base_url, next_link['href'])
+                    parsed_url = urlparse(next_url)
+                    query_params = parse_qs(parsed_url.query)
+                    if 'filetypes[]' not in query_params:
+                        next_url = f"{next_url}&filetypes[]=txt&langs[]=en"
+                
+                return links, next_url
+        except asyncio.TimeoutError:
+            logging.error(f"Timeout while fetching page: {url}")
+            return [], None
+        except Exception as e:
+            logging.error(f"Error fetching page {url}: {e}")
+            return [], None
+
+    async def _list_books(self, download_queue: asyncio.Queue) -> None:
+        """Walks the harvest listing pages and queues every new book link for download."""
+        current_url = self.base_url
+        params = {'filetypes[]': 'txt', 'langs[]': 'en'}
+        queued: Set[str] = set()
+        known: Dict[str, str] = {}
+        
+        if self.manifest is not None:
+            known = self.manifest.states()
+            # books the last run listed or downloaded but never finished, and the failed ones to retry
+            for state in (LISTED, DOWNLOADED, FAILED) if self.retry_failed else (LISTED, DOWNLOADED):
+                for book_id, url in self.manifest.books(state):
+                    if url and not (self.download_dir / f"{book_id}.zip").exists():
+                        queued.add(book_id)
+                        await download_queue.put(url)
             
-            if header_end != -1:
-                text = text[header_end:]
+            cursor = self.manifest.get_cursor()
+            if cursor:
+                logging.info(f"Resuming listing at {cursor}")
+                current_url = cursor
+                params = None
+        
+        while True:
+            logging.info(f"Fetching links from: {current_url}")
+            links, next_url = await self.get_page_content(current_url, params)
             
-            footer_start = len(text)
-            for marker in end_markers:
-                pos = text.find(marker)
-                if pos != -1:
-                    footer_start = pos
-                    break
+            if not links:
+                logging.info("No more books found.")
+                break
             
-            text = text[:footer_start]
+            for link in links:
+                book_id = link.split('/')[-2]
+                if book_id not in queued and book_id not in known:
+                    queued.add(book_id)
+                    self._record(book_id, LISTED, url=link)
+                    await download_queue.put(link)
             
-            license_markers = [
-                "End of the Project Gutenberg",
-                "End of Project Gutenberg",
-                "*** END OF THIS PROJECT GUTENBERG",
-                "*** END OF THE PROJECT GUTENBERG"
-            ]
+            if self.manifest is not None:
+                self.manifest.checkpoint(next_url or current_url)
             
-            for marker in license_markers:
-                pos = text.rfind(marker)
-                if pos != -1:
-                    text = text[:pos].strip()
+            if not next_url:
+                logging.info("No next page link found.")
+                break
             
-            return re.sub(r'\n{3,}', '\n\n', text.strip())
-        except Exception as e:
-            logging.error(f"Error processing text content: {e}")
-            return text
+            current_url = next_url
+            params = None
+            await asyncio.sleep(self.page_delay)
 
-    async def get_page_content(self, url: str, params: dict = None) -> Tuple[List[str], Optional[str]]:
-        async with aiohttp.ClientSession() as session:
+    async def _download_worker(self, download_queue: asyncio.Queue, process_queue: asyncio.Queue) -> None:
+        while True:
+            link = await download_queue.get()
+            if link is None:
+                return
+            
             try:
-                async with session.get(url, params=params, timeout=30) as response:
-                    if response.status != 200:
-                        logging.error(f"Failed to fetch page: {url} (Status: {response.status})")
-                        return [], None
-                    
-                    content = await response.text()
-                    soup = BeautifulSoup(content, 'html.parser')
-                    
-                    links = [a['href'] for a in soup.find_all('a', href=True) 
-                            if a['href'].endswith('.zip')]
-                    
-                    next_link = soup.find('a', string='Next Page')
-                    next_url = None
-                    if next_link and 'href' in next_link.attrs:
-                        next_url = urljoin(self.base_url, next_link['href'])
-                        parsed_url = urlparse(next_url)
-                        query_params = parse_qs(parsed_url.query)
-                        if 'filetypes[]' not in query_params:
-                            next_url = f"{next_url}&filetypes[]=txt&langs[]=en"
-                    
-                    return links, next_url
-            except asyncio.TimeoutError:
-                logging.error(f"Timeout while fetching page: {url}")
-                return [], None
+                if await self.download_book(link):
+                    await process_queue.put(self.download_dir / f"{link.split('/')[-2]}.zip")
             except Exception as e:
-                logging.error(f"Error fetching page {url}: {e}")
-                return [], None
+                logging.error(f"Error downloading {link}: {e}")
+
+    async def _process_worker(self, process_queue: asyncio.Queue) -> None:
+        while True:
+            zip_path = await process_queue.get()
+            if zip_path is None:
+                return
+            await self.process_book(zip_path)
 
     async def harvest_books(self):
-        current_url = self.base_url
-        params = {'filetypes[]': 'txt', 'langs[]': 'en'}
+        """
+        Runs listing, download and processing as one pipeline.
+
+        The listing feeds a bounded download queue served by `concurrency`
+        download workers, which hand every finished archive to a bounded
+        processing queue served by `process_workers` workers. All three stages
+        run at the same time, and a full queue holds the stage before it back.
+        """
+        download_queue: asyncio.Queue = asyncio.Queue(maxsize=self.concurrency * 2)
+        process_queue: asyncio.Queue = asyncio.Queue(maxsize=self.process_workers * 2)
+        
+        downloaders = [
+            asyncio.create_task(self._download_worker(download_queue, process_queue))
+            for _ in range(self.concurrency)
+        ]
+        processors = [
+            asyncio.create_task(self._process_worker(process_queue))
+            for _ in range(self.process_workers)
+        ]
         
         try:
-            while True:
-                logging.info(f"Fetching links from: {current_url}")
-                links, next_url = await self.get_page_content(current_url, params)
-                
-                if not links:
-                    logging.info("No more books found.")
-                    break
-                
-                download_tasks = [self.download_book(link) for link in links]
-                download_results = await asyncio.gather(*download_tasks, return_exceptions=True)
-                
-                zip_files = list(self.download_dir.glob('*.zip'))
-                process_tasks = [self.process_book(zip_path) for zip_path in zip_files]
-                await asyncio.gather(*process_tasks, return_exceptions=True)
-                
-                if not next_url:
-                    logging.info("No next page link found.")
-                    break
-                
-                current_url = next_url
-                params = None
-                await asyncio.sleep(1)
+            # archives left over from an interrupted run are processed first
+            for zip_path in self.download_dir.glob('*.zip'):
+                await process_queue.put(zip_path)
+            
+            try:
+                await self._list_books(download_queue)
+            finally:
+                for _ in downloaders:
+                    await download_queue.put(None)
+            
+            await asyncio.gather(*downloaders)
+            for _ in processors:
+                await process_queue.put(None)
+            await asyncio.gather(*processors)
             
             logging.info(f"Harvest complete. Processed {len(self.processed_ids)} books successfully.")
             if self.failed_downloads:
                 logging.warning(f"Failed to process {len(self.failed_downloads)} books: {sorted(self.failed_downloads)}")
+            if self.manifest is not None:
+                logging.info(f"Manifest totals: {self.manifest.counts()}")
                 
         except Exception as e:
             logging.error(f"Fatal error in harvest_books: {e}")
+            for task in downloaders + processors:
+                task.cancel()
             raise
 
 async def main():
-    harvester = GutenbergHarvester()
-    await harvester.harvest_books()
+    async with GutenbergHarvester() as harvester:
+        await harvester.harvest_books()
 
 if __name__ == "__main__":
     asyncio.run(main())
@@ -0,0 +1,222 @@
+"""
+Local stand-in for the parts of gutenberg.org the harvester talks to.
+
+Serves paginated robot/harvest listings with "Next Page" links and
+synthetic zip archives of generated books under any mirror path, so
+GutenbergHarvester can be measured and regression tested without the
+network. Latency, the rate of failing requests and the share of corrupt
+archives are configurable; book contents and corruption are derived from
+the seed, so runs are repeatable.
+"""
+import argparse
+import asyncio
+import io
+import logging
+import random
+import zipfile
+from typing import Dict, List, Optional
+
+from aiohttp import web
+
+logging.basicConfig(
+    level=logging.INFO,
+    format='%(asctime)s - %(levelname)s - %(message)s'
+)
+
+FIRST_BOOK_ID = 1000
+LINE_POOL = 4096
+VOCABULARY = (
+    "the of and to in a is that for it as was with be by on not he I this are or his from at which "
+    "but have an they you were her she there one all we their been has when who will more no if out "
+    "so said what up its about into than them can only other new some could time these two may then"
+).split()
+
+
+class GutenbergStandIn:
+    """
+    aiohttp application imitating the harvest listing and the mirrors.
+
+    Args:
+        books: Number of books in the listing
+        per_page: Book links per listing page
+        latency: Seconds every response is delayed by
+        error_rate: Share of archive requests answered with 503
+        corrupt_rate: Share of books whose archive fails its CRC check
+        book_size: Approximate bytes of text per book
+        seed: Seed for book contents, corruption and errors
+    """
+
+    def __init__(self, books: int = 200, per_page: int = 50, latency: float = 0.0, error_rate: float = 0.0,
+                 corrupt_rate: float = 0.0, book_size: int = 200000, seed: int = 0):
+        self.books = books
+        self.per_page = per_page
+        self.latency = latency
+        self.error_rate = error_rate
+        self.corrupt_rate = corrupt_rate
+        self.book_size = book_size
+        self.seed = seed
+        self.random = random.Random(seed)
+        self.stats = {'requests': 0, 'errors': 0, 'archives': 0, 'bytes_served': 0}
+        self.runner: Optional[web.AppRunner] = None
+        self.base_url: Optional[str] = None
+        self.archives: Dict[int, bytes] = {}
+
+        # books are stitched together from a shared pool of generated lines
+        rng = random.Random(seed)
+        self.lines = [' '.join(rng.choices(VOCABULARY, k=12)) + ('.\n\n' if rng.random() < 0.1 else '.\n') for _ in range(LINE_POOL)]
+        self.line_size = sum(map(len, self.lines)) / LINE_POOL
+
+    def book_ids(self) -> List[int]:
+        return list(range(FIRST_BOOK_ID, FIRST_BOOK_ID + self.books))
+
+    def is_corrupt(self, book_id: int) -> bool:
+        return random.Random(self.seed * 1000003 + book_id).random() < self.corrupt_rate
+
+    def book_text(self, book_id: int) -> str:
+        rng = random.Random(self.seed * 1000003 + book_id)
+        lines = rng.choices(self.lines, k=max(1, int(self.book_size / self.line_size)))
+        return (
+            f"The Project Gutenberg EBook of Book {book_id}\n\n*** START OF THIS PROJECT GUTENBERG EBOOK {book_id} ***\n"
+            + ''.join(lines)
+            + f"*** END OF THIS PROJECT GUTENBERG EBOOK {book_id} ***\n\nEnd of Project Gutenberg's license\n"
+        )
+
+    def archive(self, book_id: int) -> bytes:
+        buffer = io.BytesIO()
+        with zipfile.ZipFile(buffer, 'w', zipfile.ZIP_DEFLATED) as zf:
+            zf.writestr(f"{book_id}.txt", self.book_text(book_id))
+        data = buffer.getvalue()
+
+        if self.is_corrupt(book_id):
+            # flip a byte inside the compressed member, the central directory stays intact
+            damaged = bytearray(data)
+            damaged[len(damaged) // 3] ^= 0xFF
+            data = bytes(damaged)
+        return data
+
+    async def _delay(self) -> None:
+        self.stats['requests'] += 1
+        if self.latency:
+            await asyncio.sleep(self.latency)
+
+    async def listing(self, request: web.Request) -> web.Response:
+        await self._delay()
+        offset = int(request.query.get('offset', 0))
+        page = self.book_ids()[offset:offset + self.per_page]
+
+        links = ''.join(f'<a href="{self.base_url}/files/{book_id}/{book_id}.zip">{book_id}.zip</a><br>\n' for book_id in page)
+        if offset + self.per_page < self.books:
+            links += f'<a href="/robot/harvest?offset={offset + self.per_page}&filetypes[]=txt&langs[]=en">Next Page</a>\n'
+        return web.Response(text=f"<html><body>\n{links}</body></html>", content_type='text/html')
+
+    async def archive_file(self, request: web.Request) -> web.StreamResponse:
+        await self._delay()
+        segments = request.match_info['path'].split('/')
+        if len(segments) < 2 or not segments[-2].isdigit():
+            raise web.HTTPNotFound()
+        book_id = int(segments[-2])
+        if book_id not in range(FIRST_BOOK_ID, FIRST_BOOK_ID + self.books):
+            raise web.HTTPNotFound()
+
+        if self.random.random() < self.error_rate:
+            self.stats['errors'] += 1
+            raise web.HTTPServiceUnavailable()
+
+        data = self.archives[book_id]
+        start = 0
+        status = 200
+        headers = {'Accept-Ranges': 'bytes'}
+        if request.http_range.start is not None:
+            start = request.http_range.start
+            if start >= len(data):
+                raise web.HTTPRequestRangeNotSatisfiable(headers={'Content-Range': f"bytes */{len(data)}"})
+            status = 206
+            headers['Content-Range'] = f"bytes {start}-{len(data) - 1}/{len(data)}"
+
+        self.stats['archives'] += 1
+        self.stats['bytes_served'] += len(data) - start
+        return web.Response(body=data[start:], status=status, headers=headers, content_type='application/zip')
+
+    async def stats_page(self, request: web.Request) -> web.Response:
+        return web.json_response(self.stats)
+
+    def app(self) -> web.Application:
+        app = web.Application()
+        app.router.add_get('/robot/harvest', self.listing)
+        app.router.add_get('/stats', self.stats_page)
+        app.router.add_get('/{path:.+\\.zip}', self.archive_file)
+        return app
+
+    async def start(self, host: str = '127.0.0.1', port: int = 0) -> str:
+        """
+        Starts serving and returns the base URL, port 0 picks a free port.
+
+        Every archive is built before the server accepts requests, so serving
+        costs no more than copying bytes and benchmarks measure the client.
+        """
+        for book_id in self.book_ids():
+            self.archives[book_id] = self.archive(book_id)
+
+        self.runner = web.AppRunner(self.app(), access_log=None)
+        await self.runner.setup()
+        await web.TCPSite(self.runner, host, port).start()
+        bound_host, bound_port = self.runner.addresses[0][:2]
+        self.base_url = f"http://{bound_host}:{bound_port}"
+        return self.base_url
+
+    async def stop(self) -> None:
+        if self.runner is not None:
+            await self.runner.cleanup()
+            self.runner = None
+
+    @property
+    def harvest_url(self) -> str:
+        return f"{self.base_url}/robot/harvest"
+
+
+def configure_harvester(harvester, base_url: str) -> None:
+    """Points a GutenbergHarvester at a stand-in served from base_url."""
+    harvester.base_url = f"{base_url}/robot/harvest"
+    harvester.mirror_urls = [f"{base_url}/files", f"{base_url}/mirror"]
+
+
+def add_arguments(parser: argparse.ArgumentParser) -> None:
+    parser.add_argument('--books', type=int, default=200, help="number of books in the listing")
+    parser.add_argument('--per-page', type=int, default=50, help="book links per listing page")
+    parser.add_argument('--latency', type=float, default=0.0, help="seconds every response is delayed by")
+    parser.add_argument('--error-rate', type=float, default=0.0, help="share of archive requests answered with 503")
+    parser.add_argument('--corrupt-rate', type=float, default=0.0, help="share of books with a corrupt archive")
+    parser.add_argument('--book-size', type=int, default=200000, help="approximate bytes of text per book")
+    parser.add_argument('--seed', type=int, default=0, help="seed for contents, corruption and errors")
+
+
+def stand_in_from_args(args: argparse.Namespace) -> GutenbergStandIn:
+    return GutenbergStandIn(args.books, args.per_page, args.latency, args.error_rate,
+                            args.corrupt_rate, args.book_size, args.seed)
+
+
+async def serve(stand_in: GutenbergStandIn, host: str, port: int) -> None:
+    base_url = await stand_in.start(host, port)
+    logging.info(f"Serving {stand_in.books} books, harvest listing at {stand_in.harvest_url}")
+    try:
+        await asyncio.Event().wait()
+    finally:
+        logging.info(f"Stopped serving at {base_url}: {stand_in.stats}")
+        await stand_in.stop()
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    parser = argparse.ArgumentParser(description="Serves a local stand-in of the Gutenberg harvest listing and mirrors.")
+    add_arguments(parser)
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8080)
+    args = parser.parse_args(argv)
+
+    try:
+        asyncio.run(serve(stand_in_from_args(args), args.host, args.port))
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,118 @@
+"""
+Persistent manifest of a Gutenberg harvest, so an interrupted crawl resumes where it stopped.
+
+Every book the listing turns up is recorded with its state (listed,
+downloaded, processed or failed), its archive hash and the failure reason,
+next to the URL of the listing page to continue from. Writes are buffered
+and committed in batches, one transaction each.
+"""
+import logging
+import sqlite3
+import time
+from typing import Dict, List, Optional, Tuple
+
+DEFAULT_MANIFEST_FILE = 'harvest_manifest.sqlite'
+DEFAULT_BATCH_SIZE = 100
+
+LISTED = 'listed'
+DOWNLOADED = 'downloaded'
+PROCESSED = 'processed'
+FAILED = 'failed'
+
+
+class HarvestManifest:
+    """
+    SQLite store of book_id -> (state, url, sha256, reason) plus the listing cursor.
+
+    Args:
+        path: Database file
+        batch_size: Number of buffered book updates that triggers a commit
+    """
+
+    def __init__(self, path: str = DEFAULT_MANIFEST_FILE, batch_size: int = DEFAULT_BATCH_SIZE):
+        self.path = path
+        self.batch_size = batch_size
+        self.pending: List[Tuple] = []
+        self.logger = logging.getLogger('harvest_manifest')
+
+        self.connection = sqlite3.connect(path)
+        self.connection.executescript("""
+            PRAGMA journal_mode = WAL;
+            PRAGMA synchronous = NORMAL;
+            CREATE TABLE IF NOT EXISTS books (
+                book_id TEXT PRIMARY KEY,
+                state   TEXT NOT NULL,
+                url     TEXT,
+                sha256  TEXT,
+                reason  TEXT,
+                updated REAL NOT NULL
+            ) WITHOUT ROWID;
+            CREATE INDEX IF NOT EXISTS books_state ON books (state);
+            CREATE TABLE IF NOT EXISTS meta (
+                key   TEXT PRIMARY KEY,
+                value TEXT NOT NULL
+            );
+        """)
+
+    def mark(self, book_id: str, state: str, url: Optional[str] = None,
+             sha256: Optional[str] = None, reason: Optional[str] = None) -> None:
+        """
+        Buffers a state change of a book, committed with the next batch.
+
+        A missing url or hash keeps the stored one, the reason is replaced.
+        """
+        self.pending.append((book_id, state, url, sha256, reason, time.time()))
+        if len(self.pending) >= self.batch_size:
+            self.flush()
+
+    def flush(self) -> None:
+        """Commits the buffered updates in one transaction."""
+        if not self.pending:
+            return
+        with self.connection:
+            self.connection.executemany("""
+                INSERT INTO books (book_id, state, url, sha256, reason, updated)
+                VALUES (?, ?, ?, ?, ?, ?)
+                ON CONFLICT (book_id) DO UPDATE SET
+                    state = excluded.state,
+                    url = COALESCE(excluded.url, books.url),
+                    sha256 = COALESCE(excluded.sha256, books.sha256),
+                    reason = excluded.reason,
+                    updated = excluded.updated
+            """, self.pending)
+        self.pending = []
+
+    def states(self) -> Dict[str, str]:
+        """book_id -> state of every recorded book."""
+        self.flush()
+        return dict(self.connection.execute("SELECT book_id, state FROM books"))
+
+    def books(self, state: str) -> List[Tuple[str, Optional[str]]]:
+        """(book_id, url) of the books in a state."""
+        self.flush()
+        return self.connection.execute("SELECT book_id, url FROM books WHERE state = ?", (state,)).fetchall()
+
+    def counts(self) -> Dict[str, int]:
+        self.flush()
+        return dict(self.connection.execute("SELECT state, COUNT(*) FROM books GROUP BY state"))
+
+    def get_cursor(self) -> Optional[str]:
+        """URL of the listing page to continue from, None before the first checkpoint."""
+        row = self.connection.execute("SELECT value FROM meta WHERE key = 'cursor'").fetchone()
+        return row[0] if row else None
+
+    def checkpoint(self, cursor: str) -> None:
+        """Commits the buffered updates together with the listing page to continue from."""
+        self.flush()
+        with self.connection:
+            self.connection.execute("INSERT OR REPLACE INTO meta (key, value) VALUES ('cursor', ?)", (cursor,))
+
+    def close(self) -> None:
+        self.flush()
+        self.connection.close()
+
+    def __enter__(self) -> 'HarvestManifest':
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
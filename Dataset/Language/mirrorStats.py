@@ -0,0 +1,93 @@
+"""
+Rolling per mirror response statistics, used to order download attempts and time hedged requests.
+
+Every request records how long the mirror took to answer and whether the
+answer was usable. Mirrors are ranked by their expected time to a usable
+response, the mean latency of those answers divided by the success rate, so
+a mirror that keeps timing out, or quickly answers 404 for files it does not
+have, sinks to the end of the list no matter how fast it was once.
+"""
+from collections import defaultdict, deque
+from typing import Deque, Dict, List
+from urllib.parse import urlparse
+
+WINDOW = 50
+ALPHA = 0.2
+DEFAULT_LATENCY = 1.0
+DEFAULT_HEDGE_DELAY = 2.0
+MIN_HEDGE_DELAY = 0.05
+MIN_SAMPLES = 10
+MIN_SUCCESS_RATE = 0.01
+
+
+def mirror_key(url: str) -> str:
+    """Statistics are kept per scheme and host."""
+    parsed = urlparse(url)
+    return f"{parsed.scheme}://{parsed.netloc}"
+
+
+class MirrorStats:
+    """
+    Latencies of the last `window` answers and an exponentially weighted success rate per mirror.
+
+    Args:
+        window: Number of latencies kept per mirror
+        alpha: Weight of the newest outcome in the success rate
+    """
+
+    def __init__(self, window: int = WINDOW, alpha: float = ALPHA):
+        self.alpha = alpha
+        self.latencies: Dict[str, Deque[float]] = defaultdict(lambda: deque(maxlen=window))
+        self.success: Dict[str, float] = {}
+
+    def record(self, url: str, latency: float, ok: bool) -> None:
+        """
+        Records one request.
+
+        Args:
+            url: Requested URL
+            latency: Seconds until the response headers arrived or the request failed
+            ok: Whether the mirror served the file; errors, timeouts and answers
+                such as a 404 count against it and their latency is not kept
+        """
+        key = mirror_key(url)
+        self.success[key] = (1 - self.alpha) * self.success.get(key, 1.0) + self.alpha * (1.0 if ok else 0.0)
+        if ok:
+            self.latencies[key].append(latency)
+
+    def expected_time(self, url: str) -> float:
+        """Expected seconds to an answer; unknown mirrors get a neutral prior."""
+        key = mirror_key(url)
+        latencies = self.latencies.get(key)
+        mean = sum(latencies) / len(latencies) if latencies else DEFAULT_LATENCY
+        return mean / max(self.success.get(key, 1.0), MIN_SUCCESS_RATE)
+
+    def rank(self, urls: List[str]) -> List[str]:
+        """Orders URLs by expected time, keeping the given order between equals."""
+        return sorted(urls, key=self.expected_time)
+
+    def hedge_delay(self, percentile: float, ceiling: float) -> float:
+        """
+        How long to wait for an answer before asking the next mirror as well.
+
+        Args:
+            percentile: Latency percentile over all mirrors, e.g. 0.95
+            ceiling: Upper bound, normally the request timeout
+
+        Returns:
+            The percentile latency, or a default until enough answers were seen
+        """
+        samples = sorted(latency for latencies in self.latencies.values() for latency in latencies)
+        if len(samples) < MIN_SAMPLES:
+            return min(DEFAULT_HEDGE_DELAY, ceiling)
+        value = samples[min(int(percentile * len(samples)), len(samples) - 1)]
+        return min(max(value, MIN_HEDGE_DELAY), ceiling)
+
+    def summary(self) -> Dict[str, Dict[str, float]]:
+        return {
+            key: {
+                'success_rate': rate,
+                'mean_latency': sum(self.latencies[key]) / len(self.latencies[key]) if self.latencies.get(key) else None
+            }
+            for key, rate in self.success.items()
+        }
@@ -1,48 +1,148 @@
+import argparse
 import os
-from concurrent.futures import ThreadPoolExecutor
+from collections import deque
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Callable, Deque, Iterator, List, Optional, TypeVar
 
-BATCH_SIZE = 1000
+from corpusShards import SHARD_SIZE, ShardWriter
+
+T = TypeVar('T')
+
+QUEUE_SIZE = 64
 BUFFER_SIZE = 8192000
+MAX_BOOK_SIZE = 5 * 1024 * 1024
+
+def _truncate_utf8(data: bytes, max_size: int) -> bytes:
+    """Cuts UTF-8 data to at most max_size bytes without splitting a character."""
+    if len(data) <= max_size:
+        return data
+    cut = max_size
+    # step back over continuation bytes to the start of the character that does not fit
+    while cut > 0 and data[cut] & 0xC0 == 0x80:
+        cut -= 1
+    return data[:cut]
+
+def read_book(file_path: str, max_size: int = MAX_BOOK_SIZE) -> Optional[bytes]:
+    """
+    Reads a book without surrounding whitespace and capped at max_size bytes, as UTF-8.
 
-def process_file(file_path):
+    The text is kept as the bytes read from disk, so capping it needs no
+    re-encoding; it is only decoded to check it and find the surrounding
+    whitespace.
+
+    Returns:
+        The text, or None if the file could not be read or decoded
+    """
     try:
-        with open(file_path, 'r', encoding='utf-8', buffering=BUFFER_SIZE) as f:
-            file_content = f.read().strip()
-            if len(file_content) > 0:
-                max_size = 5 * 1024 * 1024
-                if len(file_content.encode('utf-8')) > max_size:
-                    file_content = file_content[:max_size]
-
-            result = f"--- Start of {os.path.basename(file_path)} ---\n"
-            result += file_content
-            result += f"\n--- End of {os.path.basename(file_path)} ---\n\n"
-            return result
+        with open(file_path, 'rb', buffering=BUFFER_SIZE) as f:
+            data = f.read()
+        if b'\r' in data:
+            # the same newline translation reading in text mode does
+            data = data.replace(b'\r\n', b'\n').replace(b'\r', b'\n')
+
+        text = data.decode('utf-8')
+        stripped = text.strip()
+        if not stripped:
+            return b''
+        lead = len(text) - len(text.lstrip())
+        trail = len(text) - lead - len(stripped)
+        start = len(text[:lead].encode('utf-8'))
+        end = len(data) - len(text[len(text) - trail:].encode('utf-8'))
+        return _truncate_utf8(data[start:end], max_size)
     except Exception as e:
         print(f"Error processing {file_path}: {e}")
-        return ""
+        return None
+
+def process_file(file_path: str, max_size: int = MAX_BOOK_SIZE) -> bytes:
+    """Reads a book and wraps it in start and end lines, as UTF-8."""
+    data = read_book(file_path, max_size)
+    if data is None:
+        return b""
+    name = os.path.basename(file_path)
+    return f"--- Start of {name} ---\n".encode('utf-8') + data + f"\n--- End of {name} ---\n\n".encode('utf-8')
+
+def ordered_map(function: Callable[[str], T], files: List[str], workers: Optional[int] = None,
+                queue_size: int = QUEUE_SIZE) -> Iterator[T]:
+    """
+    Yields function(file) for every file, in order, computed on a thread pool.
+
+    At most queue_size results are in flight, and each is handed on as soon as
+    it and everything before it are done, so memory does not grow with the
+    size of the corpus.
+    """
+    pending: Deque[Future] = deque()
+    with ThreadPoolExecutor(workers) as executor:
+        for file_path in files:
+            if len(pending) >= queue_size:
+                yield pending.popleft().result()
+            pending.append(executor.submit(function, file_path))
+
+        while pending:
+            yield pending.popleft().result()
+
+def combine_files(files: List[str], output_path: str, workers: Optional[int] = None,
+                  queue_size: int = QUEUE_SIZE) -> int:
+    """
+    Writes the processed books into one file, in the order of files.
+
+    Returns:
+        Number of books written
+    """
+    written = 0
+    with open(output_path, 'wb', buffering=BUFFER_SIZE) as out:
+        for result in ordered_map(process_file, files, workers, queue_size):
+            if written:
+                out.write(b"\n")
+            out.write(result)
+            written += 1
+    return written
+
+def shard_files(files: List[str], output_dir: str, shard_size: int = SHARD_SIZE,
+                workers: Optional[int] = None, queue_size: int = QUEUE_SIZE) -> int:
+    """
+    Writes the processed books into shards of output_dir with a byte-offset index, see corpusShards.
+
+    Books that cannot be read are left out.
+
+    Returns:
+        Number of books written
+    """
+    with ShardWriter(output_dir, shard_size) as writer:
+        for file_path, data in zip(files, ordered_map(read_book, files, workers, queue_size)):
+            if data is not None:
+                writer.add(os.path.basename(file_path), data)
+        return len(writer.books)
 
-source_folder = r'gutenberg_books'
-destination_folder = r'processedFolder'
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Combines the downloaded Gutenberg books into a sharded corpus.")
+    parser.add_argument('source', nargs='?', default='gutenberg_books', help="directory of the book .txt files")
+    parser.add_argument('--output-dir', default='processedFolder', help="directory of the shards and their index")
+    parser.add_argument('--shard-size', type=int, default=SHARD_SIZE // (1024 * 1024), help="shard size in MB")
+    parser.add_argument('--dedupe', action='store_true', help="leave out near-duplicate books, see dedupeGutenberg")
+    parser.add_argument('--combined', metavar='FILE', nargs='?', const='combined_processed.txt',
+                        help="write one combined file instead of shards")
+    args = parser.parse_args()
 
-if not os.path.exists(destination_folder):
-    os.makedirs(destination_folder)
+    files = [os.path.join(args.source, f) for f in os.listdir(args.source) if f.endswith('.txt')]
 
-files = [os.path.join(source_folder, f) for f in os.listdir(source_folder) if f.endswith('.txt')]
+    if args.dedupe:
+        from dedupeGutenberg import find_duplicates
 
-combined_content = []
+        duplicates = find_duplicates(files)
+        files = [file_path for file_path in files if file_path not in duplicates]
+        print(f"Left out {len(duplicates)} near-duplicate books")
 
-with ThreadPoolExecutor() as executor:
-    for i in range(0, len(files), BATCH_SIZE):
-        batch = files[i:i + BATCH_SIZE]
-        results = executor.map(process_file, batch)
-        for result in results:
-            combined_content.append(result)
+    if args.combined:
+        combined_file_path = os.path.abspath(args.combined)
+        if not os.path.exists(os.path.dirname(combined_file_path)):
+            os.makedirs(os.path.dirname(combined_file_path))
 
-combined_file_path = os.path.join(os.getcwd(), 'combined_processed.txt')
-if not os.path.exists(os.path.dirname(combined_file_path)):
-    os.makedirs(os.path.dirname(combined_file_path))
+        combine_files(files, combined_file_path)
+        print(f"All processed files have been combined into {combined_file_path}")
+        return
 
-with open(combined_file_path, 'w', encoding='utf-8', buffering=BUFFER_SIZE) as f:
-    f.write("\n".join(combined_content))
+    books = shard_files(files, args.output_dir, args.shard_size * 1024 * 1024)
+    print(f"{books} processed files have been sharded into {args.output_dir}")
 
-print(f"All processed files have been combined into {combined_file_path}")
+if __name__ == "__main__":
+    main()
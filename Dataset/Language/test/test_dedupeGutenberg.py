@@ -0,0 +1,59 @@
+import os
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from dedupeGutenberg import book_signature, find_duplicates, similarity  # noqa: E402
+
+# with two rows per band nearly every pair above a similarity of 0.3 becomes a candidate
+BANDS = 64
+THRESHOLD = 0.55
+
+
+def write_book(directory, name, words):
+    path = directory / name
+    path.write_text(" ".join(f"w{word:04d}" for word in words), encoding='utf-8')
+    return str(path)
+
+
+def test_books_similar_only_through_a_chain_are_kept(tmp_path):
+    # a~b and b~c, but a and c share less than the threshold
+    a = write_book(tmp_path, "a.txt", range(0, 200))
+    b = write_book(tmp_path, "b.txt", range(40, 240))
+    c = write_book(tmp_path, "c.txt", range(80, 280))
+    signatures = {path: book_signature(path) for path in (a, b, c)}
+    assert similarity(signatures[a], signatures[b]) >= THRESHOLD
+    assert similarity(signatures[b], signatures[c]) >= THRESHOLD
+    assert similarity(signatures[a], signatures[c]) < THRESHOLD
+
+    duplicates = find_duplicates([a, b, c], THRESHOLD, BANDS, jobs=2)
+
+    assert duplicates == {b: (a, similarity(signatures[a], signatures[b]))}
+
+
+def test_every_copy_is_dropped_for_the_largest_edition(tmp_path):
+    words = list(range(300))
+    copies = [write_book(tmp_path, f"copy{i}.txt", words) for i in range(3)]
+    complete = write_book(tmp_path, "complete.txt", words + [9999])
+    unrelated = write_book(tmp_path, "unrelated.txt", range(5000, 5300))
+    empty = write_book(tmp_path, "empty.txt", [])
+
+    duplicates = find_duplicates(copies + [complete, unrelated, empty], THRESHOLD, BANDS, jobs=2)
+
+    assert set(duplicates) == set(copies)
+    for kept, score in duplicates.values():
+        assert kept == complete
+        assert THRESHOLD <= score <= 1.0
+
+
+def test_reported_similarity_always_meets_the_threshold(tmp_path):
+    files = [write_book(tmp_path, f"book{start:03d}.txt", range(start, start + 200)) for start in range(0, 200, 20)]
+    signatures = {path: book_signature(path) for path in files}
+
+    duplicates = find_duplicates(files, THRESHOLD, BANDS, jobs=2)
+
+    assert duplicates
+    for duplicate, (kept, score) in duplicates.items():
+        assert kept not in duplicates
+        assert score == similarity(signatures[duplicate], signatures[kept]) >= THRESHOLD
@@ -0,0 +1,143 @@
+import io
+import os
+import random
+import re
+import sys
+import zipfile
+
+import pytest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from downloadGutenberg import _extract_book  # noqa: E402
+from gutenbergBoilerplate import strip_boilerplate  # noqa: E402
+
+BLOCK_SIZES = [1, 2, 3, 5, 8, 13, 34, 89, 1 << 20]
+
+
+def process_text(text: str) -> str:
+    """GutenbergHarvester.process_text as it was before strip_boilerplate replaced it."""
+    start_markers = [
+        "*** START OF THIS PROJECT GUTENBERG",
+        "*** START OF THE PROJECT GUTENBERG",
+    ]
+    end_markers = [
+        "*** END OF THIS PROJECT GUTENBERG",
+        "*** END OF THE PROJECT GUTENBERG",
+    ]
+
+    header_end = -1
+    for marker in start_markers:
+        pos = text.find(marker)
+        if pos != -1:
+            header_end = text.find('\n', pos) + 1
+            break
+
+    if header_end != -1:
+        text = text[header_end:]
+
+    footer_start = len(text)
+    for marker in end_markers:
+        pos = text.find(marker)
+        if pos != -1:
+            footer_start = pos
+            break
+
+    text = text[:footer_start]
+
+    license_markers = [
+        "End of the Project Gutenberg",
+        "End of Project Gutenberg",
+        "*** END OF THIS PROJECT GUTENBERG",
+        "*** END OF THE PROJECT GUTENBERG"
+    ]
+
+    for marker in license_markers:
+        pos = text.rfind(marker)
+        if pos != -1:
+            text = text[:pos].strip()
+
+    return re.sub(r'\n{3,}', '\n\n', text.strip())
+
+
+BOOKS = {
+    'markers': (
+        "The Project Gutenberg EBook of Fixtures\n\nRelease Date: 2026\n"
+        "*** START OF THIS PROJECT GUTENBERG EBOOK FIXTURES ***\n\n\n\n"
+        "CHAPTER I\n\nIt was a dark and stormy night.\n\n\n\nThe end.\n\n"
+        "End of the Project Gutenberg EBook of Fixtures\n\n"
+        "*** END OF THIS PROJECT GUTENBERG EBOOK FIXTURES ***\n\nLicense text.\n"
+    ),
+    'no_markers': "\n\n  A book without any markers.\n\n\n\nJust text,\n\n\n\n\nand blank lines.  \n\n\n",
+    'missing_end': (
+        "Header\n*** START OF THE PROJECT GUTENBERG EBOOK NO END ***\n"
+        "Body before the license.\n\n\n\nMore body.\n"
+        "End of Project Gutenberg's No End\nlicense that never ends\n"
+    ),
+    'crlf': (
+        "Header\r\n*** START OF THIS PROJECT GUTENBERG EBOOK CRLF ***\r\n\r\n\r\n\r\n"
+        "Line one.\r\n\r\n\r\n\r\nLine two.\r\n"
+        "*** END OF THIS PROJECT GUTENBERG EBOOK CRLF ***\r\nLicense.\r\n"
+    ),
+    'blank_runs': (
+        "\n\n\n*** START OF THE PROJECT GUTENBERG EBOOK RUNS ***\n\n\n\n\n\n"
+        "a\n\n\n\n\n\n\n\nb\n \n\n\n\t\n\n\n\nc\n\n\n\n\n\n\n\n\n\n\n"
+        "*** END OF THE PROJECT GUTENBERG EBOOK RUNS ***\n\n\n\n"
+    ),
+    'start_override': (
+        "*** START OF THE PROJECT GUTENBERG EBOOK ***\nfront matter\n\n\n\n"
+        "*** START OF THIS PROJECT GUTENBERG EBOOK ***\nthe text\n\n\n"
+        "End of the Project Gutenberg EBook\nmore text\nEnd of the Project Gutenberg EBook\n"
+        "*** END OF THE PROJECT GUTENBERG EBOOK ***\n*** END OF THIS PROJECT GUTENBERG EBOOK ***\n"
+    ),
+    'start_on_last_line': "Some text\n\n\n\nmore\n*** START OF THIS PROJECT GUTENBERG EBOOK",
+}
+
+# pieces random books are made of, markers included, so cuts and runs land everywhere
+FRAGMENTS = [
+    "word", "Two words", " ", "\t", "\n", "\n", "\n\n", "\n\n\n", "\r\n", "\r", "été", "☃",
+    "*** START OF THIS PROJECT GUTENBERG EBOOK X ***", "*** START OF THE PROJECT GUTENBERG EBOOK X ***",
+    "*** END OF THIS PROJECT GUTENBERG EBOOK X ***", "*** END OF THE PROJECT GUTENBERG EBOOK X ***",
+    "End of the Project Gutenberg EBook", "End of Project Gutenberg's X", "PROJECT GUTENBERG", "Project Gutenberg",
+]
+
+
+def strip(text: str, block_size: int) -> bytes:
+    out = io.BytesIO()
+    written = strip_boilerplate(io.StringIO(text, newline=''), out, block_size)
+    assert written == len(out.getvalue())
+    return out.getvalue()
+
+
+@pytest.mark.parametrize('name', BOOKS)
+@pytest.mark.parametrize('block_size', BLOCK_SIZES)
+def test_output_is_byte_identical_to_process_text(name, block_size):
+    text = BOOKS[name]
+    assert strip(text, block_size) == process_text(text).encode('utf-8')
+
+
+@pytest.mark.parametrize('seed', range(300))
+def test_random_books_are_byte_identical_to_process_text(seed):
+    rng = random.Random(seed)
+    text = "".join(rng.choice(FRAGMENTS) for _ in range(rng.randint(0, 60)))
+    for block_size in (1, rng.randint(2, 40), 1 << 20):
+        assert strip(text, block_size) == process_text(text).encode('utf-8'), block_size
+
+
+@pytest.mark.parametrize('name', BOOKS)
+def test_extracted_books_match_the_old_extraction(name, tmp_path):
+    # the old harvester read the extracted member as text, which turns CRLF into LF
+    zip_path = tmp_path / "book.zip"
+    with zipfile.ZipFile(zip_path, 'w', zipfile.ZIP_DEFLATED) as zf:
+        zf.writestr("book.txt", BOOKS[name].encode('utf-8'))
+    content = io.TextIOWrapper(io.BytesIO(BOOKS[name].encode('utf-8')), encoding='utf-8', errors='ignore').read()
+    expected = process_text(content)
+
+    output_path = tmp_path / "book.txt"
+    error, _, processed = _extract_book(str(zip_path), str(output_path))
+
+    assert error is None
+    assert processed == bool(expected.strip())
+    if processed:
+        assert output_path.read_bytes() == expected.encode('utf-8')
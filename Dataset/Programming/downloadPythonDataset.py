@@ -1,30 +1,133 @@
 import os
+import tempfile
+from concurrent.futures import ProcessPoolExecutor
+from typing import BinaryIO, List, Set, Tuple
+
+import numpy as np
 import pandas as pd
 
-# You need to manually download the dataset from Zenodo (URL: https://zenodo.org/record/6607065) 
+# You need to manually download the dataset from Zenodo (URL: https://zenodo.org/record/6607065)
 # and place the extracted files in the same directory as this script.
 
-def process_csv_and_save_code(csv_file):
-    if os.path.exists(csv_file):
-        df = pd.read_csv(csv_file, encoding='utf-8')
-        
-        with open('python_Data.txt', 'a', encoding='utf-8') as code_file:
-            for index, row in df.iterrows():
-                code = row['code_block']
-                if isinstance(code, str):
-                    code_file.write(code + "\n\n")
-                else:
-                    print(f"Row {index + 1} in {csv_file}: No Python code found.")
-        
-        print(f"Python code from {csv_file} has been saved to python_Data.txt")
-    else:
-        print(f"Error: {csv_file} not found in the current directory. Please download and place the file manually.")
+OUTPUT_FILE = 'python_Data.txt'
+CHUNK_ROWS = 50000
+# one entry per written code block: hash of the block and its length in bytes
+INDEX_DTYPE = np.dtype([('hash', '<u8'), ('length', '<i8')])
+
+def process_csv_and_save_code(csv_file: str, part_file: str) -> Tuple[int, int]:
+    """
+    Writes the code blocks of a CSV to part_file, reading only the code_block column in chunks.
+
+    Every block is written with its trailing blank line; part_file + '.idx'
+    gets an INDEX_DTYPE entry per block, used to drop duplicates when the
+    parts are joined.
+
+    Returns:
+        Number of code blocks written and number of rows without code
+    """
+    written = 0
+    missing = 0
+
+    with open(part_file, 'wb') as code_file, open(part_file + '.idx', 'wb') as index_file:
+        for chunk in pd.read_csv(csv_file, encoding='utf-8', usecols=['code_block'],
+                                 dtype={'code_block': str}, chunksize=CHUNK_ROWS):
+            codes = chunk['code_block']
+            present = codes.notna()
+            missing += int((~present).sum())
+            codes = codes[present]
+            if codes.empty:
+                continue
+
+            blocks = [code.encode('utf-8') for code in (codes + "\n\n")]
+            index = np.empty(len(blocks), dtype=INDEX_DTYPE)
+            index['hash'] = pd.util.hash_pandas_object(codes, index=False).to_numpy()
+            index['length'] = np.fromiter(map(len, blocks), dtype=np.int64, count=len(blocks))
+
+            code_file.write(b''.join(blocks))
+            index.tofile(index_file)
+            written += len(blocks)
+
+    return written, missing
+
+def append_unique(part_file: str, out: BinaryIO, seen: Set[int]) -> Tuple[int, int]:
+    """
+    Copies the code blocks of a part to out, leaving out blocks whose hash is already in seen.
+
+    Returns:
+        Number of blocks copied and number of duplicates left out
+    """
+    copied = 0
+    duplicates = 0
+
+    with open(part_file, 'rb') as code_file, open(part_file + '.idx', 'rb') as index_file:
+        while True:
+            index = np.frombuffer(index_file.read(CHUNK_ROWS * INDEX_DTYPE.itemsize), dtype=INDEX_DTYPE)
+            if not len(index):
+                break
+            data = code_file.read(int(index['length'].sum()))
+            offsets = np.concatenate(([0], np.cumsum(index['length']))).tolist()
+
+            unique = []
+            for i, block_hash in enumerate(index['hash'].tolist()):
+                if block_hash in seen:
+                    duplicates += 1
+                    continue
+                seen.add(block_hash)
+                unique.append(data[offsets[i]:offsets[i + 1]])
+
+            out.write(b''.join(unique))
+            copied += len(unique)
+
+    return copied, duplicates
+
+def combine_csv_files(csv_files: List[str], output_file: str = OUTPUT_FILE) -> Tuple[int, int]:
+    """
+    Extracts the code blocks of all CSVs into output_file, in the order of csv_files, without exact duplicates.
+
+    The CSVs are parsed in parallel, one process each, into temporary parts.
+    Each part is appended as soon as it and all parts before it are done.
+
+    Returns:
+        Number of code blocks written and number of duplicates left out
+    """
+    copied = 0
+    duplicates = 0
+    seen: Set[int] = set()
+
+    with tempfile.TemporaryDirectory(dir=os.path.dirname(os.path.abspath(output_file))) as workdir, \
+            ProcessPoolExecutor(max(1, len(csv_files))) as executor:
+        parts = [os.path.join(workdir, f"part_{i}.txt") for i in range(len(csv_files))]
+        futures = [executor.submit(process_csv_and_save_code, csv_file, part) for csv_file, part in zip(csv_files, parts)]
+
+        temp_path = os.path.join(workdir, os.path.basename(output_file))
+        with open(temp_path, 'wb') as out:
+            for csv_file, part, future in zip(csv_files, parts, futures):
+                written, missing = future.result()
+                if missing:
+                    print(f"{missing} rows in {csv_file}: No Python code found.")
+
+                part_copied, part_duplicates = append_unique(part, out, seen)
+                copied += part_copied
+                duplicates += part_duplicates
+                print(f"Python code from {csv_file} has been saved to {output_file} "
+                      f"({part_copied} code blocks, {part_duplicates} duplicates)")
+
+        os.replace(temp_path, output_file)
+
+    return copied, duplicates
 
 def main():
     csv_files = ['сode_blocks_upto_20.csv', 'сode_blocks_21.csv']
-    
+
+    available = []
     for csv_file in csv_files:
-        process_csv_and_save_code(csv_file)
+        if os.path.exists(csv_file):
+            available.append(csv_file)
+        else:
+            print(f"Error: {csv_file} not found in the current directory. Please download and place the file manually.")
+
+    if available:
+        combine_csv_files(available)
 
 if __name__ == "__main__":
     main()
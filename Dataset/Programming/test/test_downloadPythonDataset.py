@@ -0,0 +1,78 @@
+import os
+import sys
+
+import pandas as pd
+import pytest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+import downloadPythonDataset  # noqa: E402
+from downloadPythonDataset import append_unique, combine_csv_files, process_csv_and_save_code  # noqa: E402
+
+FIRST = [
+    'import os\nprint(os.getcwd())',
+    None,
+    'def f(a, b):\n    """Adds, "quoted", values."""\n    return a + b',
+    'x = "ünïcode ☃"',
+    'import os\nprint(os.getcwd())',
+    '',
+    'for i in range(3):\n\n    print(i)\n',
+]
+SECOND = [
+    'x = "ünïcode ☃"',
+    'class A:\n    pass',
+    None,
+    'import os\nprint(os.getcwd())',
+    'y = 1, 2',
+]
+
+
+def write_csv(path, codes):
+    # the dumps have more columns than the code, which is not the first one
+    frame = pd.DataFrame({'id': range(len(codes)), 'code_block': codes, 'kernel': ['k'] * len(codes)})
+    frame.to_csv(path, index=False, encoding='utf-8')
+    return str(path)
+
+
+def original_output(csv_files):
+    """What the original script appended to python_Data.txt: every code block and a blank line, row by row."""
+    blocks = []
+    for csv_file in csv_files:
+        df = pd.read_csv(csv_file, encoding='utf-8')
+        for _, row in df.iterrows():
+            if isinstance(row['code_block'], str):
+                blocks.append(row['code_block'] + "\n\n")
+    return blocks
+
+
+def test_output_is_the_original_without_exact_duplicates(tmp_path, capsys):
+    csv_files = [write_csv(tmp_path / "first.csv", FIRST), write_csv(tmp_path / "second.csv", SECOND)]
+    output = tmp_path / "python_Data.txt"
+
+    copied, duplicates = combine_csv_files(csv_files, str(output))
+
+    blocks = original_output(csv_files)
+    unique = list(dict.fromkeys(blocks))
+    assert output.read_bytes() == "".join(unique).encode('utf-8')
+    assert (copied, duplicates) == (len(unique), len(blocks) - len(unique)) == (6, 3)
+    assert "2 rows in" in capsys.readouterr().out
+    # the temporary parts are gone
+    assert set(os.listdir(tmp_path)) == {"first.csv", "second.csv", "python_Data.txt"}
+
+
+@pytest.mark.parametrize('chunk_rows', [1, 2, 3])
+def test_chunked_parts_join_to_the_same_output(tmp_path, monkeypatch, chunk_rows):
+    monkeypatch.setattr(downloadPythonDataset, 'CHUNK_ROWS', chunk_rows)
+    csv_files = [write_csv(tmp_path / "first.csv", FIRST), write_csv(tmp_path / "second.csv", SECOND)]
+    parts = [str(tmp_path / "part_0.txt"), str(tmp_path / "part_1.txt")]
+
+    assert process_csv_and_save_code(csv_files[0], parts[0]) == (5, 2)
+    assert process_csv_and_save_code(csv_files[1], parts[1]) == (4, 1)
+
+    seen = set()
+    with open(tmp_path / "out.txt", 'wb') as out:
+        assert append_unique(parts[0], out, seen) == (4, 1)
+        assert append_unique(parts[1], out, seen) == (2, 2)
+
+    assert (tmp_path / "out.txt").read_text(encoding='utf-8') == "".join(dict.fromkeys(original_output(csv_files)))
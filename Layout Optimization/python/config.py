@@ -0,0 +1,74 @@
+"""
+Configurations and mappings, the same tables as src/config.js.
+
+__NOTE__ all of the values are normalized by a 1/10th of a key size
+"""
+from typing import Dict, List, Union
+
+EFFORT_LIMIT = 3000000
+SAME_FINGER_PENALTY = 10  # multiplier
+SAME_HAND_PENALTY = 1  # multiplier
+
+
+def parse_mapping(string: str) -> List[str]:
+    """Parses a map into key-index -> letter list."""
+    reps = {"\\n": "\n", "space": " "}
+    return [reps.get(symbol, symbol) for line in string.strip().split("\n") for symbol in line.split()]
+
+
+# just a mapping for easier conversions
+COORDINATES = parse_mapping("""
+ ~ 1 2 3 4 5 6 7 8 9 0 - =
+   q w e r t y u i o p [ ] \\
+   a s d f g h j k l ; ' \\n
+    z x c v b n m , . /
+ l-shift    space    r-shift
+""")
+
+
+def build_mapping(string: str) -> Dict[str, Union[int, str]]:
+    """Creates a letter -> value mapping."""
+    return {COORDINATES[i]: int(value) if value.isdigit() else value
+            for i, value in enumerate(parse_mapping(string))}
+
+
+# distances a finger must travel, those are measured from a standard keyboard
+DISTANCES = build_mapping("""
+  28 22 22 22 22 21 28 22 22 22 22 21 25
+     11 11 11 11 13 17 11 11 11 11 13 21 25
+     00 00 00 00 10 10 00 00 00 00 10 20
+       12 12 12 12 19 12 12 12 12 12
+  12               0               19
+""")
+
+# the hand movement efforts, based on real-life measurements, see MadRabbit/keyboard-analytics
+EFFORTS = build_mapping("""
+  17 14 08 08 13 16 23 19 09 08 07 15 17
+     06 02 01 06 11 14 09 01 01 07 09 13 18
+     01 00 00 00 07 07 00 00 00 01 05 11
+       07 08 10 06 10 04 02 05 05 03
+  05               00                 11
+""")
+
+# mapping of the row numbers, so we could count those too
+ROWS = build_mapping("""
+  4 4 4 4 4 4 4 4 4 4 4 4 4
+    3 3 3 3 3 3 3 3 3 3 3 3 3
+    2 2 2 2 2 2 2 2 2 2 2 2
+     1 1 1 1 1 1 1 1 1 1
+  0           0           0
+""")
+
+FINGER_NAMES = {
+    'a': 'l-pinky', 'b': 'l-ring', 'c': 'l-middle', 'd': 'l-point',
+    'h': 'r-pinky', 'g': 'r-ring', 'f': 'r-middle', 'e': 'r-point',
+    't': 'thumb',
+}
+
+FINGERS = {key: FINGER_NAMES[finger] for key, finger in build_mapping("""
+  a a b c d d e e f g g h h
+    a b c d d e e f g h h h h
+    a b c d d e e f g h h h
+     a b c d d e e f g h
+  a          t           h
+""").items()}
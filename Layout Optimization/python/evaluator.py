@@ -0,0 +1,473 @@
+"""
+Layout evaluation from symbol bigram counts, the numbers of src/runner.js without re-typing the text.
+
+Runner.typeWith types the text symbol by symbol until the effort limit, so
+every layout costs a walk over the text. Everything it adds up depends only
+on the symbol typed and the state left by the one before:
+
+* the symbol's own effort and distance;
+* a same finger or same hand overhead, decided by the previous key;
+* a retraction overhead when the previous key was shifted and the shift was
+  pressed by the hand that types this symbol.
+
+A symbol the layout does not map resets the previous key to the space
+key, but not the previous shift. The evaluator therefore counts once how
+often each symbol follows each other symbol:
+
+* adjacent: directly;
+* gapped: with unmapped characters in between.
+
+Both counts run over the text as the runner loops it. A layout is then
+scored as element-wise products of those count matrices with the layout's
+overhead matrices, O(symbols²) whatever the length of the text.
+"""
+import math
+import re
+from collections import defaultdict
+from typing import Any, Dict, Iterable, List, NamedTuple, Tuple
+
+import numpy as np
+
+from config import COORDINATES, EFFORT_LIMIT, SAME_FINGER_PENALTY, SAME_HAND_PENALTY
+from layout import Key, Layout, coordinate_key, key_symbols
+
+# the order runner.js reports its counts in
+FINGERS = ['l-pinky', 'l-ring', 'l-middle', 'l-point', 'r-pinky', 'r-ring', 'r-middle', 'r-point']
+ROWS = 5
+OVERHEADS = ('sameFinger', 'sameHand', 'shifting')
+HANDS = {False: 0, 'l': 1, 'r': 2}
+# layouts evaluate_batch stacks into one set of arrays
+BATCH_SIZE = 8
+# what String.prototype.trim() strips, which is not quite what str.strip() does
+JS_WHITESPACE = '[\t\n\v\f\r \u00a0\u1680\u2000-\u200a\u2028\u2029\u202f\u205f\u3000\ufeff]'
+JS_TRIM = re.compile(f'^{JS_WHITESPACE}+|{JS_WHITESPACE}+$')
+
+
+class Bigrams(NamedTuple):
+    """How the symbols of an alphabet follow each other in the text, see Evaluator.bigrams."""
+    symbols: Tuple[str, ...]
+    ids: np.ndarray  # symbol index of every mapped character, in text order
+    positions: np.ndarray  # UTF-16 position of every mapped character
+    gaps: np.ndarray  # whether unmapped characters precede a mapped one, the first one counting from the end
+    unigrams: np.ndarray  # (symbols,) occurrences of each symbol
+    adjacent: np.ndarray  # (symbols, symbols) previous, next symbol counts
+    gapped: np.ndarray  # (symbols, symbols) the same, with unmapped characters in between
+
+
+class KeyTable(NamedTuple):
+    """A layout's Key metrics as arrays over a Bigrams alphabet."""
+    effort: np.ndarray
+    distance: np.ndarray
+    finger: np.ndarray  # index into FINGERS, -1 for the thumb
+    hand: np.ndarray  # HANDS value
+    row: np.ndarray
+    shift: np.ndarray
+    shift_hand: np.ndarray  # hand of the shift key pressed with the other hand
+    shift_effort: np.ndarray
+
+
+def js_round(value: float) -> int:
+    """Math.round()."""
+    return math.floor(value + 0.5)
+
+
+def key_table(keys: List[Key], l_shift: Key, r_shift: Key) -> KeyTable:
+    hand = np.array([HANDS[key.hand] for key in keys], dtype=np.int8)
+    # the runner presses the left shift for right hand keys and the other way around
+    shift_hand = np.where(hand == HANDS['r'], HANDS['l'], HANDS['r']).astype(np.int8)
+    return KeyTable(
+        effort=np.array([key.effort for key in keys], dtype=np.float64),
+        distance=np.array([key.distance for key in keys], dtype=np.float64),
+        finger=np.array([FINGERS.index(key.finger) if key.finger in FINGERS else -1 for key in keys], dtype=np.int8),
+        hand=hand,
+        row=np.array([key.row for key in keys], dtype=np.int8),
+        shift=np.array([key.shift for key in keys], dtype=bool),
+        shift_hand=shift_hand,
+        shift_effort=np.where(shift_hand == HANDS['l'], l_shift.effort, r_shift.effort).astype(np.float64),
+    )
+
+
+def pair_overheads(previous: KeyTable, following: KeyTable, repeats: np.ndarray, same_finger_penalty: float,
+                   same_hand_penalty: float) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Overhead of typing each following symbol after each previous one, as in Runner.typeWith.
+
+    The tables may have a leading axis of layouts, which the results then
+    have after the OVERHEADS one.
+
+    Args:
+        previous: Keys of the previous symbols
+        following: Keys of the following symbols
+        repeats: (previous, following) mask of the pairs of one symbol, repeats skip all overheads
+
+    Returns:
+        (3, previous, following) overheads of adjacent symbols in OVERHEADS
+        order, and the (previous, following) shifting overheads of gapped
+        symbols, where the previous key is the space key
+    """
+    typed = (following.hand != 0)[..., None, :]
+    after_shift = previous.shift[..., :, None] & (previous.shift_hand[..., :, None] == following.hand[..., None, :])
+    shifting = previous.shift_effort[..., :, None] * same_hand_penalty
+
+    adjacent = typed & ~repeats
+    same_finger = adjacent & (previous.finger[..., :, None] == following.finger[..., None, :])
+    same_hand = adjacent & ~same_finger & (previous.hand[..., :, None] == following.hand[..., None, :])
+    after_shift_adjacent = adjacent & ~same_finger & ~same_hand & after_shift
+
+    previous_effort = previous.effort[..., :, None] + 1
+    overheads = np.stack([
+        np.where(same_finger, previous_effort * same_finger_penalty, 0.0),
+        np.where(same_hand, previous_effort * same_hand_penalty, 0.0),
+        np.where(after_shift_adjacent, shifting, 0.0),
+    ])
+    return overheads, np.where(typed & after_shift, shifting, 0.0)
+
+
+def overhead_matrices(table: KeyTable, same_finger_penalty: float,
+                      same_hand_penalty: float) -> Tuple[np.ndarray, np.ndarray]:
+    """pair_overheads of all symbols after all symbols."""
+    repeats = np.eye(table.effort.shape[-1], dtype=bool)
+    return pair_overheads(table, table, repeats, same_finger_penalty, same_hand_penalty)
+
+
+class Evaluator:
+    """
+    Scores layouts on a text, like a Runner(text, options) does.
+
+    Args:
+        text: Text to type, trimmed like the runner does
+        effort_limit: Effort at which type_with stops typing
+        same_finger_penalty: Multiplier of the previous key's effort for same finger use
+        same_hand_penalty: Multiplier of the previous key's effort for same hand use and shift retraction
+    """
+
+    def __init__(self, text: str, effort_limit: float = EFFORT_LIMIT,
+                 same_finger_penalty: float = SAME_FINGER_PENALTY, same_hand_penalty: float = SAME_HAND_PENALTY):
+        self.text = JS_TRIM.sub('', text)
+        self.effort_limit = effort_limit
+        self.same_finger_penalty = same_finger_penalty
+        self.same_hand_penalty = same_hand_penalty
+        # the runner steps through UTF-16 code units, as JavaScript strings index them
+        self.units = np.frombuffer(self.text.encode('utf-16-le', 'surrogatepass'), dtype='<u2')
+        self._bigrams: Dict[Tuple[str, ...], Bigrams] = {}
+
+    def bigrams(self, symbols: Tuple[str, ...]) -> Bigrams:
+        """
+        Counts for the symbols a layout maps, computed once per alphabet.
+
+        Layouts that map the same symbols, such as all permutations of one
+        layout, share the counts.
+        """
+        if symbols in self._bigrams:
+            return self._bigrams[symbols]
+
+        lookup = np.full(1 << 16, -1, dtype=np.int64)
+        lookup[[ord(symbol) for symbol in symbols]] = np.arange(len(symbols))
+        ids = lookup[self.units]
+        positions = np.flatnonzero(ids >= 0)
+        ids = ids[positions]
+        if not len(ids):
+            raise ValueError("The text has no symbols of the layout, typing it would never end")
+
+        # the runner loops the text, so the first symbol follows the last one
+        previous = np.roll(ids, 1)
+        gaps = np.diff(positions, prepend=positions[-1] - len(self.units)) > 1
+        size = len(symbols)
+        pairs = previous * size + ids
+
+        bigrams = Bigrams(
+            symbols=symbols,
+            ids=ids,
+            positions=positions,
+            gaps=gaps,
+            unigrams=np.bincount(ids, minlength=size),
+            adjacent=np.bincount(pairs[~gaps], minlength=size * size).reshape(size, size),
+            gapped=np.bincount(pairs[gaps], minlength=size * size).reshape(size, size),
+        )
+        self._bigrams[symbols] = bigrams
+        return bigrams
+
+    def _tables(self, layout: Layout) -> Tuple[Bigrams, KeyTable]:
+        metrics = layout.to_metrics()
+        # JavaScript indexes one UTF-16 unit at a time, so longer symbols never match
+        symbols = tuple(sorted(symbol for symbol in metrics if len(symbol) == 1 and ord(symbol) < 1 << 16))
+        bigrams = self.bigrams(symbols)
+        return bigrams, key_table([metrics[symbol] for symbol in symbols], metrics['l-shift'], metrics['r-shift'])
+
+    def _prepare(self, layout: Layout) -> Tuple[Bigrams, KeyTable, np.ndarray, np.ndarray]:
+        bigrams, table = self._tables(layout)
+        adjacent, gapped = overhead_matrices(table, self.same_finger_penalty, self.same_hand_penalty)
+        return bigrams, table, adjacent, gapped
+
+    def evaluate(self, layout: Layout) -> Dict[str, Any]:
+        """
+        Totals of typing the text once, as one of the runner's loops over it after the first.
+
+        Returns:
+            Runner.typeWith's result, unrounded, with position being the
+            length of the text
+        """
+        bigrams, table, adjacent, gapped = self._prepare(layout)
+        overheads = (adjacent * bigrams.adjacent).sum(axis=(1, 2))
+        overheads[OVERHEADS.index('shifting')] += (gapped * bigrams.gapped).sum()
+
+        return {
+            'position': len(self.units),
+            'distance': float(bigrams.unigrams @ table.distance),
+            'effort': float(bigrams.unigrams @ table.effort + overheads.sum()),
+            'overheads': dict(zip(OVERHEADS, overheads.tolist())),
+            'counts': self._counts(table, bigrams.unigrams),
+        }
+
+    def evaluate_batch(self, layouts: Iterable[Layout], batch_size: int = BATCH_SIZE) -> List[Dict[str, Any]]:
+        """
+        evaluate() of many layouts at once, with presses and distance per finger.
+
+        Layouts of the same symbols have their key tables stacked and are
+        scored together, batch_size at a time, as (layouts, symbols, symbols)
+        arrays.
+
+        Returns:
+            evaluate()'s result for every layout, with 'fingers' mapping
+            FINGERS and 'thumb' to the number of presses and the distance of
+            each finger
+        """
+        prepared = [self._tables(layout) for layout in layouts]
+        groups: Dict[Tuple[str, ...], List[int]] = defaultdict(list)
+        for i, (bigrams, _) in enumerate(prepared):
+            groups[bigrams.symbols].append(i)
+
+        results: List[Dict[str, Any]] = [{} for _ in prepared]
+        for members in groups.values():
+            bigrams = prepared[members[0]][0]
+            for start in range(0, len(members), batch_size):
+                batch = members[start:start + batch_size]
+                table = KeyTable(*map(np.stack, zip(*(prepared[i][1] for i in batch))))
+                adjacent, gapped = overhead_matrices(table, self.same_finger_penalty, self.same_hand_penalty)
+                overheads = adjacent.reshape(len(OVERHEADS), len(batch), -1) @ bigrams.adjacent.ravel()
+                overheads[OVERHEADS.index('shifting')] += gapped.reshape(len(batch), -1) @ bigrams.gapped.ravel()
+                efforts = table.effort @ bigrams.unigrams + overheads.sum(axis=0)
+                distances = table.distance @ bigrams.unigrams
+
+                # one bincount over all layouts of the batch, with the thumb after FINGERS
+                columns = len(FINGERS) + 1
+                cells = np.where(table.finger < 0, len(FINGERS), table.finger) + columns * np.arange(len(batch))[:, None]
+                presses = np.bincount(cells.ravel(), weights=np.broadcast_to(bigrams.unigrams, cells.shape).ravel(),
+                                      minlength=columns * len(batch)).reshape(len(batch), columns)
+                finger_distances = np.bincount(cells.ravel(), weights=(table.distance * bigrams.unigrams).ravel(),
+                                               minlength=columns * len(batch)).reshape(len(batch), columns)
+
+                for row, i in enumerate(batch):
+                    results[i] = {
+                        'position': len(self.units),
+                        'distance': float(distances[row]),
+                        'effort': float(efforts[row]),
+                        'overheads': dict(zip(OVERHEADS, overheads[:, row].tolist())),
+                        'counts': self._counts(prepared[i][1], bigrams.unigrams),
+                        'fingers': {finger: {'presses': int(presses[row, column]),
+                                             'distance': float(finger_distances[row, column])}
+                                    for column, finger in enumerate(FINGERS + ['thumb'])},
+                    }
+        return results
+
+    def state(self, layout: Layout) -> 'LayoutState':
+        """The layout's evaluate() effort and distance, kept up to date through key swaps."""
+        return LayoutState(self, layout)
+
+    def estimate_position(self, layout: Layout) -> float:
+        """How far the runner gets before the effort limit, from the effort per character of evaluate()."""
+        return self.effort_limit * len(self.units) / self.evaluate(layout)['effort']
+
+    def type_with(self, layout: Layout) -> Dict[str, Any]:
+        """
+        Exactly what Runner.typeWith returns for the layout.
+
+        Whole loops over the text are added up at once. Only the loop in
+        which the effort limit is reached is followed step by step, with
+        cumulative sums.
+        """
+        bigrams, table, adjacent, gapped = self._prepare(layout)
+        ids = bigrams.ids
+        previous = np.roll(ids, 1)
+
+        # overheads of every mapped character in a loop after the first one
+        steps = np.where(bigrams.gaps, 0.0, adjacent[:, previous, ids])
+        steps[OVERHEADS.index('shifting')] += np.where(bigrams.gaps, gapped[previous, ids], 0.0)
+        # the first character of the first loop follows the space key and no shift
+        first_steps = steps.copy()
+        first_steps[:, 0] = 0.0
+
+        unigrams = np.bincount(ids, minlength=len(bigrams.symbols))
+        first_loop = table.effort[ids] + first_steps.sum(axis=0)
+        later_loops = table.effort[ids] + steps.sum(axis=0)
+        distance = table.distance[ids]
+
+        loops = 0
+        typed = 0
+        loop_steps = first_steps
+        if self.effort_limit > 0:
+            cumulative = np.cumsum(first_loop)
+            if cumulative[-1] < self.effort_limit:
+                loop_effort = float(later_loops.sum())
+                if loop_effort <= 0:
+                    raise ValueError("The layout types the text without effort, typing it would never end")
+                # skip the loops that stay below the limit, then find where the next one reaches it
+                reached = float(cumulative[-1])
+                skipped = max(0, math.ceil((self.effort_limit - reached) / loop_effort) - 1)
+                loops = 1 + skipped
+                loop_steps = steps
+                cumulative = reached + skipped * loop_effort + np.cumsum(later_loops)
+                while cumulative[-1] < self.effort_limit:
+                    loops += 1
+                    cumulative = cumulative[-1] + np.cumsum(later_loops)
+            typed = int(np.argmax(cumulative >= self.effort_limit)) + 1
+
+        overheads = loop_steps[:, :typed].sum(axis=1)
+        if loops:
+            overheads += first_steps.sum(axis=1) + (loops - 1) * steps.sum(axis=1)
+        counts = unigrams * loops + np.bincount(ids[:typed], minlength=len(bigrams.symbols))
+        return {
+            'position': loops * len(self.units) + (int(bigrams.positions[typed - 1]) + 1 if typed else 0),
+            'distance': float(distance.sum() * loops + distance[:typed].sum()),
+            'effort': js_round(float(cumulative[typed - 1])) if typed else 0,
+            'overheads': {name: js_round(total) for name, total in zip(OVERHEADS, overheads.tolist())},
+            'counts': self._counts(table, counts),
+        }
+
+    @staticmethod
+    def _counts(table: KeyTable, symbol_counts: np.ndarray) -> Dict[str, List[int]]:
+        """Presses per finger and row of keys typed by hand, from counts per symbol."""
+        by_hand = table.hand != 0
+        cells = table.finger[by_hand].astype(np.int64) * ROWS + table.row[by_hand]
+        counts = np.bincount(cells, weights=symbol_counts[by_hand], minlength=len(FINGERS) * ROWS)
+        return {finger: counts[i * ROWS:(i + 1) * ROWS].astype(np.int64).tolist() for i, finger in enumerate(FINGERS)}
+
+
+class LayoutState:
+    """
+    A layout's effort and distance for one loop over the text, updated in O(symbols) per key swap.
+
+    Keys are numbered in COORDINATES order, which for a Genome is the position
+    of a key's symbol in its sequence. The overhead of a symbol pair only
+    depends on the two keys and on whether the first symbol is shifted, so
+    it is looked up in key by key tables made once. Swapping two keys moves
+    at most four symbols, the normal and shifted one of each. Only their own
+    effort and distance change, plus the rows and columns of the per-pair
+    overheads of evaluate(), which are kept here weighted by the bigram
+    counts.
+
+    Args:
+        evaluator: Evaluator of the text
+        layout: Layout to start from
+    """
+
+    def __init__(self, evaluator: Evaluator, layout: Layout):
+        metrics = layout.to_metrics()
+        bigrams = evaluator._prepare(layout)[0]
+        self.bigrams = bigrams
+        self.pairs = key_symbols(layout.config)
+        self.row_sizes = [len(line.split()) for line in layout.config.strip().split("\n")[0::2]]
+
+        # the layout's keys, then one for the thumb symbols
+        keys = [coordinate_key(name) for name in COORDINATES[:len(self.pairs)]] + [metrics[' ']]
+        thumb = len(keys) - 1
+        self.key_table = key_table(keys, metrics['l-shift'], metrics['r-shift'])
+        previous = key_table([key._replace(shift=shift) for key in keys for shift in (False, True)],
+                             metrics['l-shift'], metrics['r-shift'])
+        no_repeats = np.zeros((len(previous.effort), len(keys)), dtype=bool)
+        adjacent, gapped = pair_overheads(previous, self.key_table, no_repeats, evaluator.same_finger_penalty,
+                                          evaluator.same_hand_penalty)
+        # (key and shift of the previous symbol, key of the next one) -> overhead
+        self.adjacent_overheads = adjacent.sum(axis=0)
+        self.gapped_overheads = gapped
+        self.keys_count = len(keys)
+
+        # a symbol on two keys gets the metrics of the last one, like in parse()
+        owners = {symbol: key for key, pair in enumerate(self.pairs) for symbol in pair}
+        self.position = np.array([owners.get(symbol, thumb) for symbol in bigrams.symbols], dtype=np.int64)
+        self.shifted = np.array([metrics[symbol].shift for symbol in bigrams.symbols], dtype=np.int64)
+        self.keys = [np.flatnonzero(self.position == key) for key in range(len(self.pairs))]
+
+        # repeats of a symbol have no overheads
+        adjacent_counts = bigrams.adjacent.astype(np.float64)
+        np.fill_diagonal(adjacent_counts, 0)
+        gapped_counts = bigrams.gapped.astype(np.float64)
+        # rows by previous symbol, and transposed ones by next symbol, so both are read by row
+        self.counts = (adjacent_counts, gapped_counts)
+        self.counts_by_next = (np.ascontiguousarray(adjacent_counts.T), np.ascontiguousarray(gapped_counts.T))
+
+        symbols = np.arange(len(self.position))
+        self.weighted = self._rows(self.position, symbols)
+        self.weighted_by_next = np.ascontiguousarray(self.weighted.T)
+
+        self.effort = float(bigrams.unigrams @ self.key_table.effort[self.position] + self.weighted.sum())
+        self.distance = float(bigrams.unigrams @ self.key_table.distance[self.position])
+        self._pending = None
+
+    def _lookup(self, cells: np.ndarray, counts: np.ndarray, counts_gapped: np.ndarray) -> np.ndarray:
+        return (counts * np.take(self.adjacent_overheads, cells)
+                + counts_gapped * np.take(self.gapped_overheads, cells))
+
+    def _rows(self, position: np.ndarray, symbols: np.ndarray) -> np.ndarray:
+        """Count weighted overheads of the symbols followed by every symbol, with symbols at the given positions."""
+        previous = position[symbols] * 2 + self.shifted[symbols]
+        cells = previous[:, None] * self.keys_count + position[None, :]
+        adjacent, gapped = self.counts
+        return self._lookup(cells, adjacent[symbols], gapped[symbols])
+
+    def _columns(self, position: np.ndarray, symbols: np.ndarray) -> np.ndarray:
+        """Count weighted overheads of every symbol followed by the symbols, transposed like _rows."""
+        previous = position * 2 + self.shifted
+        cells = previous[None, :] * self.keys_count + position[symbols][:, None]
+        adjacent, gapped = self.counts_by_next
+        return self._lookup(cells, adjacent[symbols], gapped[symbols])
+
+    def swap_delta(self, first: int, second: int) -> float:
+        """Change of the effort if the two keys were swapped."""
+        moved = np.concatenate([self.keys[first], self.keys[second]])
+        position = self.position.copy()
+        position[self.keys[first]] = second
+        position[self.keys[second]] = first
+
+        rows = self._rows(position, moved)
+        columns = self._columns(position, moved)
+
+        # pairs of two moved symbols are in both the rows and the columns
+        old_rows = self.weighted[moved]
+        old = old_rows.sum() + self.weighted_by_next[moved].sum() - old_rows[:, moved].sum()
+        new = rows.sum() + columns.sum() - rows[:, moved].sum()
+        efforts = self.key_table.effort[position[moved]] - self.key_table.effort[self.position[moved]]
+        delta = float(self.bigrams.unigrams[moved] @ efforts + new - old)
+
+        self._pending = (first, second, moved, position, rows, columns, delta)
+        return delta
+
+    def swap(self, first: int, second: int) -> float:
+        """Swaps two keys, returning the change of the effort."""
+        if self._pending is None or self._pending[:2] != (first, second):
+            self.swap_delta(first, second)
+        _, _, moved, position, rows, columns, delta = self._pending
+        self._pending = None
+
+        distances = self.key_table.distance[position[moved]] - self.key_table.distance[self.position[moved]]
+        self.distance += float(self.bigrams.unigrams[moved] @ distances)
+        self.effort += delta
+        self.weighted[moved] = rows
+        self.weighted[:, moved] = columns.T
+        self.weighted_by_next[moved] = columns
+        self.weighted_by_next[:, moved] = rows.T
+        self.position = position
+        self.keys[first], self.keys[second] = self.keys[second], self.keys[first]
+        self.pairs[first], self.pairs[second] = self.pairs[second], self.pairs[first]
+        return delta
+
+    def to_layout(self, name: str = "") -> Layout:
+        """The layout with the swaps made so far."""
+        rows = []
+        start = 0
+        for size in self.row_sizes:
+            keys = [["\\n" if symbol == "\n" else symbol for symbol in pair] for pair in self.pairs[start:start + size]]
+            rows.append(" ".join(normal for normal, _ in keys))
+            rows.append(" ".join(shifted for _, shifted in keys))
+            start += size
+        return Layout(name, "\n".join(rows))
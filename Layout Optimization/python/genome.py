@@ -0,0 +1,163 @@
+"""
+Layout genomes, the same as src/genome.js.
+
+A genome is the sequence of the unshifted symbols of a layout in QWERTY key
+order, mutated by swapping symbols.
+"""
+from random import Random
+from typing import Dict, List, Tuple
+
+from config import FINGERS
+from layout import Layout
+from presets import QWERTY
+
+QWERTY_SEQUENCE = QWERTY.to_sequence()
+
+LOCKED = """
+  `:` 1:1 2:2 3:3 4:4 5:5 6:6 7:7 8:8 9:9 0:0 -:- =:=
+  l:w r:e      ;:y    u:i d:o [:[ ]:] \\:\\
+  s:a h:s n:d t:f ,:g .:h a:j e:k o:l i:; ':' \\n:\\n
+     c:v /:b y:/
+"""
+
+
+def _normalize(symbol: str) -> str:
+    return "\n" if symbol == "\\n" else symbol
+
+
+# symbol -> position it is locked to
+LOCK_POSITIONS: Dict[str, int] = {
+    _normalize(key): QWERTY_SEQUENCE.index(_normalize(value))
+    for key, value in (pair.split(":") for pair in LOCKED.split())
+}
+
+# symbols that must be under the same hand
+SAME_HANDS = [
+    ["t", "h"],
+]
+
+# unshifted -> shifted symbols of QWERTY
+STD_MAPPING: Dict[str, str] = {}
+_lines = QWERTY.config.strip().split("\n")
+for _normal_line, _shifted_line in zip(_lines[0::2], _lines[1::2]):
+    STD_MAPPING.update(zip(_normal_line.split(), _shifted_line.split()))
+
+
+class Genome:
+    def __init__(self, sequence: str):
+        self.sequence = sequence
+
+    @classmethod
+    def random(cls, rng: Random, tried) -> 'Genome':
+        base: List[str] = [""] * len(QWERTY_SEQUENCE)
+
+        # placing the locked symbols in positions
+        for symbol, position in LOCK_POSITIONS.items():
+            base[position] = symbol
+
+        # adding the same-hand letters, then filling in the rest of symbols
+        same_hands = [symbol for group in SAME_HANDS for symbol in group if symbol not in LOCK_POSITIONS]
+        rest = [symbol for symbol in QWERTY_SEQUENCE if symbol not in base and symbol not in same_hands]
+        free = iter(same_hands + rest)
+        base = [symbol or next(free) for symbol in base]
+
+        return cls("".join(base)).mutate(20, rng, tried)
+
+    @classmethod
+    def from_layout(cls, layout: Layout) -> 'Genome':
+        return cls(layout.to_sequence())
+
+    def merge(self, another_genome: 'Genome') -> Tuple['Genome', 'Genome']:
+        mom = self.sequence
+        dad = another_genome.sequence
+        half = len(mom) // 2
+        blank = "".join(s if dad[i] == s else "Ф" for i, s in enumerate(mom))
+
+        child1 = blank[:half] + mom[half:]
+        child2 = mom[:half] + blank[half:]
+
+        for symbol in dad:
+            if symbol not in child1:
+                child1 = child1.replace("Ф", symbol, 1)
+            if symbol not in child2:
+                child2 = child2.replace("Ф", symbol, 1)
+
+        return Genome(child1), Genome(child2)
+
+    def mutate(self, times: int, rng: Random, tried) -> 'Genome':
+        """
+        Swaps `times` random pairs of unlocked symbols.
+
+        Args:
+            times: Number of swaps
+            rng: Source of randomness, seeded for a reproducible search
+            tried: Sequences to avoid, genome.js's genofond; anything with
+                `in` and add(), the new sequence is added to it
+        """
+        max_tries = 200
+        tries_so_far = 0
+
+        while True:
+            symbols = list(self.sequence)
+
+            for _ in range(times or 1):
+                first = self.rand_key(rng)
+                second = first
+                while second == first:
+                    second = self.rand_key(rng)
+
+                i, j = symbols.index(first), symbols.index(second)
+                symbols[i], symbols[j] = symbols[j], symbols[i]
+
+            new_sequence = "".join(symbols)
+
+            tries_so_far += 1
+            if tries_so_far > max_tries:
+                # considering that we have used up all the combinations
+                # in this branch, falling back to the existing sequence
+                new_sequence = self.sequence
+                break
+            if not self.conditions_unmet(new_sequence, tried):
+                break
+
+        tried.add(new_sequence)
+
+        return Genome(new_sequence)
+
+    def rand_key(self, rng: Random) -> str:
+        while True:
+            key = self.sequence[rng.randrange(len(self.sequence))]
+            if key not in LOCK_POSITIONS:
+                return key
+
+    @staticmethod
+    def conditions_unmet(sequence: str, tried) -> bool:
+        if sequence in tried:
+            return True  # already tried
+
+        def hand_name(symbol: str) -> str:
+            return FINGERS[QWERTY_SEQUENCE[sequence.index(symbol)]][0]
+
+        for group in SAME_HANDS:
+            current_hand = hand_name(group[0])
+            if any(hand_name(symbol) != current_hand for symbol in group[1:]):
+                return True  # a sequence is in different hands
+
+        return False
+
+    def __str__(self) -> str:
+        return self.sequence
+
+    def to_layout(self) -> Layout:
+        breaks = [13, 13, 12, 10]
+        rows = []
+        start = 0
+        for size in breaks:
+            line = ["\\n" if s == "\n" else s for s in self.sequence[start:start + size]]
+            rows.append(" ".join(line))
+            rows.append(" ".join(STD_MAPPING[s] for s in line))
+            start += size
+
+        config = "\n".join(f"  {row}" if i > 0 else row for i, row in enumerate(rows))
+        name = rows[2].replace(" ", "")[:10].upper()
+        return Layout(name, config)
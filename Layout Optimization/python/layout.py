@@ -0,0 +1,71 @@
+"""
+Keyboard layouts, the Python side of src/layout.js.
+"""
+import re
+from typing import Dict, List, NamedTuple, Tuple, Union
+
+from config import COORDINATES, DISTANCES, EFFORTS, FINGERS, ROWS
+
+
+class Key(NamedTuple):
+    """What typing a symbol costs; hand is False for the thumb keys, like in layout.js."""
+    effort: int
+    distance: int
+    finger: str
+    hand: Union[str, bool]
+    row: int
+    shift: bool
+
+
+class Layout:
+    def __init__(self, name: str, config: str):
+        self.name = name
+        self.config = config
+
+    def __str__(self) -> str:
+        lines = []
+        for i, line in enumerate(self.config.strip().split("\n")):
+            if i % 2 == 0:
+                prefix = {2: "  ", 4: "  ", 6: "   "}.get(i, "")
+                lines.append(prefix + line.strip() + "\n")
+        return "".join(lines).strip()
+
+    def to_sequence(self) -> str:
+        """Clean sequence in order of appearance."""
+        return re.sub(r"\s+", "", str(self)).replace("\\n", "\n", 1)
+
+    def to_metrics(self) -> Dict[str, Key]:
+        return parse(self.config)
+
+
+def key_symbols(string: str) -> List[Tuple[str, str]]:
+    """(normal, shifted) symbol of every key of a layout config, in COORDINATES order."""
+    lines = [['\n' if symbol == '\\n' else symbol for symbol in line.split()]
+             for line in string.strip().split("\n")]
+    return [pair for normal_line, shifted_line in zip(lines[0::2], lines[1::2])
+            for pair in zip(normal_line, shifted_line)]
+
+
+def coordinate_key(name: str) -> Key:
+    """Metrics of the unshifted symbol of a key, by its COORDINATES name."""
+    finger = FINGERS[name]
+    return Key(EFFORTS[name], DISTANCES[name], finger, finger[0], ROWS[name], False)
+
+
+def parse(string: str) -> Dict[str, Key]:
+    """Parses the layout and creates symbol -> key metrics mapping, same as layout.js."""
+    keys: Dict[str, Key] = {}
+
+    for name, (normal, shifted) in zip(COORDINATES, key_symbols(string)):
+        key = coordinate_key(name)
+        keys[normal] = key
+        keys[shifted] = key._replace(shift=True)
+
+    keys[' '] = Key(0, 0, 'thumb', False, 0, False)
+    keys['\t'] = Key(0, 0, 'thumb', False, 0, False)
+    keys['l-shift'] = Key(EFFORTS['l-shift'], DISTANCES['l-shift'], FINGERS['l-shift'], 'l', 0, False)
+    keys['r-shift'] = Key(EFFORTS['r-shift'], DISTANCES['r-shift'], FINGERS['r-shift'], 'r', 0, False)
+
+    keys['\n'] = keys['\n']._replace(shift=False)
+
+    return keys
@@ -0,0 +1,429 @@
+"""
+Genetic search for a layout, the Python counterpart of src/index.js and src/population.js.
+
+Every generation is scored in a process pool. The workers receive the
+Evaluator, with the bigram counts of the text already made, once when they
+start, and score a genome in O(keys²) with Evaluator.estimate_position.
+Scores are kept in a FitnessCache keyed by genome sequence. A genome seen
+before is not scored again, and the cache is also the genofond that
+mutations avoid. It forgets the least recently used sequences beyond its
+size, so long runs stay within bounded memory.
+
+Runs write a JSON checkpoint of the population, the cache and the random
+state, and carry on from it when started again.
+"""
+import argparse
+import json
+import math
+import os
+import time
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor
+from random import Random
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from evaluator import Evaluator, LayoutState
+from genome import LOCK_POSITIONS, SAME_HANDS, Genome
+from presets import PRESETS, QWERTY, Workman
+
+POPULATION_SIZE = 12
+TOURNAMENT_SIZE = 3
+MUTATE_LEVEL = 2
+GENERATIONS = 1000
+MAX_NO_CHANGE = 80
+CACHE_SIZE = 1 << 20
+CHECKPOINT_EVERY = 10
+STEPS = 1000000
+PATIENCE = 20000
+# annealing temperatures, as a share of the starting effort
+START_TEMPERATURE = 1e-3
+END_TEMPERATURE = 1e-6
+
+
+def load_text(directory: str = 'text') -> str:
+    """The .txt files of a directory joined by blank lines, like data.js reads them."""
+    names = sorted(name for name in os.listdir(directory) if name.endswith('.txt'))
+    texts = []
+    for name in names:
+        with open(os.path.join(directory, name), 'r', encoding='utf-8', newline='') as f:
+            texts.append(f.read())
+    return "\n\n".join(texts)
+
+
+class FitnessCache:
+    """
+    Scores by genome sequence, dropping the least recently used beyond max_size.
+
+    A sequence is in the cache as soon as it is tried, with a score of None
+    until it is scored, so it is the `tried` set of Genome.mutate.
+    """
+
+    def __init__(self, max_size: int = CACHE_SIZE):
+        self.max_size = max_size
+        self.scores: 'OrderedDict[str, Optional[float]]' = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def __contains__(self, sequence: str) -> bool:
+        return sequence in self.scores
+
+    def __len__(self) -> int:
+        return len(self.scores)
+
+    def add(self, sequence: str) -> None:
+        if sequence in self.scores:
+            self.scores.move_to_end(sequence)
+        else:
+            self.put(sequence, None)
+
+    def get(self, sequence: str) -> Optional[float]:
+        score = self.scores.get(sequence)
+        if score is None:
+            self.misses += 1
+            return None
+        self.hits += 1
+        self.scores.move_to_end(sequence)
+        return score
+
+    def put(self, sequence: str, score: Optional[float]) -> None:
+        self.scores[sequence] = score
+        self.scores.move_to_end(sequence)
+        while len(self.scores) > self.max_size:
+            self.scores.popitem(last=False)
+
+    def scored(self) -> List[Tuple[str, float]]:
+        """(sequence, score) from least to most recently used."""
+        return [(sequence, score) for sequence, score in self.scores.items() if score is not None]
+
+
+_evaluator: Optional[Evaluator] = None
+_exact = False
+
+
+def _start_worker(evaluator: Evaluator, exact: bool) -> None:
+    global _evaluator, _exact
+    _evaluator, _exact = evaluator, exact
+
+
+def _score(sequence: str) -> float:
+    layout = Genome(sequence).to_layout()
+    if _exact:
+        return float(_evaluator.type_with(layout)['position'])
+    return _evaluator.estimate_position(layout)
+
+
+class Population:
+    def __init__(self, genomes: List[Genome], number: int = 1):
+        self.number = number
+        self.genomes = genomes
+        self.scores: List[float] = [0.0] * len(genomes)
+
+    @classmethod
+    def random(cls, size: int, rng: Random, tried) -> 'Population':
+        return cls([Genome.random(rng, tried) for _ in range(size)])
+
+    def tournament_winner(self, rng: Random) -> Genome:
+        batch = [rng.randrange(len(self.genomes)) for _ in range(TOURNAMENT_SIZE)]
+        return self.genomes[max(batch, key=lambda i: self.scores[i])]
+
+    def next(self, rng: Random, tried, elite: bool = True, mutate_level: int = MUTATE_LEVEL) -> 'Population':
+        new_population = [self.best()] if elite else []
+
+        # first stage with minimal mutations to have the good parts locked in
+        while len(new_population) < len(self.genomes) * 3 / 4:
+            new_population.append(self.tournament_winner(rng).mutate(1, rng, tried))
+
+        # a more aggressive second stage to bring more variations into the system
+        while len(new_population) < len(self.genomes):
+            new_population.append(self.tournament_winner(rng).mutate(mutate_level, rng, tried))
+
+        return Population(new_population[:len(self.genomes)], self.number + 1)
+
+    def best(self) -> Genome:
+        return self.genomes[max(range(len(self.genomes)), key=lambda i: self.scores[i])]
+
+    def best_score(self) -> float:
+        return max(self.scores)
+
+
+class Optimizer:
+    """
+    Evolves a layout for a text.
+
+    Args:
+        evaluator: Scores layouts on the text
+        jobs: Worker processes, defaults to the CPU count; 1 scores in this process
+        cache_size: Genome scores kept
+        exact: Score by Evaluator.type_with's position instead of the estimate
+        seed: Seed of the search, None for a random one
+    """
+
+    def __init__(self, evaluator: Evaluator, jobs: Optional[int] = None, cache_size: int = CACHE_SIZE,
+                 exact: bool = False, seed: Optional[int] = None):
+        self.evaluator = evaluator
+        self.jobs = jobs or os.cpu_count() or 1
+        self.exact = exact
+        self.cache = FitnessCache(cache_size)
+        self.rng = Random(seed)
+        self.executor: Optional[ProcessPoolExecutor] = None
+        # counted once here, so the workers start with the counts
+        evaluator.evaluate(QWERTY)
+
+    def __enter__(self) -> 'Optimizer':
+        if self.jobs > 1:
+            self.executor = ProcessPoolExecutor(self.jobs, initializer=_start_worker,
+                                                initargs=(self.evaluator, self.exact))
+        return self
+
+    def __exit__(self, *exc) -> None:
+        if self.executor is not None:
+            self.executor.shutdown()
+            self.executor = None
+
+    def score(self, sequences: Iterable[str]) -> List[float]:
+        """Scores of genome sequences, scoring only those not in the cache and each only once."""
+        sequences = list(sequences)
+        scores: Dict[str, float] = {}
+        missing = []
+        for sequence in sequences:
+            if sequence in scores:
+                continue
+            score = self.cache.get(sequence)
+            if score is None:
+                missing.append(sequence)
+                scores[sequence] = 0.0
+            else:
+                scores[sequence] = score
+
+        if self.executor is None:
+            _start_worker(self.evaluator, self.exact)
+            results = map(_score, missing)
+        else:
+            results = self.executor.map(_score, missing, chunksize=max(1, len(missing) // (4 * self.jobs)))
+        for sequence, score in zip(missing, results):
+            scores[sequence] = score
+            self.cache.put(sequence, score)
+
+        return [scores[sequence] for sequence in sequences]
+
+    def grade(self, population: Population) -> None:
+        population.scores = self.score(genome.sequence for genome in population.genomes)
+
+    def save_checkpoint(self, path: str, population: Population, no_changes: int) -> None:
+        """Writes the state of the run atomically, see load_checkpoint."""
+        state = {
+            'generation': population.number,
+            'population': [genome.sequence for genome in population.genomes],
+            'no_changes': no_changes,
+            'cache': self.cache.scored(),
+            'random': self.rng.getstate(),
+        }
+        temp_path = f"{path}.tmp"
+        with open(temp_path, 'w', encoding='utf-8') as f:
+            json.dump(state, f)
+        os.replace(temp_path, path)
+
+    def load_checkpoint(self, path: str) -> Tuple[Population, int]:
+        """
+        Restores a run written by save_checkpoint.
+
+        Returns:
+            The graded population of the generation that was checkpointed and
+            the number of generations the best layout has not changed for
+        """
+        with open(path, 'r', encoding='utf-8') as f:
+            state = json.load(f)
+
+        version, internal, gauss = state['random']
+        self.rng.setstate((version, tuple(internal), gauss))
+        for sequence, score in state['cache']:
+            self.cache.put(sequence, score)
+
+        population = Population([Genome(sequence) for sequence in state['population']], state['generation'])
+        self.grade(population)
+        return population, state['no_changes']
+
+    def run(self, generations: int = GENERATIONS, population_size: int = POPULATION_SIZE,
+            elite: bool = True, mutate_level: int = MUTATE_LEVEL, max_no_change: int = MAX_NO_CHANGE,
+            checkpoint: Optional[str] = None, checkpoint_every: int = CHECKPOINT_EVERY) -> Tuple[Genome, float]:
+        """
+        Evolves populations until `generations` is reached or the best layout stays the same for max_no_change.
+
+        Args:
+            checkpoint: JSON file the run is saved to every checkpoint_every
+                generations and at the end, and resumed from if it exists
+
+        Returns:
+            The best genome and its score
+        """
+        if checkpoint and os.path.exists(checkpoint):
+            population, no_changes = self.load_checkpoint(checkpoint)
+            print(f"Resuming from generation {population.number} of {checkpoint}")
+        else:
+            population = Population.random(population_size, self.rng, self.cache)
+            self.grade(population)
+            no_changes = 0
+
+        while True:
+            best = population.best()
+            print(f"Generation {population.number}: {population.best_score():.0f} {best.to_layout().name} "
+                  f"(unchanged for {no_changes}/{max_no_change}, cached {len(self.cache)}, "
+                  f"hits {self.cache.hits}, misses {self.cache.misses})")
+
+            done = population.number >= generations or no_changes >= max_no_change
+            if checkpoint and (done or population.number % checkpoint_every == 0):
+                self.save_checkpoint(checkpoint, population, no_changes)
+            if done:
+                return best, population.best_score()
+
+            population = population.next(self.rng, self.cache, elite, mutate_level)
+            self.grade(population)
+            no_changes = no_changes + 1 if population.best().sequence == best.sequence else 0
+
+
+class SwapSearch:
+    """
+    Local search over single swaps of unlocked keys, scored by LayoutState.swap_delta.
+
+    Args:
+        evaluator: Scores layouts on the text
+        genome: Genome to start from
+        rng: Source of randomness
+    """
+
+    def __init__(self, evaluator: Evaluator, genome: Genome, rng: Random):
+        self.evaluator = evaluator
+        self.state: LayoutState = evaluator.state(genome.to_layout())
+        self.rng = rng
+        # locked symbols never move, so neither do their keys
+        self.keys = [key for key, symbol in enumerate(genome.sequence) if symbol not in LOCK_POSITIONS]
+        self.grouped = {symbol for group in SAME_HANDS for symbol in group}
+        self.best_effort = self.state.effort
+        self.best_sequence = genome.sequence
+        self.tried = 0
+
+    def sequence(self) -> str:
+        return "".join(normal for normal, _ in self.state.pairs)
+
+    def score(self, effort: float) -> float:
+        """Estimated runner position, the genetic search's score, of an effort per loop."""
+        return self.evaluator.effort_limit * len(self.evaluator.units) / effort
+
+    def candidate(self) -> Tuple[int, int]:
+        """A random swap that keeps the same-hand groups together."""
+        while True:
+            first, second = self.rng.sample(self.keys, 2)
+            pairs = self.state.pairs
+            if pairs[first][0] not in self.grouped and pairs[second][0] not in self.grouped:
+                return first, second
+            symbols = [normal for normal, _ in pairs]
+            symbols[first], symbols[second] = symbols[second], symbols[first]
+            if not Genome.conditions_unmet("".join(symbols), ()):
+                return first, second
+
+    def _accept(self, first: int, second: int) -> None:
+        self.state.swap(first, second)
+        if self.state.effort < self.best_effort:
+            self.best_effort = self.state.effort
+            self.best_sequence = self.sequence()
+
+    def hill_climb(self, steps: int = STEPS, patience: int = PATIENCE) -> Tuple[Genome, float]:
+        """
+        Makes every random swap that lowers the effort, until `patience` swaps in a row do not.
+
+        Returns:
+            The best genome and its score
+        """
+        unchanged = 0
+        for _ in range(steps):
+            first, second = self.candidate()
+            self.tried += 1
+            if self.state.swap_delta(first, second) < 0:
+                self._accept(first, second)
+                unchanged = 0
+            else:
+                unchanged += 1
+                if unchanged >= patience:
+                    break
+        return Genome(self.best_sequence), self.score(self.best_effort)
+
+    def anneal(self, steps: int = STEPS, start_temperature: float = START_TEMPERATURE,
+               end_temperature: float = END_TEMPERATURE) -> Tuple[Genome, float]:
+        """
+        Simulated annealing: makes a swap that raises the effort by delta with probability exp(-delta / temperature).
+
+        The temperature cools down exponentially from start_temperature to
+        end_temperature, both shares of the starting effort.
+
+        Returns:
+            The best genome seen and its score
+        """
+        temperature = start_temperature * self.state.effort
+        cooling = (end_temperature / start_temperature) ** (1 / max(steps - 1, 1))
+        for _ in range(steps):
+            first, second = self.candidate()
+            self.tried += 1
+            delta = self.state.swap_delta(first, second)
+            if delta < 0 or self.rng.random() < math.exp(-delta / temperature):
+                self._accept(first, second)
+            temperature *= cooling
+        return Genome(self.best_sequence), self.score(self.best_effort)
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    parser = argparse.ArgumentParser(description="Optimizes a keyboard layout with a parallel genetic search "
+                                                 "or by swapping keys.")
+    parser.add_argument('--text-dir', default='text', help="directory of the .txt files to type")
+    parser.add_argument('--mode', choices=['genetic', 'hill-climb', 'anneal'], default='genetic')
+    parser.add_argument('--generations', type=int, default=GENERATIONS)
+    parser.add_argument('--population', type=int, default=POPULATION_SIZE)
+    parser.add_argument('--mutate', type=int, default=MUTATE_LEVEL, help="swaps of the aggressive mutations")
+    parser.add_argument('--max-no-change', type=int, default=MAX_NO_CHANGE,
+                        help="generations without a new best layout after which to stop")
+    parser.add_argument('--jobs', type=int, default=None, help="number of worker processes")
+    parser.add_argument('--cache-size', type=int, default=CACHE_SIZE, help="genome scores to keep")
+    parser.add_argument('--exact', action='store_true', help="score by the exact runner position")
+    parser.add_argument('--seed', type=int, default=None)
+    parser.add_argument('--checkpoint', metavar='FILE', help="JSON file to save the run to and resume it from")
+    parser.add_argument('--checkpoint-every', type=int, default=CHECKPOINT_EVERY)
+    parser.add_argument('--steps', type=int, default=STEPS, help="swaps tried by hill-climb and anneal")
+    parser.add_argument('--patience', type=int, default=PATIENCE,
+                        help="swaps without improvement after which hill-climb stops")
+    parser.add_argument('--temperature', type=float, nargs=2, default=[START_TEMPERATURE, END_TEMPERATURE],
+                        metavar=('START', 'END'), help="annealing temperatures, as a share of the starting effort")
+    parser.add_argument('--start', metavar='PRESET', help="preset layout hill-climb and anneal start from, "
+                                                          "a random one by default")
+    args = parser.parse_args(argv)
+
+    evaluator = Evaluator(load_text(args.text_dir))
+    if args.mode != 'genetic':
+        rng = Random(args.seed)
+        genome = Genome.from_layout(PRESETS[args.start]) if args.start else Genome.random(rng, set())
+        search = SwapSearch(evaluator, genome, rng)
+        print(f"Start: {search.score(search.state.effort):.0f}")
+
+        started = time.perf_counter()
+        if args.mode == 'hill-climb':
+            best, score = search.hill_climb(args.steps, args.patience)
+        else:
+            best, score = search.anneal(args.steps, *args.temperature)
+        elapsed = time.perf_counter() - started
+        print(f"Tried {search.tried} swaps, {search.tried / elapsed * 60:,.0f} per minute")
+    else:
+        with Optimizer(evaluator, args.jobs, args.cache_size, args.exact, args.seed) as optimizer:
+            for layout, score in zip([QWERTY, Workman], optimizer.score(
+                    Genome.from_layout(layout).sequence for layout in [QWERTY, Workman])):
+                print(f"{layout.name}: {score:.0f}")
+
+            best, score = optimizer.run(args.generations, args.population, mutate_level=args.mutate,
+                                        max_no_change=args.max_no_change, checkpoint=args.checkpoint,
+                                        checkpoint_every=args.checkpoint_every)
+
+    layout = best.to_layout()
+    print(f"\nTotal: {score:.0f}\n")
+    print(layout, "\n")
+    print(layout.config)
+
+
+if __name__ == "__main__":
+    main()
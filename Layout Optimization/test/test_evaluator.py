@@ -0,0 +1,157 @@
+import json
+import os
+import random
+import shutil
+import subprocess
+import sys
+
+import pytest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.join(ROOT, 'python'))
+
+from evaluator import OVERHEADS, Evaluator  # noqa: E402
+from presets import PRESETS  # noqa: E402
+
+# global.TEXT_FIXTUE of helper.js
+TEXT_FIXTURE = """
+A long time ago in a galaxy far, far away
+
+It is a period of civil war. Rebel spaceships, striking from a
+hidden base, have won their first victory against the evil Galactic Empire.
+During the battle, Rebel spies managed to steal secret plans to the
+Empire's ultimate weapon, the Death Star, an armored space station
+with enough power to destroy an entire planet.
+Pursued by the Empire's sinister agents, Princess Leia races home
+aboard her starship, custodian of the stolen plans that can save her
+people and restore freedom to the galaxy...
+"""
+
+# a text the runner loops over many times, with symbols no layout maps
+MIXED_TEXT = "﻿ " + TEXT_FIXTURE.replace("far, far", "fär, ☃ far") * 3 + "\t{[<|>]}\r\n😀 "
+
+# Runner.typeWith of runner.js, with the options of runner_test.js
+RUNNER_SCORES = {
+    'QWERTY': (395, 2968, 2003, {'sameFinger': 370, 'sameHand': 277, 'shifting': 25}),
+    'CorpalX': (504, 2130, 2004, {'sameFinger': 680, 'sameHand': 136, 'shifting': 46}),
+    'Workman': (753, 3053, 2001, {'sameFinger': 325, 'sameHand': 278, 'shifting': 56}),
+    'Workman-P': (753, 3053, 2001, {'sameFinger': 325, 'sameHand': 278, 'shifting': 56}),
+    'Colemak': (725, 2698, 2004, {'sameFinger': 35, 'sameHand': 374, 'shifting': 38}),
+    'Dvorak': (569, 2486, 2020, {'sameFinger': 570, 'sameHand': 137, 'shifting': 43}),
+    'Halmak': (740, 2939, 2002, {'sameFinger': 630, 'sameHand': 188, 'shifting': 40}),
+}
+
+RUN_RUNNER = """
+const Runner = require('./src/runner');
+const presets = require('./src/presets');
+const [text, options] = JSON.parse(require('fs').readFileSync(0, 'utf8'));
+const runner = new Runner(text, options);
+const results = {};
+for (const name in presets) results[name] = runner.typeWith(presets[name]);
+console.log(JSON.stringify(results));
+"""
+
+
+def walk_loop(text, layout, same_finger_penalty, same_hand_penalty):
+    """Runner.typeWith's sums over the second time it types text, the way it does."""
+    mapping = layout.to_metrics()
+    totals = {'distance': 0, 'effort': 0, **{name: 0 for name in OVERHEADS}}
+    prev_key, prev_shift = mapping[' '], False
+    for loop in range(2):
+        for symbol in text:
+            key = mapping.get(symbol)
+            if key is None:
+                prev_key = mapping[' ']
+                continue
+            overhead, kind = 0, None
+            if key.hand is not False and key is not prev_key:
+                if key.finger == prev_key.finger:
+                    overhead, kind = (prev_key.effort + 1) * same_finger_penalty, 'sameFinger'
+                elif key.hand == prev_key.hand:
+                    overhead, kind = (prev_key.effort + 1) * same_hand_penalty, 'sameHand'
+                elif prev_shift and prev_shift.hand == key.hand:
+                    overhead, kind = prev_shift.effort * same_hand_penalty, 'shifting'
+            if loop:
+                totals['distance'] += key.distance
+                totals['effort'] += key.effort + overhead
+                if kind:
+                    totals[kind] += overhead
+            prev_shift = (mapping['l-shift'] if key.hand == 'r' else mapping['r-shift']) if key.shift else None
+            prev_key = key
+    return totals
+
+
+@pytest.mark.parametrize('name', RUNNER_SCORES)
+def test_type_with_matches_runner(name):
+    evaluator = Evaluator(TEXT_FIXTURE, effort_limit=2000, same_finger_penalty=5, same_hand_penalty=0.5)
+    result = evaluator.type_with(PRESETS[name])
+    position, distance, effort, overheads = RUNNER_SCORES[name]
+    assert result['position'] == position
+    assert result['distance'] == distance
+    assert result['effort'] == effort
+    assert result['overheads'] == overheads
+
+
+@pytest.mark.skipif(shutil.which('node') is None, reason="needs node to run runner.js")
+@pytest.mark.parametrize('effort_limit, same_finger_penalty, same_hand_penalty', [
+    (50, 10, 1),
+    (2000, 5, 0.5),
+    (123457, 10, 1),
+    (3000000, 2.5, 0.25),
+])
+def test_type_with_matches_runner_js(effort_limit, same_finger_penalty, same_hand_penalty):
+    options = {'effortLimit': effort_limit, 'sameFingerPenalty': same_finger_penalty,
+               'sameHandPenalty': same_hand_penalty}
+    output = subprocess.run(['node', '-e', RUN_RUNNER], input=json.dumps([MIXED_TEXT, options]), cwd=ROOT,
+                            capture_output=True, text=True, check=True).stdout
+    expected = json.loads(output)
+
+    evaluator = Evaluator(MIXED_TEXT, effort_limit, same_finger_penalty, same_hand_penalty)
+    for name, layout in PRESETS.items():
+        assert evaluator.type_with(layout) == expected[name], name
+
+
+@pytest.mark.parametrize('name', PRESETS)
+def test_evaluate_sums_one_loop(name):
+    evaluator = Evaluator(MIXED_TEXT, same_finger_penalty=5, same_hand_penalty=0.5)
+    result = evaluator.evaluate(PRESETS[name])
+    totals = walk_loop(evaluator.text, PRESETS[name], 5, 0.5)
+
+    assert result['position'] == len(evaluator.text.encode('utf-16-le')) // 2
+    assert result['distance'] == totals['distance']
+    assert result['effort'] == pytest.approx(totals['effort'])
+    for overhead in OVERHEADS:
+        assert result['overheads'][overhead] == pytest.approx(totals[overhead])
+
+
+@pytest.mark.parametrize('name', PRESETS)
+def test_swap_delta_matches_evaluate(name):
+    evaluator = Evaluator(MIXED_TEXT, same_finger_penalty=5, same_hand_penalty=0.5)
+    state = evaluator.state(PRESETS[name])
+    rng = random.Random(name)
+    assert state.effort == pytest.approx(evaluator.evaluate(PRESETS[name])['effort'])
+
+    for _ in range(50):
+        first, second = rng.sample(range(len(state.pairs)), 2)
+        before = state.effort
+        delta = state.swap_delta(first, second)
+        if rng.random() < 0.5:
+            assert state.effort == before
+            continue
+        assert state.swap(first, second) == delta
+        result = evaluator.evaluate(state.to_layout())
+        assert state.effort == pytest.approx(result['effort'])
+        assert state.effort == pytest.approx(before + delta)
+        assert state.distance == pytest.approx(result['distance'])
+
+
+def test_counts_are_shared_by_layouts_of_the_same_symbols():
+    evaluator = Evaluator(TEXT_FIXTURE)
+    evaluator.evaluate(PRESETS['QWERTY'])
+    evaluator.evaluate(PRESETS['Workman'])
+    assert len(evaluator._bigrams) == 1
+
+
+def test_text_without_layout_symbols_is_rejected():
+    with pytest.raises(ValueError):
+        Evaluator("☃☃☃").type_with(PRESETS['QWERTY'])
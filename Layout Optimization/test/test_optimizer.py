@@ -0,0 +1,116 @@
+import os
+import sys
+from random import Random
+
+import pytest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.join(ROOT, 'python'))
+
+import genome  # noqa: E402
+import optimizer  # noqa: E402
+from config import FINGERS  # noqa: E402
+from evaluator import Evaluator  # noqa: E402
+from genome import LOCK_POSITIONS, QWERTY_SEQUENCE, Genome  # noqa: E402
+from optimizer import FitnessCache, Optimizer, Population, SwapSearch  # noqa: E402
+from test_evaluator import TEXT_FIXTURE  # noqa: E402
+
+
+@pytest.fixture(scope='module')
+def evaluator():
+    return Evaluator(TEXT_FIXTURE * 3)
+
+
+def test_cache_drops_the_least_recently_used_sequence():
+    cache = FitnessCache(max_size=3)
+    for sequence, score in [('a', 1.0), ('b', 2.0), ('c', 3.0)]:
+        cache.put(sequence, score)
+
+    assert cache.get('a') == 1.0
+    cache.put('d', 4.0)
+    assert list(cache.scores) == ['c', 'a', 'd']
+
+    cache.add('c')
+    cache.add('e')
+    assert list(cache.scores) == ['d', 'c', 'e']
+    assert 'a' not in cache and len(cache) == 3
+
+    # a tried but unscored sequence is a miss and not used by that
+    assert cache.get('e') is None
+    cache.put('f', 6.0)
+    assert list(cache.scores) == ['c', 'e', 'f']
+    assert cache.scored() == [('c', 3.0), ('f', 6.0)]
+    assert (cache.hits, cache.misses) == (1, 1)
+
+
+def test_checkpoint_restores_the_population_cache_and_random_state(evaluator, tmp_path):
+    path = str(tmp_path / "checkpoint.json")
+    with Optimizer(evaluator, jobs=1, seed=48) as optimizer:
+        population = Population.random(6, optimizer.rng, optimizer.cache)
+        optimizer.grade(population)
+        population = population.next(optimizer.rng, optimizer.cache)
+        optimizer.grade(population)
+        optimizer.save_checkpoint(path, population, no_changes=3)
+        following = [optimizer.rng.random() for _ in range(5)]
+
+    with Optimizer(evaluator, jobs=1, seed=1) as resumed:
+        restored, no_changes = resumed.load_checkpoint(path)
+        assert [genome.sequence for genome in restored.genomes] == [genome.sequence for genome in population.genomes]
+        assert restored.scores == population.scores
+        assert restored.number == population.number == 2
+        assert no_changes == 3
+        assert resumed.cache.scored() == optimizer.cache.scored()
+        assert [resumed.rng.random() for _ in range(5)] == following
+
+
+def test_resumed_run_ends_like_an_uninterrupted_one(evaluator, tmp_path, capsys):
+    path = str(tmp_path / "checkpoint.json")
+    with Optimizer(evaluator, jobs=1, seed=7) as optimizer:
+        expected = optimizer.run(generations=8, population_size=6)
+
+    with Optimizer(evaluator, jobs=1, seed=7) as optimizer:
+        optimizer.run(generations=4, population_size=6, checkpoint=path, checkpoint_every=2)
+    with Optimizer(evaluator, jobs=1, seed=99) as optimizer:
+        best, score = optimizer.run(generations=8, population_size=6, checkpoint=path, checkpoint_every=2)
+
+    assert "Resuming from generation 4" in capsys.readouterr().out
+    assert (best.sequence, score) == (expected[0].sequence, expected[1])
+
+
+def walk(search, steps=3000):
+    """Makes `steps` candidate swaps, yielding each swap and the sequence after it."""
+    for _ in range(steps):
+        first, second = search.candidate()
+        search.state.swap(first, second)
+        yield first, second, search.sequence()
+
+
+def test_swaps_never_move_locked_keys(evaluator):
+    rng = Random(48)
+    search = SwapSearch(evaluator, Genome.random(rng, set()), rng)
+    locked = set(LOCK_POSITIONS.values())
+
+    for first, second, sequence in walk(search):
+        assert first != second
+        assert first not in locked and second not in locked
+        assert all(sequence[position] == symbol for symbol, position in LOCK_POSITIONS.items())
+        assert not Genome.conditions_unmet(sequence, ())
+
+
+def test_swaps_never_split_same_hand_groups(evaluator, monkeypatch):
+    # the shipped group, t and h, is locked as well, so try groups of keys that do move
+    groups = [['w', 'g', 'm'], ['k', 'z']]
+    monkeypatch.setattr(genome, 'SAME_HANDS', groups)
+    monkeypatch.setattr(optimizer, 'SAME_HANDS', groups)
+    rng = Random(48)
+    search = SwapSearch(evaluator, Genome.random(rng, set()), rng)
+    keys = {symbol: set() for group in groups for symbol in group}
+
+    for first, second, sequence in walk(search):
+        for group in groups:
+            assert len({FINGERS[QWERTY_SEQUENCE[sequence.index(symbol)]][0] for symbol in group}) == 1
+        for symbol in keys:
+            keys[symbol].add(sequence.index(symbol))
+
+    # the grouped symbols do move, just never away from their group's hand
+    assert all(len(positions) > 1 for positions in keys.values())
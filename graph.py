@@ -1,5 +1,35 @@
-import matplotlib.pyplot as plt
-import numpy as np
+"""
+Diagramme zum Vergleich von Tastaturlayouts.
+
+Ohne Argumente werden die Diagramme der Daten unten gezeichnet. Mit
+Layouts (Namen der Presets, Dateien mit der Ausgabe von optimizer.py oder
+dessen JSON-Checkpoints) werden Punktzahl, Fingerabstände und Fingernutzung
+in einem Durchgang des Evaluators berechnet. Alle Diagramme werden ohne
+Fenster mit dem Agg-Backend in parallelen Prozessen als PNG gespeichert:
+
+    python graph.py QWERTY Dvorak Colemak bestes_layout.txt lauf.json --text-dir "Layout Optimization/text"
+"""
+import argparse
+import json
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import matplotlib
+
+matplotlib.use("Agg")
+
+import matplotlib.pyplot as plt  # noqa: E402
+import numpy as np  # noqa: E402
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "Layout Optimization", "python"))
+
+from evaluator import Evaluator  # noqa: E402
+from genome import Genome  # noqa: E402
+from layout import Layout  # noqa: E402
+from optimizer import load_text  # noqa: E402
+from presets import PRESETS  # noqa: E402
 
 # Aktualisierte Daten
 titel = ['Unser Layout', 'Dvorak', 'Colemak', 'QWERTY']
@@ -35,84 +65,208 @@ nutzungs_daten = {
 
 # Farben für Konsistenz über die Diagramme hinweg
 farben = ["#FF9999", "#66B2FF", "#99FF99", "#FFD966", "#FF66B2", "#A9A9F5", "#F5A9D0", "#8AD9B5", "#FF7F50", "#40E0D0"]
+balken_farben = ["#4CAF50", "#2196F3", "#FFC107", "#F44336"]
+
+# Finger des Evaluators für jeden Finger der Diagramme, die Leertaste drücken beide Daumen zu gleichen Teilen
+FINGER = {
+    'Linker kleiner Finger': 'l-pinky',
+    'Linker Ringfinger': 'l-ring',
+    'Linker Mittelfinger': 'l-middle',
+    'Linker Zeigefinger': 'l-point',
+    'Linker Daumen': 'thumb',
+    'Rechter Daumen': 'thumb',
+    'Rechter Zeigefinger': 'r-point',
+    'Rechter Mittelfinger': 'r-middle',
+    'Rechter Ringfinger': 'r-ring',
+    'Rechter kleiner Finger': 'r-pinky',
+}
+
+# Layouts pro Seite der Kreisdiagramme
+KREISE_PRO_SEITE = 4
+
+
+def balkendiagramm_punktzahlen(titel, punkte, pfad):
+    plt.figure(figsize=(max(10, 0.6 * len(titel)), 6))
+    plt.bar(titel, punkte, color=[balken_farben[i % len(balken_farben)] for i in range(len(titel))],
+            edgecolor="black")
+    plt.title("Punktzahlen der Tastaturlayouts", fontsize=16)
+    plt.ylabel("Punktzahl", fontsize=14)
+    plt.xlabel("Tastaturlayout", fontsize=14)
+    if len(titel) > 8:
+        plt.xticks(rotation=45, ha="right")
+    plt.grid(axis="y", linestyle="--", alpha=0.7)
+    plt.tight_layout()
+    plt.savefig(pfad)
+    plt.close()
+    return pfad
+
+
+def kreisdiagramm_abstaende(titel, distanz_daten, pfad):
+    fig, achsen = plt.subplots(2, 2, figsize=(15, 12))
+    achsen = achsen.flatten()
+    for i, achse in enumerate(achsen):
+        if i >= len(titel):
+            achse.axis("off")
+            continue
+        abstände = [distanz_daten[finger][i] for finger in distanz_daten]
+        achse.pie(abstände, labels=distanz_daten.keys(), autopct="%.1f%%", startangle=90, colors=farben)
+        achse.set_title(f"{titel[i]} - Fingerabstände", fontsize=14)
+
+    fig.legend(distanz_daten.keys(), loc="center right", title="Finger", fontsize=12)
+    fig.suptitle("Fingerabstände nach Tastaturlayout", fontsize=16)
+    plt.tight_layout(rect=[0, 0, 0.85, 1])
+    plt.savefig(pfad)
+    plt.close(fig)
+    return pfad
+
+
+def gestapeltes_balkendiagramm(titel, daten, überschrift, y_beschriftung, pfad):
+    plt.figure(figsize=(max(14, 1.2 * len(titel)), 8))
+    finger = list(daten.keys())
+    prozente_je_finger = np.array([daten[f] for f in finger])
+
+    unten = np.zeros(len(titel))
+    for i, (f, prozente) in enumerate(zip(finger, prozente_je_finger)):
+        balken = plt.bar(titel, prozente, bottom=unten, label=f, color=farben[i], edgecolor='white')
+
+        # Prozentangaben innerhalb jedes Balkensegments, die zu schmalen ausgenommen
+        for j, b in enumerate(balken):
+            höhe = prozente[j]
+            if höhe >= 1:
+                plt.text(b.get_x() + b.get_width()/2., unten[j] + höhe/2.,
+                         f'{höhe:g}%', ha='center', va='center',
+                         fontweight='bold', color='black')
+
+        unten += prozente
+
+    plt.title(überschrift, fontsize=16)
+    plt.xlabel("Tastaturlayout", fontsize=14)
+    plt.ylabel(y_beschriftung, fontsize=14)
+    if len(titel) > 8:
+        plt.xticks(rotation=45, ha="right")
+    plt.legend(title="Finger", bbox_to_anchor=(1.05, 1), loc='upper left')
+    plt.tight_layout()
+    plt.grid(axis='y', linestyle='--', alpha=0.7)
+    plt.savefig(pfad)
+    plt.close()
+    return pfad
+
+
+def diagramme(titel, punkte, distanz_daten, nutzungs_daten, ordner):
+    """Die Aufträge für alle Diagramme, als (Funktion, Argumente)."""
+    aufträge = [
+        (balkendiagramm_punktzahlen, (titel, punkte, os.path.join(ordner, "balkendiagramm_punktzahlen.png"))),
+        (gestapeltes_balkendiagramm, (titel, nutzungs_daten, "Fingernutzung nach Tastaturlayout",
+                                      "Prozent der Nutzung",
+                                      os.path.join(ordner, "gestapeltes_balkendiagramm_nutzung.png"))),
+        (gestapeltes_balkendiagramm, (titel, distanz_daten, "Fingerabstände nach Tastaturlayout",
+                                      "Prozent der Abstände",
+                                      os.path.join(ordner, "gestapeltes_balkendiagramm_abstaende.png"))),
+    ]
+
+    # bei mehr als einer Seite bekommt jede Seite der Kreisdiagramme eine Nummer
+    seiten = range(0, len(titel), KREISE_PRO_SEITE)
+    for nummer, start in enumerate(seiten, 1):
+        name = f"kreisdiagramm_abstaende_{nummer}.png" if len(seiten) > 1 else "kreisdiagramm_abstaende.png"
+        ende = start + KREISE_PRO_SEITE
+        seite = {finger: werte[start:ende] for finger, werte in distanz_daten.items()}
+        aufträge.append((kreisdiagramm_abstaende, (titel[start:ende], seite, os.path.join(ordner, name))))
+    return aufträge
+
+
+def zeichnen(aufträge, prozesse=None):
+    """Zeichnet die Diagramme in parallelen Prozessen und gibt die gespeicherten Dateien zurück."""
+    if prozesse == 1:
+        return [funktion(*argumente) for funktion, argumente in aufträge]
+    with ProcessPoolExecutor(max_workers=prozesse) as executor:
+        futures = [executor.submit(funktion, *argumente) for funktion, argumente in aufträge]
+        return [future.result() for future in futures]
+
+
+def layouts_laden(quelle):
+    """
+    Die Layouts eines Arguments: ein Preset, ein JSON-Checkpoint von optimizer.py
+    mit seiner ganzen Population, oder eine Datei, deren letzte acht Zeilen ein
+    Layout sind, wie es optimizer.py am Ende ausgibt.
+    """
+    if quelle in PRESETS:
+        return [PRESETS[quelle]]
+    if quelle.endswith(".json"):
+        with open(quelle, 'r', encoding='utf-8') as f:
+            population = json.load(f)['population']
+        return [Genome(sequenz).to_layout() for sequenz in dict.fromkeys(population)]
+    with open(quelle, 'r', encoding='utf-8') as f:
+        zeilen = [zeile for zeile in f.read().split("\n") if zeile.strip()]
+    name = os.path.splitext(os.path.basename(quelle))[0]
+    return [Layout(name, "\n".join(zeilen[-8:]))]
+
+
+def prozente(werte):
+    summe = sum(werte)
+    return [round(100 * wert / summe, 1) if summe else 0.0 for wert in werte]
+
+
+def bericht(layouts, evaluator):
+    """
+    Punktzahlen und Prozente der Fingerabstände und -nutzung aller Layouts.
+
+    Die Punktzahl ist die Textposition, bis zu der ein Layout mit dem
+    Aufwandslimit kommt, wie bei optimizer.py.
+    """
+    ergebnisse = evaluator.evaluate_batch(layouts)
+    punkte = [evaluator.effort_limit * ergebnis['position'] / ergebnis['effort'] for ergebnis in ergebnisse]
+
+    distanz_daten = {name: [] for name in FINGER}
+    nutzungs_daten = {name: [] for name in FINGER}
+    for ergebnis in ergebnisse:
+        finger = ergebnis['fingers']
+        anteile = {name: 0.5 if FINGER[name] == 'thumb' else 1 for name in FINGER}
+        for daten, wert in ((distanz_daten, 'distance'), (nutzungs_daten, 'presses')):
+            werte = prozente([finger[FINGER[name]][wert] * anteile[name] for name in FINGER])
+            for name, prozent in zip(FINGER, werte):
+                daten[name].append(prozent)
+    return punkte, distanz_daten, nutzungs_daten
+
+
+def eindeutige_titel(layouts):
+    titel = []
+    for layout in layouts:
+        name = layout.name
+        nummer = 2
+        while name in titel:
+            name = f"{layout.name} ({nummer})"
+            nummer += 1
+        titel.append(name)
+    return titel
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Zeichnet Vergleichsdiagramme von Tastaturlayouts ohne Fenster.")
+    parser.add_argument('layouts', nargs='*',
+                        help="Presets, Ausgaben oder JSON-Checkpoints von optimizer.py; "
+                             "ohne Layouts werden die eingetragenen Daten gezeichnet")
+    parser.add_argument('--text-dir', default='text', help="Ordner der .txt-Dateien für den Evaluator")
+    parser.add_argument('--output-dir', default='.', help="Ordner für die Diagramme")
+    parser.add_argument('--jobs', type=int, default=None, help="Anzahl der Prozesse zum Zeichnen")
+    args = parser.parse_args(argv)
+
+    gestartet = time.perf_counter()
+    os.makedirs(args.output_dir, exist_ok=True)
+    if args.layouts:
+        layouts = [layout for quelle in args.layouts for layout in layouts_laden(quelle)]
+        namen = eindeutige_titel(layouts)
+        daten = bericht(layouts, Evaluator(load_text(args.text_dir)))
+        with open(os.path.join(args.output_dir, "bericht.json"), 'w', encoding='utf-8') as f:
+            json.dump({'titel': namen, 'punkte': daten[0], 'distanz': daten[1], 'nutzung': daten[2]}, f,
+                      ensure_ascii=False, indent=2)
+    else:
+        namen, daten = titel, (punkte, distanz_daten, nutzungs_daten)
+
+    dateien = zeichnen(diagramme(namen, *daten, args.output_dir), args.jobs)
+    for datei in dateien:
+        print(datei)
+    print(f"{len(namen)} Layouts, {len(dateien)} Diagramme in {time.perf_counter() - gestartet:.1f} s")
+
 
-# Balkendiagramm für Punktzahlen
-plt.figure(figsize=(10, 6))
-plt.bar(titel, punkte, color=["#4CAF50", "#2196F3", "#FFC107", "#F44336"], edgecolor="black")
-plt.title("Punktzahlen der Tastaturlayouts", fontsize=16)
-plt.ylabel("Punktzahl", fontsize=14)
-plt.xlabel("Tastaturlayout", fontsize=14)
-plt.grid(axis="y", linestyle="--", alpha=0.7)
-plt.tight_layout()
-plt.savefig("balkendiagramm_punktzahlen.png")
-plt.show()
-
-# Kreisdiagramme für Fingerabstände
-fig, achsen = plt.subplots(2, 2, figsize=(15, 12))
-achsen = achsen.flatten()
-for i, achse in enumerate(achsen):
-    abstände = [distanz_daten[finger][i] for finger in distanz_daten]
-    achse.pie(abstände, labels=distanz_daten.keys(), autopct="%.1f%%", startangle=90, colors=farben)
-    achse.set_title(f"{titel[i]} - Fingerabstände", fontsize=14)
-
-fig.legend(distanz_daten.keys(), loc="center right", title="Finger", fontsize=12)
-fig.suptitle("Fingerabstände nach Tastaturlayout", fontsize=16)
-plt.tight_layout(rect=[0, 0, 0.85, 1])
-plt.savefig("kreisdiagramm_abstaende.png")
-plt.show()
-
-# Gestapeltes Balkendiagramm für Fingernutzung
-plt.figure(figsize=(14, 8))
-finger = list(nutzungs_daten.keys())
-nutzungs_prozente = np.array([nutzungs_daten[f] for f in finger])
-
-unten = np.zeros(4)
-for i, (f, prozente) in enumerate(zip(finger, nutzungs_prozente)):
-    balken = plt.bar(titel, prozente, bottom=unten, label=f, color=farben[i], edgecolor='white')
-    
-    # Prozentangaben innerhalb jedes Balkensegments
-    for j, b in enumerate(balken):
-        höhe = prozente[j]
-        if höhe > 0:
-            plt.text(b.get_x() + b.get_width()/2., unten[j] + höhe/2.,
-                     f'{höhe}%', ha='center', va='center', 
-                     fontweight='bold', color='black')
-    
-    unten += prozente
-
-plt.title("Fingernutzung nach Tastaturlayout", fontsize=16)
-plt.xlabel("Tastaturlayout", fontsize=14)
-plt.ylabel("Prozent der Nutzung", fontsize=14)
-plt.legend(title="Finger", bbox_to_anchor=(1.05, 1), loc='upper left')
-plt.tight_layout()
-plt.grid(axis='y', linestyle='--', alpha=0.7)
-plt.savefig("gestapeltes_balkendiagramm_nutzung.png")
-plt.show()
-
-# Gestapeltes Balkendiagramm für Fingerabstände
-plt.figure(figsize=(14, 8))
-finger = list(distanz_daten.keys())
-distanz_prozente = np.array([distanz_daten[f] for f in finger])
-
-unten = np.zeros(4)
-for i, (f, prozente) in enumerate(zip(finger, distanz_prozente)):
-    balken = plt.bar(titel, prozente, bottom=unten, label=f, color=farben[i], edgecolor='white')
-    
-    # Prozentangaben innerhalb jedes Balkensegments
-    for j, b in enumerate(balken):
-        höhe = prozente[j]
-        if höhe > 0:
-            plt.text(b.get_x() + b.get_width()/2., unten[j] + höhe/2.,
-                     f'{höhe}%', ha='center', va='center', 
-                     fontweight='bold', color='black')
-    
-    unten += prozente
-
-plt.title("Fingerabstände nach Tastaturlayout", fontsize=16)
-plt.xlabel("Tastaturlayout", fontsize=14)
-plt.ylabel("Prozent der Abstände", fontsize=14)
-plt.legend(title="Finger", bbox_to_anchor=(1.05, 1), loc='upper left')
-plt.tight_layout()
-plt.grid(axis='y', linestyle='--', alpha=0.7)
-plt.savefig("gestapeltes_balkendiagramm_abstaende.png")
-plt.show()
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,69 @@
+import json
+import os
+import sys
+from random import Random
+
+import pytest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from graph import FINGER, bericht, layouts_laden  # noqa: E402
+from evaluator import Evaluator  # noqa: E402
+from genome import Genome  # noqa: E402
+from optimizer import SwapSearch, load_text, main as optimizer_main  # noqa: E402
+from presets import PRESETS  # noqa: E402
+
+TEXT = """
+It is a period of civil war. Rebel spaceships, striking from a
+hidden base, have won their first victory against the evil Galactic Empire.
+During the battle, Rebel spies managed to steal secret plans to the
+Empire's ultimate weapon, the Death Star, an armored space station
+with enough power to destroy an entire planet.
+"""
+
+
+def test_report_percentages_of_two_presets():
+    layouts = [PRESETS['QWERTY'], PRESETS['Dvorak']]
+    punkte, distanz_daten, nutzungs_daten = bericht(layouts, Evaluator(TEXT))
+
+    assert len(punkte) == 2 and punkte[0] != punkte[1]
+    for daten in (distanz_daten, nutzungs_daten):
+        assert list(daten) == list(FINGER)
+        for index in range(len(layouts)):
+            # every percentage is rounded to one place
+            assert sum(daten[name][index] for name in FINGER) == pytest.approx(100, abs=0.05 * len(FINGER))
+
+    # the thumbs press space, each half of the time
+    assert nutzungs_daten['Linker Daumen'] == nutzungs_daten['Rechter Daumen']
+    assert all(prozent > 0 for prozent in nutzungs_daten['Linker Daumen'])
+
+
+def test_checkpoint_population_without_repeats(tmp_path):
+    sequences = [Genome.from_layout(PRESETS[name]).sequence for name in ('Workman', 'Colemak', 'Workman')]
+    checkpoint = tmp_path / "lauf.json"
+    checkpoint.write_text(json.dumps({'generation': 3, 'population': sequences, 'cache': []}), encoding='utf-8')
+
+    layouts = layouts_laden(str(checkpoint))
+
+    assert [layout.to_sequence() for layout in layouts] == [PRESETS['Workman'].to_sequence(),
+                                                            PRESETS['Colemak'].to_sequence()]
+
+
+def test_optimizer_output_file(tmp_path, capsys):
+    text_dir = tmp_path / "text"
+    text_dir.mkdir()
+    (text_dir / "text.txt").write_text(TEXT, encoding='utf-8')
+
+    optimizer_main(['--text-dir', str(text_dir), '--mode', 'hill-climb', '--start', 'Dvorak',
+                    '--steps', '300', '--seed', '50'])
+    output = tmp_path / "bestes_layout.txt"
+    output.write_text(capsys.readouterr().out, encoding='utf-8')
+    best, _ = SwapSearch(Evaluator(load_text(str(text_dir))), Genome.from_layout(PRESETS['Dvorak']),
+                         Random(50)).hill_climb(300)
+
+    [layout] = layouts_laden(str(output))
+
+    assert layout.name == "bestes_layout"
+    assert layout.to_sequence() == best.sequence != PRESETS['Dvorak'].to_sequence()
+    assert layouts_laden('Dvorak') == [PRESETS['Dvorak']]